@@ -0,0 +1,103 @@
+from collections import OrderedDict
+import json
+
+# A metric is only reported as a regression if it got worse by more than this fraction of the baseline value
+DEFAULT_TOLERANCE = 0.1
+
+
+class BenchmarkResults:
+    def __init__(self, config=None):
+        """
+        The metrics measured by a benchmark run, each with the direction in which it improves.
+
+        Parameters
+        ----------
+        config : dict
+            The parameters of the run, saved along with the metrics, so that a baseline is only compared with a run
+            of the same parameters
+        """
+        self.config = config or OrderedDict()
+        self.metrics = OrderedDict()
+
+    def add(self, name, value, unit, higher_is_better=False):
+        self.metrics[name] = OrderedDict([("value", float(value)), ("unit", unit),
+                                          ("higher_is_better", higher_is_better)])
+
+    def to_dict(self):
+        return OrderedDict([("config", self.config), ("metrics", self.metrics)])
+
+    def save(self, filename):
+        with open(filename, 'w') as json_file:
+            json.dump(self.to_dict(), json_file, indent=4)
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename, 'r') as json_file:
+            content = json.load(json_file, object_pairs_hook=OrderedDict)
+        results = cls(content.get("config"))
+        results.metrics = content["metrics"]
+        return results
+
+
+def compare_results(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare the metrics of a run with those of a baseline run.
+
+    Parameters
+    ----------
+    results : BenchmarkResults
+        The metrics of the current run
+    baseline : BenchmarkResults
+        The metrics of the baseline run
+    tolerance : float
+        How much worse than the baseline a metric may get, as a fraction of the baseline value, before it is reported
+        as a regression
+
+    Returns
+    -------
+    A list of (name, baseline value, current value, relative change, is regression) tuples, the relative change being
+    positive when the metric got worse : list
+    """
+    comparisons = list()
+    for name, metric in results.metrics.items():
+        baseline_metric = baseline.metrics.get(name)
+        if baseline_metric is None:
+            continue
+
+        baseline_value = baseline_metric["value"]
+        value = metric["value"]
+        if baseline_value:
+            change = (value - baseline_value) / abs(baseline_value)
+        else:
+            change = 0.0 if value == baseline_value else float("inf")
+        if metric["higher_is_better"]:
+            change = -change
+        comparisons.append((name, baseline_value, value, change, change > tolerance))
+    return comparisons
+
+
+def format_report(results, comparisons=None):
+    """
+    Format the metrics of a run as a table, with their change from the baseline if compared to one.
+
+    Returns
+    -------
+    The table : str
+    """
+    comparisons = dict((comparison[0], comparison) for comparison in comparisons or list())
+    name_width = max([len(name) for name in results.metrics] + [len("Metric")])
+    row_format = "{0:<" + str(name_width) + "}  {1:>14}  {2:<6}  {3:>14}  {4:>9}  {5}"
+
+    lines = [row_format.format("Metric", "Value", "Unit", "Baseline", "Worse by", "")]
+    for name, metric in results.metrics.items():
+        comparison = comparisons.get(name)
+        if comparison:
+            _, baseline_value, _, change, is_regression = comparison
+            baseline_text = "{0:.4g}".format(baseline_value)
+            change_text = "{0:+.1%}".format(change)
+            verdict = "REGRESSION" if is_regression else ""
+        else:
+            baseline_text = change_text = verdict = ""
+        lines.append(row_format.format(name, "{0:.4g}".format(metric["value"]), metric["unit"], baseline_text,
+                                       change_text, verdict).rstrip())
+    return "\n".join(lines)
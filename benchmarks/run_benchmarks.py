@@ -0,0 +1,282 @@
+from timeit import default_timer
+STARTUP_TIME = default_timer()
+
+import os
+# The benchmarks run without any window on the screen, unless a platform is chosen explicitly
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from setup_paths import setup_paths
+setup_paths()
+
+from collections import OrderedDict
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from arg_parser import ArgParser
+from benchmarks.baseline import BenchmarkResults, compare_results, format_report, DEFAULT_TOLERANCE
+from benchmarks.synthetic_pvs import SyntheticPvFeed, synthetic_pv_addresses
+from utilities.utils import random_color
+
+from pydmcharting_logging import logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+DEFAULT_PV_COUNT = 100
+DEFAULT_RATE_HZ = 10.0
+DEFAULT_DURATION_S = 10.0
+DEFAULT_UPDATE_CURVE_DATA_ROUNDS = 100
+
+# How often the benchmarks let the event loop run while waiting for a worker thread, in seconds
+WAIT_INTERVAL_S = 0.001
+
+
+class FrameTimer:
+    def __init__(self):
+        """
+        Record the duration of every redraw and paint of the chart, as a frame listener of the chart.
+        """
+        self.durations = list()
+        self.paint_durations = list()
+
+    def record_redraw(self, duration):
+        self.durations.append(duration)
+
+    def record_paint(self, duration):
+        self.paint_durations.append(duration)
+
+
+def main():
+    args = _parse_arguments()
+
+    config = OrderedDict()
+    config["pv_count"] = args.pvs
+    config["rate_hz"] = args.rate_hz
+    config["duration_s"] = args.duration
+    config["nan_fraction"] = args.nan_fraction
+    config["disconnect_fraction"] = args.disconnect_fraction
+    results = BenchmarkResults(config)
+
+    display = None
+    work_directory = tempfile.mkdtemp(prefix="pydmcharting_benchmark_")
+    try:
+        app, display = benchmark_startup(results)
+        feed = SyntheticPvFeed(args.rate_hz, nan_fraction=args.nan_fraction,
+                               disconnect_fraction=args.disconnect_fraction)
+        display.enable_ingestion_engine(feed)
+
+        addresses = synthetic_pv_addresses(args.pvs)
+        benchmark_add_curves(display, addresses, results)
+        benchmark_streaming(app, display, feed, args.duration, False, results)
+        benchmark_streaming(app, display, feed, args.duration, True, results)
+        benchmark_update_curve_data(display, args.update_curve_data_rounds, results)
+        benchmark_data_export(app, display, os.path.join(work_directory, "curve_data.csv"), results)
+        benchmark_settings(display, addresses, os.path.join(work_directory, "settings.json"), results)
+        results.add("peak_rss", get_peak_rss_bytes() / 1048576.0, "MB")
+    finally:
+        if display:
+            display.close()
+        shutil.rmtree(work_directory, ignore_errors=True)
+
+    comparisons = None
+    if args.baseline:
+        baseline = BenchmarkResults.load(args.baseline)
+        if baseline.config != results.config:
+            logger.warning("The baseline was measured with different parameters: {0}".format(dict(baseline.config)))
+        comparisons = compare_results(results, baseline, tolerance=args.tolerance)
+
+    print(format_report(results, comparisons))
+
+    if args.save_baseline:
+        results.save(args.save_baseline)
+        logger.info("Saved the results as the baseline '{0}'.".format(args.save_baseline))
+
+    regressions = [comparison[0] for comparison in comparisons or list() if comparison[4]]
+    if regressions:
+        logger.error("{0} metrics regressed by more than {1:.0%}: {2}".format(len(regressions), args.tolerance,
+                                                                           ", ".join(regressions)))
+        return 1
+    return 0
+
+
+def benchmark_startup(results):
+    """
+    Measure the time to import the application modules, and to create and first paint the main display.
+
+    Returns
+    -------
+    The application and the main display : tuple
+    """
+    start = default_timer()
+    from pydm import PyDMApplication
+    from displays.main_display import PyDMChartingDisplay
+    results.add("startup.import", (default_timer() - start) * 1000, "ms")
+
+    app = PyDMApplication(command_line_args=[sys.argv[0]], hide_nav_bar=True, hide_menu_bar=True,
+                          hide_status_bar=True, use_main_window=False)
+
+    start = default_timer()
+    display = PyDMChartingDisplay()
+    display.setMinimumSize(1600, 800)
+    display.show()
+    app.processEvents()
+    results.add("startup.display", (default_timer() - start) * 1000, "ms")
+    results.add("startup.total", (default_timer() - STARTUP_TIME) * 1000, "ms")
+    return app, display
+
+
+def benchmark_add_curves(display, addresses, results):
+    start = default_timer()
+    for address in addresses:
+        display.add_y_channel(address, address, random_color())
+    results.add("add_y_channel", (default_timer() - start) * 1000 / len(addresses), "ms")
+
+
+def benchmark_streaming(app, display, feed, duration_s, is_async, results):
+    """
+    Stream the synthetic values to the curves while the chart redraws, and measure the throughput and the frame
+    times.
+    """
+    prefix = "async" if is_async else "sync"
+    radio_button = display.chart_sync_mode_async_radio if is_async else display.chart_sync_mode_sync_radio
+    radio_button.setChecked(True)
+
+    frame_timer = FrameTimer()
+    display.chart.addFrameListener(frame_timer)
+    samples_delivered = feed.samples_delivered
+    feed_time_s = feed.feed_time_s
+
+    start = default_timer()
+    run_event_loop(app, duration_s)
+    elapsed = default_timer() - start
+    display.chart.removeFrameListener(frame_timer)
+
+    sample_count = feed.samples_delivered - samples_delivered
+    results.add(prefix + ".throughput", sample_count / elapsed, "samp/s", higher_is_better=True)
+    if sample_count:
+        results.add(prefix + ".feed_cost", (feed.feed_time_s - feed_time_s) * 1e6 / sample_count, "us")
+
+    durations = np.array(frame_timer.durations) * 1000
+    results.add(prefix + ".redraw_rate", len(durations) / elapsed, "Hz", higher_is_better=True)
+    if len(durations):
+        results.add(prefix + ".frame_time_mean", durations.mean(), "ms")
+        results.add(prefix + ".frame_time_p95", np.percentile(durations, 95), "ms")
+        results.add(prefix + ".frame_time_max", durations.max(), "ms")
+
+    paint_durations = np.array(frame_timer.paint_durations) * 1000
+    if len(paint_durations):
+        results.add(prefix + ".paint_time_mean", paint_durations.mean(), "ms")
+        results.add(prefix + ".paint_time_p95", np.percentile(paint_durations, 95), "ms")
+
+
+def benchmark_update_curve_data(display, rounds, results):
+    curves = list(display.channel_map.values())
+    start = default_timer()
+    for _ in range(rounds):
+        for curve in curves:
+            display.update_curve_data(curve)
+    results.add("update_curve_data", (default_timer() - start) * 1e6 / (rounds * len(curves)), "us")
+
+
+def benchmark_data_export(app, display, filename, results):
+    """
+    Export the curve data through the data export dialog, and wait for its worker thread to complete.
+    """
+    from displays.chart_data_export_display import ChartDataExportDisplay
+
+    dialog = ChartDataExportDisplay(display)
+    start = default_timer()
+    dialog.export_curve_data(filename)
+    while dialog.export_thread.isRunning():
+        app.processEvents()
+        time.sleep(WAIT_INTERVAL_S)
+    elapsed = default_timer() - start
+    dialog.close()
+
+    if not os.path.isfile(filename):
+        logger.error("The data export did not write '{0}'.".format(filename))
+        return
+    results.add("data_export", elapsed * 1000, "ms")
+    results.add("data_export.throughput", os.path.getsize(filename) / 1048576.0 / elapsed, "MB/s",
+                higher_is_better=True)
+
+
+def benchmark_settings(display, addresses, filename, results):
+    """
+    Export the settings, remove all the curves, and import the settings back.
+    """
+    from data_io.settings_exporter import SettingsExporter
+    from data_io.settings_importer import SettingsImporter
+
+    start = default_timer()
+    SettingsExporter(display, True, True).export_settings(filename)
+    results.add("settings_export", (default_timer() - start) * 1000, "ms")
+
+    start = default_timer()
+    for address in addresses:
+        display.remove_curve(address)
+    results.add("remove_curve", (default_timer() - start) * 1000 / len(addresses), "ms")
+
+    start = default_timer()
+    SettingsImporter(display).import_settings(filename)
+    results.add("settings_import", (default_timer() - start) * 1000, "ms")
+
+
+def run_event_loop(app, duration_s):
+    from qtpy.QtCore import QEventLoop, QTimer
+
+    event_loop = QEventLoop()
+    QTimer.singleShot(int(duration_s * 1000), event_loop.quit)
+    event_loop.exec_()
+
+
+def get_peak_rss_bytes():
+    try:
+        import resource
+    except ImportError:
+        # The resource module is only available on Unix
+        return 0
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports the peak RSS in kilobytes, macOS in bytes
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def _parse_arguments():
+    """
+    Parse the command arguments.
+
+    Returns
+    -------
+    The command arguments as a dictionary : dict
+    """
+    parser = ArgParser(description="Benchmark the charting hot paths with synthetic PVs, and compare the results "
+                                   "with a baseline.")
+    parser.add_argument("--pvs", type=int, default=DEFAULT_PV_COUNT,
+                        help="The number of synthetic PVs (default: %(default)s)")
+    parser.add_argument("--rate-hz", type=float, default=DEFAULT_RATE_HZ,
+                        help="The number of values each PV sends per second (default: %(default)s)")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION_S,
+                        help="How long to stream the values in each sampling mode, in seconds (default: %(default)s)")
+    parser.add_argument("--nan-fraction", type=float, default=0.0,
+                        help="The fraction of the values replaced with NaN (default: %(default)s)")
+    parser.add_argument("--disconnect-fraction", type=float, default=0.0,
+                        help="The fraction of the time each PV is disconnected (default: %(default)s)")
+    parser.add_argument("--update-curve-data-rounds", type=int, default=DEFAULT_UPDATE_CURVE_DATA_ROUNDS,
+                        help="How many times update_curve_data is called for every curve (default: %(default)s)")
+    parser.add_argument("--baseline", metavar="BASELINE_JSON",
+                        help="Compare the results with a baseline saved by --save-baseline, and exit with an error "
+                             "if any metric regressed")
+    parser.add_argument("--save-baseline", metavar="BASELINE_JSON",
+                        help="Save the results as a baseline for later runs")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="How much worse than the baseline a metric may get before it is reported as a "
+                             "regression, as a fraction of the baseline value (default: %(default)s)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+import time
+
+import numpy as np
+
+from qtpy.QtCore import QObject, QTimer
+
+from ingestion.sources import SyntheticSource
+
+# The protocol of the synthetic PV addresses. The PVs are never connected through PyDM, so any protocol would do
+SYNTHETIC_PV_PROTOCOL = "ca://"
+SYNTHETIC_PV_NAME_FORMAT = "BENCHMARK:PV:{0:05d}"
+
+DEFAULT_POLL_INTERVAL_MS = 20
+
+
+def synthetic_pv_addresses(count):
+    return [SYNTHETIC_PV_PROTOCOL + SYNTHETIC_PV_NAME_FORMAT.format(i) for i in range(count)]
+
+
+class SyntheticPvFeed(QObject):
+    def __init__(self, rate_hz, nan_fraction=0.0, disconnect_fraction=0.0, disconnect_period_s=10.0, seed=0,
+                 poll_interval_ms=DEFAULT_POLL_INTERVAL_MS):
+        """
+        A local stand-in for the PV sources, feeding generated values to the chart curves without any IOC. The feed
+        provides the same interface as the ingestion engine, so that the display creates the curves for it the same
+        way, and it appends the values to the curves on the GUI thread, like the PyDM channels do.
+
+        Parameters
+        ----------
+        rate_hz : float
+            The number of values each PV sends per second
+        nan_fraction : float
+            The fraction of the values replaced with NaN
+        disconnect_fraction : float
+            The fraction of the time each PV is disconnected, i.e. sends no value
+        disconnect_period_s : float
+            The period of the disconnect cycle of each PV, in seconds. The PVs disconnect at staggered times
+        seed : int
+            The seed of the random NaN pattern, so that runs are comparable
+        poll_interval_ms : int
+            How often the due values are generated and appended, in milliseconds
+        """
+        super(SyntheticPvFeed, self).__init__()
+        self.source = SyntheticSource(rate_hz)
+        self.nan_fraction = nan_fraction
+        self.disconnect_fraction = disconnect_fraction
+        self.disconnect_period_s = disconnect_period_s
+        self.random_state = np.random.RandomState(seed)
+
+        self.is_async = True
+        self.sampling_period = 1.0
+        self._next_sampling_time = time.time()
+
+        self.curves = dict()
+        self._slots = dict()
+        self._next_slot = 0
+        self.latest_values = dict()
+
+        self.samples_delivered = 0
+        self.feed_time_s = 0.0
+
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(poll_interval_ms)
+        self.poll_timer.timeout.connect(self.poll)
+
+    def start(self):
+        self.poll_timer.start()
+
+    def stop(self):
+        self.poll_timer.stop()
+
+    def add_curve(self, address, curve):
+        if address not in self._slots:
+            self._slots[address] = self._next_slot
+            self.source.subscribe(self._next_slot, address)
+            self._next_slot += 1
+        self.curves[self._slots[address]] = curve
+        return True
+
+    def remove_curve(self, address, curve):
+        slot = self._slots.get(address)
+        if slot is not None and self.curves.get(slot) is curve:
+            del self._slots[address]
+            self.source.unsubscribe(slot)
+            self.curves.pop(slot, None)
+            self.latest_values.pop(slot, None)
+
+    def configure(self, is_async, sampling_rate_hz):
+        self.is_async = is_async
+        self.sampling_period = 1.0 / sampling_rate_hz
+
+    def is_disconnected(self, slot, now):
+        if not self.disconnect_fraction:
+            return False
+        # Each PV starts its disconnect cycle at a different phase
+        phase = (now / self.disconnect_period_s + slot * 0.618) % 1.0
+        return phase < self.disconnect_fraction
+
+    def poll(self):
+        """
+        Generate the values due since the last poll, and append them to the curves, one block per PV in synchronous
+        mode, or the latest value of every PV at each due sampling tick in asynchronous mode.
+        """
+        start = time.time()
+
+        for slot, timestamps, values in self.source.poll(0):
+            curve = self.curves.get(slot)
+            if curve is None or self.is_disconnected(slot, start):
+                continue
+
+            if self.nan_fraction:
+                values = np.where(self.random_state.random_sample(len(values)) < self.nan_fraction, np.nan, values)
+
+            if self.is_async:
+                self.latest_values[slot] = values[-1]
+            else:
+                curve.appendSamples(timestamps, values)
+                self.samples_delivered += len(values)
+
+        if self.is_async and start >= self._next_sampling_time:
+            for slot, curve in self.curves.items():
+                value = np.nan if self.is_disconnected(slot, start) else self.latest_values.get(slot, np.nan)
+                curve.appendSample(start, value)
+            self.samples_delivered += len(self.curves)
+            self._next_sampling_time = max(self._next_sampling_time + self.sampling_period, start)
+
+        self.feed_time_s += time.time() - start
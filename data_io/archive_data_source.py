@@ -0,0 +1,224 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import math
+import time
+
+import numpy as np
+
+from qtpy.QtCore import QObject, Signal, Slot
+
+from utilities.lru_cache import MemoryBoundedLruCache
+
+from pydmcharting_logging import logging
+logger = logging.getLogger(__name__)
+
+ARCHIVE_PROTOCOL = "archive://"
+
+# The bin sizes the archived data can be fetched at, in seconds, 0 being the raw samples
+RESOLUTIONS_S = (0, 1, 10, 60, 600, 3600, 86400)
+
+# The archived data is fetched and cached in tiles, i.e. fixed time ranges of a fixed number of bins, so that the
+# requests made while panning and zooming map onto the same cache keys
+TILE_BINS = 1000
+RAW_TILE_SPAN_S = 100.0
+
+# At most this many tiles are fetched for a single view
+MAX_TILES_PER_VIEW = 32
+
+DEFAULT_CACHE_SIZE_BYTES = 256 * 1024 * 1024
+FETCH_THREAD_COUNT = 4
+
+# A tile reaching past the time it was fetched is missing the samples archived since, and is fetched again once it is
+# this old
+INCOMPLETE_TILE_TTL_S = 5.0
+
+# A tile whose fetch failed is not requested again before this delay
+FETCH_RETRY_DELAY_S = 10.0
+
+ArchiveTile = namedtuple("ArchiveTile", ("timestamps", "values", "fetched_at", "is_complete"))
+
+
+def tile_size_of(tile):
+    return tile.timestamps.nbytes + tile.values.nbytes
+
+
+def select_resolution(t_span, num_columns):
+    """
+    Pick the coarsest resolution that still provides at least two samples per pixel column.
+
+    Parameters
+    ----------
+    t_span : float
+        The time span of the view, in seconds
+    num_columns : int
+        The number of pixel columns of the view
+
+    Returns
+    -------
+    The resolution, in seconds : float
+    """
+    target_resolution = t_span / (2.0 * max(num_columns, 1))
+    selected_resolution = RESOLUTIONS_S[0]
+    for resolution in RESOLUTIONS_S:
+        if resolution <= target_resolution:
+            selected_resolution = resolution
+    return selected_resolution
+
+
+def get_tile_span(resolution):
+    return resolution * TILE_BINS if resolution > 0 else RAW_TILE_SPAN_S
+
+
+class ArchiveDataSource(QObject):
+    data_ready = Signal(str)
+    fetch_failed = Signal(str, str)
+
+    # Carry the results of the fetches from the worker threads over to the thread owning the data source
+    _tile_fetched = Signal(object, object)
+    _tile_failed = Signal(object, str)
+
+    def __init__(self, archiver=None, max_cache_bytes=DEFAULT_CACHE_SIZE_BYTES, max_workers=FETCH_THREAD_COUNT):
+        """
+        Fetch archived data in the background, and cache it. The data is cached in tiles keyed by PV, resolution, and
+        tile index, i.e. time range, so that returning to a range already seen costs nothing. Concurrent requests for
+        the same tile are coalesced into a single fetch.
+
+        Parameters
+        ----------
+        archiver : object
+            The archiver client, providing the fetch method. By default, the client is created from the
+            PYDM_ARCHIVER_URL environment variable
+        max_cache_bytes : int
+            The maximum memory held by the cached tiles, in bytes
+        max_workers : int
+            The number of threads fetching the tiles
+        """
+        super(ArchiveDataSource, self).__init__()
+        if archiver is None:
+            # The archiver clients pull in the networking modules, which most sessions never need
+            from data_io.archivers import create_archiver
+            archiver = create_archiver()
+        self.archiver = archiver
+        self.cache = MemoryBoundedLruCache(max_cache_bytes, tile_size_of)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+
+        self._in_flight = dict()
+        self._failed_at = dict()
+
+        self._tile_fetched.connect(self._handle_tile_fetched)
+        self._tile_failed.connect(self._handle_tile_failed)
+
+    def get_data(self, pv_name, t_min, t_max, num_columns):
+        """
+        Get the archived data of a PV within a time range, from the cache. The tiles not cached yet are requested in
+        the background, and data_ready is emitted as they arrive. Meanwhile, the tiles are filled in from a coarser
+        resolution, if cached.
+
+        Parameters
+        ----------
+        pv_name : str
+            The name of the PV, without the protocol
+        t_min : float
+            The start of the time range, as a timestamp
+        t_max : float
+            The end of the time range, as a timestamp
+        num_columns : int
+            The number of pixel columns the data is drawn onto
+
+        Returns
+        -------
+        The timestamps and the values of the samples available : tuple
+        """
+        resolution = select_resolution(t_max - t_min, num_columns)
+        tile_span = get_tile_span(resolution)
+        last_index = int(math.floor(t_max / tile_span))
+        first_index = max(int(math.floor(t_min / tile_span)), last_index - MAX_TILES_PER_VIEW + 1)
+
+        tiles = list()
+        for index in range(first_index, last_index + 1):
+            key = (pv_name, resolution, index)
+            tile = self.cache.get(key)
+            if tile is None or self._is_stale(tile):
+                self._request(key)
+            if tile is None:
+                tile = self._find_coarser_tile(pv_name, resolution, index)
+            if tile is not None:
+                tiles.append(tile)
+
+        if not tiles:
+            return np.zeros(0), np.zeros(0)
+        return np.concatenate([tile.timestamps for tile in tiles]), np.concatenate([tile.values for tile in tiles])
+
+    def clear(self):
+        self.cache.clear()
+        self._failed_at.clear()
+
+    def shutdown(self):
+        """
+        Stop accepting requests. The fetches in progress complete in the background.
+        """
+        self.executor.shutdown(wait=False)
+
+    def _is_stale(self, tile):
+        return not tile.is_complete and time.time() - tile.fetched_at > INCOMPLETE_TILE_TTL_S
+
+    def _request(self, key):
+        if key in self._in_flight:
+            # Coalesce with the fetch already in progress
+            return
+        if time.time() - self._failed_at.get(key, -FETCH_RETRY_DELAY_S) < FETCH_RETRY_DELAY_S:
+            return
+
+        future = self.executor.submit(self._fetch, key)
+        self._in_flight[key] = future
+        future.add_done_callback(partial(self._handle_future_done, key))
+
+    def _fetch(self, key):
+        pv_name, resolution, index = key
+        tile_span = get_tile_span(resolution)
+        t_start = index * tile_span
+        t_stop = t_start + tile_span
+
+        fetched_at = time.time()
+        timestamps, values = self.archiver.fetch(pv_name, t_start, t_stop, resolution)
+        return ArchiveTile(timestamps, values, fetched_at, t_stop <= fetched_at)
+
+    def _handle_future_done(self, key, future):
+        # Runs on the worker thread
+        error = future.exception()
+        if error is not None:
+            self._tile_failed.emit(key, str(error))
+        else:
+            self._tile_fetched.emit(key, future.result())
+
+    @Slot(object, object)
+    def _handle_tile_fetched(self, key, tile):
+        self._in_flight.pop(key, None)
+        self._failed_at.pop(key, None)
+        self.cache.put(key, tile)
+        self.data_ready.emit(key[0])
+
+    @Slot(object, str)
+    def _handle_tile_failed(self, key, message):
+        self._in_flight.pop(key, None)
+        self._failed_at[key] = time.time()
+        logger.error("Cannot fetch the archived data of '{0}'. Exception: {1}".format(key[0], message))
+        self.fetch_failed.emit(key[0], message)
+
+    def _find_coarser_tile(self, pv_name, resolution, index):
+        tile_span = get_tile_span(resolution)
+        t_start = index * tile_span
+        t_stop = t_start + tile_span
+
+        for coarser_resolution in RESOLUTIONS_S:
+            if coarser_resolution <= resolution:
+                continue
+
+            coarser_index = int(math.floor(t_start / get_tile_span(coarser_resolution)))
+            tile = self.cache.get((pv_name, coarser_resolution, coarser_index))
+            if tile is not None:
+                start = np.searchsorted(tile.timestamps, t_start)
+                stop = np.searchsorted(tile.timestamps, t_stop)
+                return ArchiveTile(tile.timestamps[start:stop], tile.values[start:stop], tile.fetched_at, False)
+        return None
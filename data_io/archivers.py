@@ -0,0 +1,147 @@
+import datetime
+import json
+import math
+import os
+import time
+import zlib
+
+import numpy as np
+from six.moves.urllib.parse import urlencode
+from six.moves.urllib.request import urlopen
+
+from pydmcharting_logging import logging
+logger = logging.getLogger(__name__)
+
+ARCHIVER_URL_ENV_VAR = "PYDM_ARCHIVER_URL"
+ARCHIVER_RETRIEVAL_PATH = "/retrieval/data/getData.json"
+ARCHIVER_TIMEOUT_S = 30
+
+# The sampling period of the raw data generated by the stub archiver
+STUB_RAW_PERIOD_S = 0.1
+
+
+class StubArchiver:
+    def __init__(self, delay_s=0.0, raw_period_s=STUB_RAW_PERIOD_S):
+        """
+        A local archiver generating a deterministic signal for each PV, for testing the archive data layer without
+        an archiver server.
+
+        Parameters
+        ----------
+        delay_s : float
+            How long each fetch blocks, to mimic the latency of a server
+        raw_period_s : float
+            The sampling period of the raw data
+        """
+        self.delay_s = delay_s
+        self.raw_period_s = raw_period_s
+        self.fetch_count = 0
+
+    def fetch(self, pv_name, t_start, t_stop, resolution):
+        """
+        Get the archived samples of a PV within a time range.
+
+        Parameters
+        ----------
+        pv_name : str
+            The name of the PV, without the protocol
+        t_start : float
+            The start of the time range, as a timestamp
+        t_stop : float
+            The end of the time range, as a timestamp
+        resolution : float
+            The period of the samples to return, in seconds, or 0 for the raw samples
+
+        Returns
+        -------
+        The timestamps and the values of the samples : tuple
+        """
+        self.fetch_count += 1
+        if self.delay_s:
+            time.sleep(self.delay_s)
+
+        period = resolution if resolution > 0 else self.raw_period_s
+        timestamps = np.arange(math.ceil(t_start / period) * period, min(t_stop, time.time()), period)
+
+        # Each PV gets its own amplitude and period
+        seed = zlib.crc32(pv_name.encode("utf-8")) & 0xffffffff
+        amplitude = 1.0 + seed % 10
+        signal_period = 60.0 * (1 + (seed >> 8) % 60)
+        values = amplitude * np.sin(2 * np.pi * timestamps / signal_period) + 0.1 * np.sin(timestamps * 7.1)
+        return timestamps, values
+
+
+class ApplianceArchiver:
+    def __init__(self, url):
+        """
+        A client of the EPICS Archiver Appliance retrieval service.
+
+        Parameters
+        ----------
+        url : str
+            The base URL of the archiver, e.g. http://archiver.example.com
+        """
+        self.url = url.rstrip("/")
+
+    def fetch(self, pv_name, t_start, t_stop, resolution):
+        """
+        Get the archived samples of a PV within a time range. With a resolution, the archiver averages the samples
+        over bins of that many seconds.
+
+        Parameters
+        ----------
+        pv_name : str
+            The name of the PV, without the protocol
+        t_start : float
+            The start of the time range, as a timestamp
+        t_stop : float
+            The end of the time range, as a timestamp
+        resolution : float
+            The bin size in seconds, or 0 for the raw samples
+
+        Returns
+        -------
+        The timestamps and the values of the samples : tuple
+        """
+        if resolution >= 1:
+            pv_name = "mean_{0}({1})".format(int(resolution), pv_name)
+
+        query = urlencode((("pv", pv_name), ("from", ApplianceArchiver._format_time(t_start)),
+                           ("to", ApplianceArchiver._format_time(t_stop))))
+        response = urlopen("{0}{1}?{2}".format(self.url, ARCHIVER_RETRIEVAL_PATH, query), timeout=ARCHIVER_TIMEOUT_S)
+        try:
+            payload = json.loads(response.read().decode("utf-8"))
+        finally:
+            response.close()
+
+        timestamps = list()
+        values = list()
+        for stream in payload:
+            for sample in stream.get("data", []):
+                value = sample.get("val")
+                if isinstance(value, (int, float)):
+                    timestamps.append(sample["secs"] + sample.get("nanos", 0) * 1e-9)
+                    values.append(value)
+        return np.array(timestamps, dtype=float), np.array(values, dtype=float)
+
+    @staticmethod
+    def _format_time(timestamp):
+        return datetime.datetime.utcfromtimestamp(timestamp).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def create_archiver():
+    """
+    Create the archiver client for the URL set in the PYDM_ARCHIVER_URL environment variable, or a stub archiver if
+    the variable is not set.
+
+    Returns
+    -------
+    An object providing the fetch method : ApplianceArchiver or StubArchiver
+    """
+    url = os.getenv(ARCHIVER_URL_ENV_VAR)
+    if url:
+        return ApplianceArchiver(url)
+
+    logger.warning("{0} is not set. The archive:// curves will show the data of the stub archiver."
+                   .format(ARCHIVER_URL_ENV_VAR))
+    return StubArchiver()
@@ -0,0 +1,457 @@
+import math
+import os
+import time
+
+import numpy as np
+
+from pyqtgraph.functions import arrayToQPath
+from qtpy.QtCore import Qt, QObject, QPointF, QRectF, Signal, Slot
+from qtpy.QtGui import QColor, QFont, QImage, QPainter, QPen
+
+from utilities.decimation import minmax_decimate
+from utilities.png_writer import PngStripWriter
+
+from pydmcharting_logging import logging
+logger = logging.getLogger(__name__)
+
+PNG_FORMAT = "png"
+JPEG_FORMAT = "jpg"
+IMAGE_FORMATS = (PNG_FORMAT, JPEG_FORMAT)
+
+JPEG_QUALITY = 95
+
+# PNG images with more pixels than this are rendered and written in horizontal strips of at most STRIP_PIXELS pixels,
+# so that the memory used does not depend on the image size
+MAX_UNTILED_PIXELS = 4096 * 4096
+STRIP_PIXELS = 1024 * 1024
+
+# The fonts, lines, and margins are scaled with the image, relative to this size
+REFERENCE_IMAGE_WIDTH = 800
+REFERENCE_IMAGE_HEIGHT = 600
+
+FONT_POINT_SIZE = 9
+TITLE_FONT_POINT_SIZE = 12
+MARGIN_LEFT = 70
+MARGIN_RIGHT = 20
+MARGIN_TOP = 15
+MARGIN_TITLE = 30
+MARGIN_BOTTOM = 40
+TICK_LENGTH = 5
+TICK_SPACING = 100
+LEGEND_SAMPLE_LENGTH = 20
+LEGEND_LINE_HEIGHT = 16
+
+
+class ChartImageSnapshot:
+    def __init__(self, main_display, background_color, max_width):
+        """
+        Copy what an image of the chart shows: the view range, the chart settings, and the visible part of the data of
+        every shown curve, at the resolution of the widest image to render. Only this copy is made on the GUI thread;
+        the images are then rendered from it on a worker thread while the curves keep receiving new samples.
+
+        Parameters
+        ----------
+        main_display : PyDMChartingDisplay
+            The main display window owning the chart
+        background_color : QColor
+            The background color of the images
+        max_width : int
+            The width of the widest image to render, in pixels
+        """
+        chart = main_display.chart
+        (self.x_min, self.x_max), (self.y_min, self.y_max) = chart.getViewBox().viewRange()
+        self.plot_by_timestamps = chart._plot_by_timestamps
+        self.title = chart.getPlotTitle()
+        self.background_color = QColor(background_color)
+        self.axis_color = QColor(chart.getAxisColor())
+        self.show_x_grid = chart.getShowXGrid()
+        self.show_y_grid = chart.getShowYGrid()
+        self.grid_alpha = main_display.grid_opacity_slr.value() / 10.0
+        self.show_legend = chart.getShowLegend()
+
+        self.curves = list()
+        for curve_name, curve in main_display.channel_map.items():
+            if not curve.isVisible():
+                continue
+            x, y = curve.getDataInRange(self.x_min, self.x_max, max_width)
+            self.curves.append(dict(name=curve_name.split("://")[-1], color=QColor(curve.color),
+                                    line_width=curve.lineWidth, line_style=curve.lineStyle, symbol=curve.symbol,
+                                    symbol_size=curve.symbolSize, x=x, y=y))
+
+
+class ChartImageRenderer:
+    def __init__(self, snapshot, width, height, antialias=True):
+        """
+        Paint a chart snapshot onto images of a given size, as a whole or in horizontal strips. Only QImage and
+        QPainter are used, which are safe to use outside of the GUI thread.
+
+        Parameters
+        ----------
+        snapshot : ChartImageSnapshot
+            The chart data and settings to paint
+        width : int
+            The width of the image, in pixels
+        height : int
+            The height of the image, in pixels
+        antialias : bool
+            True to antialias the lines and the text
+        """
+        self.snapshot = snapshot
+        self.width = width
+        self.height = height
+        self.antialias = antialias
+
+        self.scale = max(min(float(width) / REFERENCE_IMAGE_WIDTH, float(height) / REFERENCE_IMAGE_HEIGHT), 1.0)
+        top = MARGIN_TOP + (MARGIN_TITLE if snapshot.title else 0)
+        self.plot_rect = QRectF(MARGIN_LEFT * self.scale, top * self.scale,
+                                max(width - (MARGIN_LEFT + MARGIN_RIGHT) * self.scale, 1.0),
+                                max(height - (top + MARGIN_BOTTOM) * self.scale, 1.0))
+
+        self.x_ticks = get_tick_values(snapshot.x_min, snapshot.x_max,
+                                       self.plot_rect.width() / (TICK_SPACING * self.scale))
+        self.y_ticks = get_tick_values(snapshot.y_min, snapshot.y_max,
+                                       self.plot_rect.height() / (TICK_SPACING * self.scale))
+        self.curve_paths = [self._build_curve_path(curve) for curve in snapshot.curves]
+
+    def map_x(self, x):
+        snapshot = self.snapshot
+        return self.plot_rect.left() + (x - snapshot.x_min) / (snapshot.x_max - snapshot.x_min) * \
+            self.plot_rect.width()
+
+    def map_y(self, y):
+        snapshot = self.snapshot
+        return self.plot_rect.top() + (snapshot.y_max - y) / (snapshot.y_max - snapshot.y_min) * \
+            self.plot_rect.height()
+
+    def _build_curve_path(self, curve):
+        x, y = minmax_decimate(curve["x"], curve["y"], self.plot_rect.width())
+        if len(x) < 1:
+            return None, None
+        px = self.map_x(x)
+        py = self.map_y(y)
+        return arrayToQPath(px, py, connect="finite"), (px, py)
+
+    def render(self, painter, top_row=0, row_count=None):
+        """
+        Paint the rows of the image starting at top_row onto a painter whose device is row_count rows high.
+
+        Parameters
+        ----------
+        painter : QPainter
+            The painter, active on an image of the width of the whole image
+        top_row : int
+            The first row of the image to paint
+        row_count : int
+            The number of rows to paint, or None for all the rows
+        """
+        if row_count is None:
+            row_count = self.height - top_row
+
+        painter.setRenderHint(QPainter.Antialiasing, self.antialias)
+        painter.setRenderHint(QPainter.TextAntialiasing, self.antialias)
+        painter.translate(0, -top_row)
+        painter.setClipRect(QRectF(0, top_row, self.width, row_count))
+        painter.fillRect(QRectF(0, top_row, self.width, row_count), self.snapshot.background_color)
+
+        self._paint_grid(painter)
+        self._paint_curves(painter)
+        self._paint_axes(painter)
+        self._paint_title(painter)
+        self._paint_legend(painter)
+
+    def _make_pen(self, color, width, style=Qt.SolidLine):
+        pen = QPen(color)
+        pen.setWidthF(width * self.scale)
+        pen.setStyle(style)
+        return pen
+
+    def _make_font(self, point_size):
+        font = QFont()
+        font.setPixelSize(max(int(point_size * 4 / 3.0 * self.scale), 1))
+        return font
+
+    def _paint_grid(self, painter):
+        snapshot = self.snapshot
+        grid_color = QColor(snapshot.axis_color)
+        grid_color.setAlphaF(min(max(snapshot.grid_alpha, 0.0), 1.0))
+        painter.setPen(self._make_pen(grid_color, 1))
+
+        rect = self.plot_rect
+        if snapshot.show_x_grid:
+            for x in self.x_ticks:
+                px = self.map_x(x)
+                painter.drawLine(QPointF(px, rect.top()), QPointF(px, rect.bottom()))
+        if snapshot.show_y_grid:
+            for y in self.y_ticks:
+                py = self.map_y(y)
+                painter.drawLine(QPointF(rect.left(), py), QPointF(rect.right(), py))
+
+    def _paint_curves(self, painter):
+        painter.save()
+        painter.setClipRect(self.plot_rect, Qt.IntersectClip)
+        for curve, (path, points) in zip(self.snapshot.curves, self.curve_paths):
+            if path is None:
+                continue
+            painter.setPen(self._make_pen(curve["color"], curve["line_width"], curve["line_style"]))
+            painter.setBrush(Qt.NoBrush)
+            painter.drawPath(path)
+
+            if curve["symbol"] is not None:
+                # The symbols are drawn as circles, whatever their shape on the chart
+                radius = curve["symbol_size"] * self.scale / 2.0
+                painter.setPen(self._make_pen(curve["color"], 1))
+                painter.setBrush(curve["color"])
+                for px, py in zip(*points):
+                    if np.isfinite(py):
+                        painter.drawEllipse(QPointF(px, py), radius, radius)
+        painter.restore()
+
+    def _paint_axes(self, painter):
+        snapshot = self.snapshot
+        rect = self.plot_rect
+        tick_length = TICK_LENGTH * self.scale
+        painter.setPen(self._make_pen(snapshot.axis_color, 1))
+        painter.setBrush(Qt.NoBrush)
+        painter.setFont(self._make_font(FONT_POINT_SIZE))
+        painter.drawRect(rect)
+
+        label_width = TICK_SPACING * self.scale
+        label_height = painter.fontMetrics().height()
+        for x in self.x_ticks:
+            px = self.map_x(x)
+            painter.drawLine(QPointF(px, rect.bottom()), QPointF(px, rect.bottom() + tick_length))
+            painter.drawText(QRectF(px - label_width / 2.0, rect.bottom() + tick_length, label_width, label_height),
+                             Qt.AlignHCenter | Qt.AlignTop, self._format_x(x))
+
+        for y in self.y_ticks:
+            py = self.map_y(y)
+            painter.drawLine(QPointF(rect.left() - tick_length, py), QPointF(rect.left(), py))
+            painter.drawText(QRectF(0, py - label_height / 2.0, rect.left() - 2 * tick_length, label_height),
+                             Qt.AlignRight | Qt.AlignVCenter, format_tick_value(y))
+
+    def _paint_title(self, painter):
+        if not self.snapshot.title:
+            return
+        painter.setPen(self._make_pen(self.snapshot.axis_color, 1))
+        painter.setFont(self._make_font(TITLE_FONT_POINT_SIZE))
+        painter.drawText(QRectF(0, 0, self.width, self.plot_rect.top()), Qt.AlignCenter, self.snapshot.title)
+
+    def _paint_legend(self, painter):
+        if not self.snapshot.show_legend:
+            return
+
+        painter.setFont(self._make_font(FONT_POINT_SIZE))
+        line_height = LEGEND_LINE_HEIGHT * self.scale
+        sample_length = LEGEND_SAMPLE_LENGTH * self.scale
+        left = self.plot_rect.left() + line_height
+        top = self.plot_rect.top() + line_height / 2.0
+        for curve in self.snapshot.curves:
+            if top + line_height > self.plot_rect.bottom():
+                # The names that do not fit in the plot are left out
+                break
+            middle = top + line_height / 2.0
+            painter.setPen(self._make_pen(curve["color"], curve["line_width"], curve["line_style"]))
+            painter.drawLine(QPointF(left, middle), QPointF(left + sample_length, middle))
+            painter.setPen(self._make_pen(curve["color"], 1))
+            painter.drawText(QRectF(left + sample_length + line_height / 2.0, top, self.plot_rect.width(),
+                                    line_height), Qt.AlignLeft | Qt.AlignVCenter, curve["name"])
+            top += line_height
+
+    def _format_x(self, x):
+        if self.snapshot.plot_by_timestamps:
+            return time.strftime("%H:%M:%S", time.localtime(x))
+        return format_tick_value(x)
+
+
+def get_tick_values(value_min, value_max, max_count):
+    """
+    Get evenly spaced tick values at round numbers, i.e. multiples of 1, 2, or 5 times a power of ten.
+
+    Parameters
+    ----------
+    value_min : float
+        The start of the axis range
+    value_max : float
+        The end of the axis range
+    max_count : float
+        The maximum number of ticks
+
+    Returns
+    -------
+    The tick values within the range : list
+    """
+    span = value_max - value_min
+    if not span > 0 or max_count < 1:
+        return []
+
+    raw_step = span / max_count
+    magnitude = 10 ** math.floor(math.log10(raw_step))
+    step = 10 * magnitude
+    for factor in (1, 2, 5):
+        if factor * magnitude >= raw_step:
+            step = factor * magnitude
+            break
+
+    first_index = int(math.ceil(value_min / step))
+    last_index = int(math.floor(value_max / step))
+    return [index * step for index in range(first_index, last_index + 1)]
+
+
+def format_tick_value(value):
+    return "{0:g}".format(round(value, 9))
+
+
+def get_image_outputs(filename, sizes, image_formats):
+    """
+    Get the files to write for a batch of image sizes and formats. With several sizes, each file name gets the size
+    as a suffix; each format gets its own extension.
+
+    Parameters
+    ----------
+    filename : str
+        The path chosen for the image, with or without an extension
+    sizes : list
+        The (width, height) of each image
+    image_formats : list
+        The formats to write each image in, among IMAGE_FORMATS
+
+    Returns
+    -------
+    The (filename, width, height, format) of each image : list
+    """
+    base_name = os.path.splitext(filename)[0]
+    outputs = list()
+    for width, height in sizes:
+        size_suffix = "_{0}x{1}".format(width, height) if len(sizes) > 1 else ""
+        for image_format in image_formats:
+            outputs.append(("{0}{1}.{2}".format(base_name, size_suffix, image_format), width, height, image_format))
+    return outputs
+
+
+def get_rgb_rows(image):
+    """
+    Get the pixels of an RGB888 image as a (height, width * 3) array, without the padding at the end of each line.
+    """
+    bits = image.constBits()
+    if hasattr(bits, "setsize"):
+        # PyQt returns a pointer without a size
+        bits.setsize(image.bytesPerLine() * image.height())
+    rows = np.frombuffer(bits, dtype=np.uint8).reshape(image.height(), image.bytesPerLine())
+    return rows[:, :image.width() * 3]
+
+
+class ChartImageExporter(QObject):
+    progress_changed = Signal(int)
+    export_finished = Signal(str)
+    export_failed = Signal(str)
+
+    def __init__(self, snapshot, outputs, antialias=True):
+        """
+        Render a chart snapshot to image files, meant to be moved to a worker thread. Large PNG images are rendered
+        and written strip by strip. The progress is reported as a percentage, and the export can be cancelled
+        between two strips, in which case the files of the batch are removed.
+
+        Parameters
+        ----------
+        snapshot : ChartImageSnapshot
+            The chart data and settings to render
+        outputs : list
+            The (filename, width, height, format) of each image, as returned by get_image_outputs
+        antialias : bool
+            True to antialias the lines and the text
+        """
+        super(ChartImageExporter, self).__init__()
+        self.snapshot = snapshot
+        self.outputs = outputs
+        self.antialias = antialias
+        self._is_cancelled = False
+        self._step_count = sum(self._get_strip_count(width, height, image_format)
+                               for _, width, height, image_format in outputs)
+        self._steps_done = 0
+
+    def cancel(self):
+        """
+        Stop the export at the next strip boundary. The files written so far are removed.
+        """
+        self._is_cancelled = True
+
+    @Slot()
+    def run(self):
+        written_files = list()
+        try:
+            for filename, width, height, image_format in self.outputs:
+                written_files.append(filename)
+                renderer = ChartImageRenderer(self.snapshot, width, height, antialias=self.antialias)
+                if self._get_strip_count(width, height, image_format) > 1:
+                    completed = self._write_strips(renderer, filename)
+                else:
+                    completed = self._write_image(renderer, filename, image_format)
+                if not completed:
+                    self._remove_files(written_files)
+                    self.export_failed.emit("The export was cancelled.")
+                    return
+        except (IOError, OSError, ValueError) as error:
+            logger.error("Cannot export the chart image to '{0}'. Exception: {1}".format(written_files[-1], error))
+            self._remove_files(written_files)
+            self.export_failed.emit(str(error))
+            return
+
+        self.progress_changed.emit(100)
+        self.export_finished.emit(self.outputs[0][0] if self.outputs else "")
+
+    @staticmethod
+    def _get_strip_count(width, height, image_format):
+        if image_format != PNG_FORMAT or width * height <= MAX_UNTILED_PIXELS:
+            return 1
+        strip_height = max(STRIP_PIXELS // width, 1)
+        return (height + strip_height - 1) // strip_height
+
+    def _write_image(self, renderer, filename, image_format):
+        if self._is_cancelled:
+            return False
+
+        image = QImage(renderer.width, renderer.height, QImage.Format_RGB32)
+        painter = QPainter(image)
+        try:
+            renderer.render(painter)
+        finally:
+            painter.end()
+
+        quality = JPEG_QUALITY if image_format == JPEG_FORMAT else -1
+        if not image.save(filename, image_format.upper(), quality):
+            raise IOError("Cannot write the image to '{0}'.".format(filename))
+        self._report_step()
+        return True
+
+    def _write_strips(self, renderer, filename):
+        strip_height = max(STRIP_PIXELS // renderer.width, 1)
+        with open(filename, "wb") as png_file:
+            png_writer = PngStripWriter(png_file, renderer.width, renderer.height)
+            for top_row in range(0, renderer.height, strip_height):
+                if self._is_cancelled:
+                    return False
+
+                row_count = min(strip_height, renderer.height - top_row)
+                strip = QImage(renderer.width, row_count, QImage.Format_RGB888)
+                painter = QPainter(strip)
+                try:
+                    renderer.render(painter, top_row, row_count)
+                finally:
+                    painter.end()
+
+                png_writer.write_rows(get_rgb_rows(strip))
+                self._report_step()
+            png_writer.close()
+        return True
+
+    def _report_step(self):
+        self._steps_done += 1
+        self.progress_changed.emit(int(100 * self._steps_done / max(self._step_count, 1)))
+
+    @staticmethod
+    def _remove_files(filenames):
+        for filename in filenames:
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
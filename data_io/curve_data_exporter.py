@@ -0,0 +1,154 @@
+import os
+import zipfile
+
+import numpy as np
+
+from qtpy.QtCore import QObject, Signal, Slot
+
+from pydmcharting_logging import logging
+logger = logging.getLogger(__name__)
+
+CSV_FORMAT = "csv"
+NPZ_FORMAT = "npz"
+SUPPORTED_FORMATS = (CSV_FORMAT, NPZ_FORMAT)
+
+# The number of rows written to a CSV file at a time
+EXPORT_BLOCK_SIZE = 65536
+
+CSV_TIMESTAMP_FORMAT = "%.6f"
+CSV_VALUE_FORMAT = "%.10g"
+
+
+def snapshot_curve_data(main_display):
+    """
+    Copy the data of all the curves, so that the export can run on a worker thread while the curves keep receiving
+    new samples. Only a block copy of each ring buffer is done on the GUI thread.
+
+    Parameters
+    ----------
+    main_display : PyDMChartingDisplay
+        The main display window owning the curves
+
+    Returns
+    -------
+    A list of (curve name, timestamps, values) tuples : list
+    """
+    curves_data = list()
+    for pv_name, curve in main_display.channel_map.items():
+        data = curve.ring_buffer.to_array()
+        curves_data.append((pv_name, data[0], data[1]))
+    return curves_data
+
+
+class CurveDataExporter(QObject):
+    progress_changed = Signal(int)
+    export_finished = Signal(str)
+    export_failed = Signal(str)
+
+    def __init__(self, curves_data, filename, file_format=CSV_FORMAT):
+        """
+        Write the curve data to a file in blocks, meant to be moved to a worker thread. The progress is reported as a
+        percentage, and the export can be cancelled at any block boundary.
+
+        Parameters
+        ----------
+        curves_data : list
+            The (curve name, timestamps, values) tuples to export, as returned by snapshot_curve_data
+        filename : str
+            The path of the file to write
+        file_format : str
+            CSV_FORMAT for a CSV file with a timestamp and a value column per curve, or NPZ_FORMAT for a NumPy
+            archive holding the timestamps and values of each curve as contiguous arrays
+        """
+        super(CurveDataExporter, self).__init__()
+        if file_format not in SUPPORTED_FORMATS:
+            raise ValueError("Unsupported export format: '{0}'".format(file_format))
+
+        self.curves_data = curves_data
+        self.filename = filename
+        self.file_format = file_format
+        self._is_cancelled = False
+
+    def cancel(self):
+        """
+        Stop the export at the next block boundary. The partially written file is removed.
+        """
+        self._is_cancelled = True
+
+    @Slot()
+    def run(self):
+        try:
+            if self.file_format == CSV_FORMAT:
+                completed = self._write_csv()
+            else:
+                completed = self._write_npz()
+        except (IOError, OSError) as error:
+            logger.error("Cannot export the curve data to '{0}'. Exception: {1}".format(self.filename, error))
+            self._remove_partial_file()
+            self.export_failed.emit(str(error))
+            return
+
+        if completed:
+            self.export_finished.emit(self.filename)
+        else:
+            self._remove_partial_file()
+            self.export_failed.emit("The export was cancelled.")
+
+    def _write_csv(self):
+        num_rows = max([len(timestamps) for _, timestamps, _ in self.curves_data] or [0])
+        num_curves = len(self.curves_data)
+
+        header = ",".join(["{0} Timestamp,{0} Value".format(name) for name, _, _ in self.curves_data])
+        row_format = [CSV_TIMESTAMP_FORMAT, CSV_VALUE_FORMAT] * num_curves
+
+        with open(self.filename, "w") as csv_file:
+            csv_file.write(header + "\n")
+
+            for block_start in range(0, num_rows, EXPORT_BLOCK_SIZE):
+                if self._is_cancelled:
+                    return False
+
+                block_stop = min(block_start + EXPORT_BLOCK_SIZE, num_rows)
+
+                # The curves shorter than the longest one are padded with NaN
+                block = np.full((block_stop - block_start, 2 * num_curves), np.nan)
+                for i, (_, timestamps, values) in enumerate(self.curves_data):
+                    curve_rows = max(min(block_stop, len(timestamps)) - block_start, 0)
+                    block[:curve_rows, 2 * i] = timestamps[block_start:block_start + curve_rows]
+                    block[:curve_rows, 2 * i + 1] = values[block_start:block_start + curve_rows]
+
+                np.savetxt(csv_file, block, fmt=row_format, delimiter=",")
+                self.progress_changed.emit(int(100 * block_stop / num_rows))
+
+        self.progress_changed.emit(100)
+        return True
+
+    def _write_npz(self):
+        num_curves = len(self.curves_data)
+        names = np.array([name for name, _, _ in self.curves_data])
+
+        # Write the archive entry by entry, as numpy.savez would, to report the progress and check for cancellation
+        with zipfile.ZipFile(self.filename, "w", allowZip64=True) as npz_file:
+            self._write_npz_entry(npz_file, "names", names)
+
+            for i, (_, timestamps, values) in enumerate(self.curves_data):
+                if self._is_cancelled:
+                    return False
+
+                self._write_npz_entry(npz_file, "timestamps_{0}".format(i), timestamps)
+                self._write_npz_entry(npz_file, "values_{0}".format(i), values)
+                self.progress_changed.emit(int(100 * (i + 1) / num_curves))
+
+        self.progress_changed.emit(100)
+        return True
+
+    @staticmethod
+    def _write_npz_entry(npz_file, key, array):
+        with npz_file.open(key + ".npy", "w", force_zip64=True) as entry:
+            np.lib.format.write_array(entry, np.ascontiguousarray(array), allow_pickle=False)
+
+    def _remove_partial_file(self):
+        try:
+            os.remove(self.filename)
+        except OSError:
+            pass
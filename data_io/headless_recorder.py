@@ -0,0 +1,163 @@
+from setup_paths import setup_paths
+setup_paths()
+
+from functools import partial
+import signal
+import time
+
+import numpy as np
+
+from qtpy.QtCore import QObject, QCoreApplication, QTimer
+
+from pydm.data_plugins import plugin_for_address
+from pydm.widgets.channel import PyDMChannel
+
+from data_io.recording import RecordingWriter, DEFAULT_SEGMENT_SIZE_BYTES
+from data_io.settings_importer import read_settings, ASYNC_DATA_SAMPLING
+from data_io.settings_schema import upgrade_settings, CHART_SETTINGS_FIELDS
+from utilities.sampling import get_due_sample_times, get_sampling_timer_interval
+
+from pydmcharting_logging import logging
+logger = logging.getLogger(__name__)
+
+# How often the buffered samples are written out, so that little is lost if the process is killed
+FLUSH_INTERVAL_MS = 1000
+
+# How often the Python interpreter gets control back from the Qt event loop, to handle the termination signals
+SIGNAL_CHECK_INTERVAL_MS = 200
+
+
+class HeadlessRecorder(QObject):
+    def __init__(self, settings, output_directory, segment_size_bytes=DEFAULT_SEGMENT_SIZE_BYTES, max_segments=0):
+        """
+        Subscribe to the PVs of a settings file and stream their samples to rolling binary files, without any widget.
+        The samples are taken as in the chart: every value received in synchronous mode, or the latest value of every
+        PV at each tick of the sampling timer in asynchronous mode.
+
+        Parameters
+        ----------
+        settings : dict
+            The settings, as read by read_settings and upgraded to the current format
+        output_directory : str
+            The directory to write the recording to
+        segment_size_bytes : int
+            The size a segment file is allowed to reach before the next one is started
+        max_segments : int
+            The maximum number of segment files to keep, or 0 to keep them all
+        """
+        super(HeadlessRecorder, self).__init__()
+        self.writer = RecordingWriter(output_directory, settings, segment_size_bytes=segment_size_bytes,
+                                      max_segments=max_segments)
+        self.addresses = [pv_settings["y_channel"] for pv_settings in settings["pvs"].values()]
+
+        chart_settings = settings.get("chart_settings", dict())
+        self.is_async = chart_settings.get("data_sampling_mode", ASYNC_DATA_SAMPLING) == ASYNC_DATA_SAMPLING
+        self.latest_values = np.full(len(self.addresses), np.nan)
+        self.pv_indices = np.arange(len(self.addresses))
+
+        self.channels = list()
+        for i, address in enumerate(self.addresses):
+            self.channels.append(PyDMChannel(address=address, value_slot=partial(self.handle_new_value, i)))
+
+        # The chart settings are empty in the files exported without them
+        default_update_interval_hz = CHART_SETTINGS_FIELDS["update_interval_hz"][1]
+        self.sampling_period = 1.0 / chart_settings.get("update_interval_hz", default_update_interval_hz)
+        self.next_sample_time = time.time()
+
+        self.sampling_timer = QTimer(self)
+        self.sampling_timer.setInterval(get_sampling_timer_interval(self.sampling_period))
+        self.sampling_timer.timeout.connect(self.sample)
+
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setInterval(FLUSH_INTERVAL_MS)
+        self.flush_timer.timeout.connect(self.writer.flush)
+
+    def start(self):
+        for channel in self.channels:
+            plugin = plugin_for_address(channel.address)
+            if plugin:
+                plugin.add_connection(channel)
+            else:
+                logger.error("Cannot record '{0}': no data plugin handles its protocol.".format(channel.address))
+
+        if self.is_async:
+            self.next_sample_time = time.time()
+            self.sampling_timer.start()
+        self.flush_timer.start()
+        logger.info("Recording {0} PVs to '{1}'.".format(len(self.channels), self.writer.directory))
+
+    def stop(self):
+        self.sampling_timer.stop()
+        self.flush_timer.stop()
+        for channel in self.channels:
+            plugin = plugin_for_address(channel.address)
+            if plugin:
+                plugin.remove_connection(channel)
+        self.writer.close()
+        logger.info("Recording stopped. The manifest is '{0}'.".format(self.writer.manifest_path))
+
+    def handle_new_value(self, pv_index, new_value):
+        try:
+            new_value = float(new_value)
+        except (TypeError, ValueError):
+            # Only scalar numeric values can be recorded
+            return
+
+        if self.is_async:
+            self.latest_values[pv_index] = new_value
+        else:
+            self.writer.append(pv_index, time.time(), new_value)
+
+    def sample(self):
+        """
+        Record the latest value of every PV at each sampling tick due since the previous timer tick, in one block.
+        """
+        sample_times, self.next_sample_time = get_due_sample_times(self.next_sample_time, time.time(),
+                                                                   self.sampling_period)
+        tick_count = len(sample_times)
+        if tick_count:
+            self.writer.extend(np.tile(self.pv_indices, tick_count), np.repeat(sample_times, len(self.pv_indices)),
+                               np.tile(self.latest_values, tick_count))
+
+
+def run_headless(settings_filename, output_directory, segment_size_bytes=DEFAULT_SEGMENT_SIZE_BYTES, max_segments=0,
+                 duration_s=0):
+    """
+    Record the PVs of a settings file until the process is interrupted, or for a fixed duration.
+
+    Parameters
+    ----------
+    settings_filename : str
+        The path of the settings file
+    output_directory : str
+        The directory to write the recording to
+    segment_size_bytes : int
+        The size a segment file is allowed to reach before the next one is started
+    max_segments : int
+        The maximum number of segment files to keep, or 0 to keep them all
+    duration_s : float
+        How long to record, in seconds, or 0 to record until interrupted
+
+    Returns
+    -------
+    The exit code of the event loop : int
+    """
+    app = QCoreApplication.instance() or QCoreApplication([])
+
+    recorder = HeadlessRecorder(upgrade_settings(read_settings(settings_filename)), output_directory,
+                                segment_size_bytes=segment_size_bytes, max_segments=max_segments)
+    app.aboutToQuit.connect(recorder.stop)
+
+    signal.signal(signal.SIGINT, lambda *args: app.quit())
+    signal.signal(signal.SIGTERM, lambda *args: app.quit())
+
+    # Python only runs the signal handlers when it gets control back from the event loop
+    signal_check_timer = QTimer()
+    signal_check_timer.timeout.connect(lambda: None)
+    signal_check_timer.start(SIGNAL_CHECK_INTERVAL_MS)
+
+    if duration_s:
+        QTimer.singleShot(int(duration_s * 1000), app.quit)
+
+    recorder.start()
+    return app.exec_()
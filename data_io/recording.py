@@ -0,0 +1,255 @@
+from collections import OrderedDict
+import copy
+import json
+import os
+
+import numpy as np
+
+from utilities.lod_pyramid import LodPyramid
+
+RECORDING_KEY = "recording"
+RECORDING_FORMAT_VERSION = 1
+
+# The manifest is a settings file, as written by SettingsExporter, with a section listing the segment files
+MANIFEST_FILE_NAME = "manifest.json"
+SEGMENT_FILE_NAME_FORMAT = "segment_{0:05d}.bin"
+
+# Each sample is recorded as the index of its PV in the manifest, its timestamp, and its value
+RECORD_DTYPE = np.dtype([("pv_index", "<u4"), ("timestamp", "<f8"), ("value", "<f8")])
+
+# The number of records held in memory before they are written to the current segment file
+RECORD_BUFFER_SIZE = 4096
+
+DEFAULT_SEGMENT_SIZE_BYTES = 64 * 1024 * 1024
+
+# Appended to the names of the curves reloaded from a recording, to tell them apart from the live curves
+RECORDED_CURVE_NAME_SUFFIX = " (recording)"
+
+
+class RecordingWriter:
+    def __init__(self, directory, settings, segment_size_bytes=DEFAULT_SEGMENT_SIZE_BYTES, max_segments=0):
+        """
+        Stream samples to rolling binary segment files. The samples are buffered in a fixed-size array and written in
+        blocks, so that the memory used does not grow with the length of the recording.
+
+        Parameters
+        ----------
+        directory : str
+            The directory to write the segment files and the manifest to
+        settings : dict
+            The settings the recording was started from, as read by SettingsImporter. The PVs are recorded in the
+            order of their "pvs" section
+        segment_size_bytes : int
+            The size a segment file is allowed to reach before the next one is started
+        max_segments : int
+            The maximum number of segment files to keep, the oldest ones being deleted first, or 0 to keep them all
+        """
+        self.directory = directory
+        self.settings = settings
+        self.pv_names = list(settings["pvs"].keys())
+        self.segment_size_bytes = segment_size_bytes
+        self.max_segments = max_segments
+
+        self.segments = list()
+        self._segment_number = 0
+        self._segment_file = None
+
+        self._buffer = np.empty(RECORD_BUFFER_SIZE, dtype=RECORD_DTYPE)
+        self._buffer_count = 0
+
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        self._open_segment()
+        self.write_manifest()
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.directory, MANIFEST_FILE_NAME)
+
+    def append(self, pv_index, timestamp, value):
+        """
+        Record one sample.
+
+        Parameters
+        ----------
+        pv_index : int
+            The index of the PV in pv_names
+        timestamp : float
+            The time the sample was taken
+        value : float
+            The value of the sample
+        """
+        record = self._buffer[self._buffer_count]
+        record["pv_index"] = pv_index
+        record["timestamp"] = timestamp
+        record["value"] = value
+
+        self._buffer_count += 1
+        if self._buffer_count == RECORD_BUFFER_SIZE:
+            self.flush()
+
+    def extend(self, pv_indices, timestamps, values):
+        """
+        Record a block of samples at once, e.g. one sample of every PV taken at the same sampling tick.
+
+        Parameters
+        ----------
+        pv_indices : numpy.ndarray
+            The indices of the PVs in pv_names
+        timestamps : numpy.ndarray
+            The times the samples were taken
+        values : numpy.ndarray
+            The values of the samples
+        """
+        records = np.empty(len(timestamps), dtype=RECORD_DTYPE)
+        records["pv_index"] = pv_indices
+        records["timestamp"] = timestamps
+        records["value"] = values
+
+        self.flush()
+        self._write_records(records)
+
+    def flush(self):
+        """
+        Write the buffered samples to the current segment file.
+        """
+        if self._buffer_count:
+            self._write_records(self._buffer[:self._buffer_count])
+            self._buffer_count = 0
+        self._segment_file.flush()
+
+    def close(self):
+        self.flush()
+        self._segment_file.close()
+        self.write_manifest()
+
+    def write_manifest(self):
+        """
+        Write the manifest listing the segment files. It is replaced atomically, so that a reader never sees a
+        partially written manifest.
+        """
+        manifest = copy.deepcopy(self.settings)
+
+        recording = OrderedDict()
+        recording["format_version"] = RECORDING_FORMAT_VERSION
+        recording["pv_names"] = self.pv_names
+        recording["segments"] = self.segments
+        manifest[RECORDING_KEY] = recording
+
+        temporary_path = self.manifest_path + ".tmp"
+        with open(temporary_path, 'w') as json_file:
+            json.dump(manifest, json_file, separators=(',', ':'), indent=4)
+        os.replace(temporary_path, self.manifest_path)
+
+    def _write_records(self, records):
+        if not len(records):
+            return
+
+        self._segment_file.write(records.tobytes())
+
+        segment = self.segments[-1]
+        if not segment["count"]:
+            segment["t_start"] = float(records["timestamp"].min())
+        segment["t_stop"] = float(max(records["timestamp"].max(), segment["t_stop"]))
+        segment["count"] += len(records)
+
+        if segment["count"] * RECORD_DTYPE.itemsize >= self.segment_size_bytes:
+            self._roll_segment()
+
+    def _open_segment(self):
+        self._segment_number += 1
+        file_name = SEGMENT_FILE_NAME_FORMAT.format(self._segment_number)
+        self._segment_file = open(os.path.join(self.directory, file_name), "wb")
+
+        segment = OrderedDict()
+        segment["file"] = file_name
+        segment["count"] = 0
+        segment["t_start"] = 0.0
+        segment["t_stop"] = 0.0
+        self.segments.append(segment)
+
+    def _roll_segment(self):
+        self._segment_file.close()
+
+        if self.max_segments and len(self.segments) >= self.max_segments:
+            expired_segment = self.segments.pop(0)
+            try:
+                os.remove(os.path.join(self.directory, expired_segment["file"]))
+            except OSError:
+                pass
+
+        self._open_segment()
+        self.write_manifest()
+
+
+def load_recording_curves(filename, settings):
+    """
+    Read the samples of a recording, and group them by PV. The segment files are memory-mapped, and their size rather
+    than the manifest tells how many complete records they hold, so that a recording still in progress, or stopped
+    abruptly, can be opened too. The records of the PVs are interleaved in the segments, so the timestamps and values
+    of each PV are copied once, straight into the arrays of its curve, without copying the records as a whole.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the manifest
+    settings : dict
+        The content of the manifest
+
+    Returns
+    -------
+    A list of dicts, each holding the name, the appearance settings, the timestamps, the values, and the
+    multi-resolution history of a curve : list
+    """
+    recording = settings[RECORDING_KEY]
+    if recording.get("format_version", RECORDING_FORMAT_VERSION) > RECORDING_FORMAT_VERSION:
+        raise ValueError("The recording format version {0} is not supported.".format(recording["format_version"]))
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    pv_names = recording["pv_names"]
+    pv_count = len(pv_names)
+
+    segments = list()
+    sample_counts = np.zeros(pv_count, dtype=np.int64)
+    for segment in recording["segments"]:
+        path = os.path.join(directory, segment["file"])
+        if not os.path.isfile(path):
+            continue
+        count = os.path.getsize(path) // RECORD_DTYPE.itemsize
+        if not count:
+            continue
+
+        records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", shape=(count,))
+        segments.append(records)
+        sample_counts += np.bincount(records["pv_index"], minlength=pv_count)[:pv_count]
+
+    timestamp_arrays = [np.empty(count) for count in sample_counts]
+    value_arrays = [np.empty(count) for count in sample_counts]
+    filled_counts = np.zeros(pv_count, dtype=np.int64)
+    for records in segments:
+        # Group the records by PV, keeping each PV's records in time order. Only the PV index column is sorted
+        pv_indices = records["pv_index"]
+        order = np.argsort(pv_indices, kind="stable")
+        boundaries = np.searchsorted(pv_indices[order], np.arange(pv_count + 1))
+        for i in range(pv_count):
+            indices = order[boundaries[i]:boundaries[i + 1]]
+            start = filled_counts[i]
+            stop = start + len(indices)
+            np.take(records["timestamp"], indices, out=timestamp_arrays[i][start:stop])
+            np.take(records["value"], indices, out=value_arrays[i][start:stop])
+            filled_counts[i] = stop
+
+    curves = list()
+    for i, pv_name in enumerate(pv_names):
+        timestamps = timestamp_arrays[i]
+        values = value_arrays[i]
+
+        lod_pyramid = LodPyramid(max(len(timestamps), 2))
+        lod_pyramid.extend(timestamps, values)
+
+        curves.append(dict(name=pv_name + RECORDED_CURVE_NAME_SUFFIX,
+                           settings=settings["pvs"][pv_name],
+                           timestamps=timestamps,
+                           values=values,
+                           lod_pyramid=lod_pyramid))
+    return curves
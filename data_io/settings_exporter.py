@@ -6,6 +6,8 @@ import json
 
 from pydm import utilities
 from version import VERSION
+from data_io.settings_schema import FORMAT_VERSION_KEY, SETTINGS_FORMAT_VERSION
+from widgets.charting_time_plot import FrozenCurveItem, ArchiveCurveItem
 
 
 class SettingsExporter:
@@ -15,22 +17,53 @@ class SettingsExporter:
         self.include_chart_settings = include_chart_settings
 
     def export_settings(self, filename):
+        with open(filename, 'w') as json_file:
+            json.dump(self.build_settings(), json_file, separators=(',', ':'), indent=4)
+
+    @staticmethod
+    def get_curve_settings(curve):
+        """
+        Get the appearance settings of a curve, along with the address of its PV.
+
+        Parameters
+        ----------
+        curve : BasePlotCurveItem
+            The curve to get the settings of
+
+        Returns
+        -------
+        The curve settings : OrderedDict
+        """
+        curve_settings = OrderedDict()
+        curve_settings["color"] = curve.color_string
+        curve_settings["y_channel"] = curve.address
+        curve_settings["line_style"] = curve.lineStyle
+        curve_settings["line_width"] = curve.lineWidth
+        curve_settings["symbol"] = curve.symbol
+        curve_settings["symbol_size"] = curve.symbolSize
+        return curve_settings
+
+    def build_settings(self):
+        """
+        Collect the settings to export.
+
+        Returns
+        -------
+        The settings, ready to be written as JSON : OrderedDict
+        """
         settings = OrderedDict()
         settings["__version__"] = VERSION
+        settings[FORMAT_VERSION_KEY] = SETTINGS_FORMAT_VERSION
         settings["pvs"] = OrderedDict()
         settings["chart_settings"] = OrderedDict()
 
         if self.include_pvs:
             pv_list = list()
             for k, v in self.main_display.channel_map.items():
-                curve_settings = OrderedDict()
-                curve_settings["color"] = v.color_string
-                curve_settings["y_channel"] = v.address
-                curve_settings["line_style"] = v.lineStyle
-                curve_settings["line_width"] = v.lineWidth
-                curve_settings["symbol"] = v.symbol
-                curve_settings["symbol_size"] = v.symbolSize
-                pv_list.append((k, curve_settings))
+                if isinstance(v, FrozenCurveItem) and not isinstance(v, ArchiveCurveItem):
+                    # Recorded data has no PV to reconnect to
+                    continue
+                pv_list.append((k, self.get_curve_settings(v)))
             for item in pv_list:
                 settings["pvs"][item[0]] = item[1]
         if self.include_chart_settings:
@@ -39,9 +72,7 @@ class SettingsExporter:
 
             chart_settings["title"] = chart.getPlotTitle()
 
-            x_axis_label = chart.labels["bottom"]
-            x_axis_label = x_axis_label[x_axis_label.find(" -- ") + len(" -- "):]
-            chart_settings["x_axis_label"] = x_axis_label
+            chart_settings["x_axis_label"] = chart.labels["bottom"]
             chart_settings["x_axis_unit"] = chart.units["bottom"]
 
             chart_settings["left_y_axis_label"] = chart.labels["left"]
@@ -50,18 +81,16 @@ class SettingsExporter:
             chart_settings["right_y_axis_label"] = chart.labels["right"]
             chart_settings["right_y_axis_unit"] = chart.units["right"]
 
-            chart_settings["redraw_rate"] = chart.maxRedrawRate
+            # In adaptive mode the chart may redraw slower, but the rate set by the user is the one to restore
+            chart_settings["redraw_rate"] = self.main_display.redraw_governor.requested_rate_hz
+            chart_settings["adaptive_redraw"] = self.main_display.redraw_governor.enabled
             chart_settings["data_sampling_mode"] = self.main_display.data_sampling_mode
             chart_settings["update_interval_hz"] = 1 / chart.getUpdateInterval()
             chart_settings["limit_time_span"] = self.main_display.chart_limit_time_span_chk.isChecked()
 
-            time_span_limit_hours = self.main_display.chart_limit_time_span_hours_line_edt.text()
-            time_span_limit_minutes = self.main_display.chart_limit_time_span_minutes_line_edt.text()
-            time_span_limit_seconds = self.main_display.chart_limit_time_span_seconds_line_edt.text()
-
-            chart_settings["time_span_limit_hours"] = time_span_limit_hours if time_span_limit_hours else 0
-            chart_settings["time_span_limit_minutes"] = time_span_limit_minutes if time_span_limit_minutes else 0
-            chart_settings["time_span_limit_seconds"] = time_span_limit_seconds if time_span_limit_seconds else 0
+            chart_settings["time_span_limit_hours"] = self.main_display.time_span_limit_hours or 0
+            chart_settings["time_span_limit_minutes"] = self.main_display.time_span_limit_minutes or 0
+            chart_settings["time_span_limit_seconds"] = self.main_display.time_span_limit_seconds or 0
 
             chart_settings["buffer_size"] = chart.getBufferSize()
             chart_settings["show_legend"] = chart.getShowLegend()
@@ -71,9 +100,7 @@ class SettingsExporter:
                 chart.getAxisColor().name(), hex_on_fail=True))
             chart_settings["show_x_grid"] = chart.getShowXGrid()
             chart_settings["show_y_grid"] = chart.getShowYGrid()
-            chart_settings["grid_alpha"] = self.main_display.gridAlpha * 10.0
+            chart_settings["grid_alpha"] = int(round(self.main_display.gridAlpha * 10.0))
             settings["chart_settings"].update(chart_settings)
-
-        with open(filename, 'w') as json_file:
-            json.dump(settings, json_file, separators=(',', ':'), indent=4)
+        return settings
 
@@ -1,33 +1,324 @@
+from contextlib import contextmanager
 import json
 
+from qtpy.QtCore import QObject, Signal, Slot
 from qtpy.QtGui import QColor
 
+from data_io.recording import RECORDING_KEY
+from data_io.settings_schema import upgrade_settings, validate_section, get_changed_keys, PV_SETTINGS_FIELDS, \
+    CHART_SETTINGS_FIELDS
+
+from pydmcharting_logging import logging
+logger = logging.getLogger(__name__)
+
 ASYNC_DATA_SAMPLING = 0
 SYNC_DATA_SAMPLING = 1
 
+# The appearance settings of a curve, which can be changed without recreating the curve
+CURVE_STYLE_KEYS = ("color", "line_style", "line_width", "symbol", "symbol_size")
+
+TIME_SPAN_KEYS = ("limit_time_span", "time_span_limit_hours", "time_span_limit_minutes", "time_span_limit_seconds")
+AXIS_LABEL_KEYS = ("x_axis_label", "x_axis_unit", "left_y_axis_label", "left_y_axis_unit", "right_y_axis_label",
+                   "right_y_axis_unit")
+GRID_KEYS = ("show_x_grid", "show_y_grid", "grid_alpha")
+COLOR_KEYS = ("background_color", "axis_color")
+
+# The chart settings whose setters resize the buffer of the chart as a side effect, e.g. PyDM sizes the buffer from
+# the time span and the sampling period
+BUFFER_RESIZING_KEYS = ("data_sampling_mode", "update_interval_hz") + TIME_SPAN_KEYS
+
+# The errors a malformed or unreadable settings file raises while it is loaded
+SETTINGS_LOAD_ERRORS = (IOError, OSError, ValueError, KeyError, TypeError, OverflowError)
+
+# The share of the loading done once the JSON file is read and validated; loading the curves takes the rest
+SETTINGS_READ_PROGRESS = 20
+
+
+def get_chart_keys_to_apply(current_settings, chart_settings):
+    """
+    Compare the chart settings to apply with the current ones, adding the settings that applying the changed ones
+    overwrites.
+
+    Parameters
+    ----------
+    current_settings : dict
+        The validated settings of the chart
+    chart_settings : dict
+        The validated settings to apply
+
+    Returns
+    -------
+    The keys of the chart settings to apply : set
+    """
+    changed_keys = get_changed_keys(current_settings, chart_settings)
+    for key in COLOR_KEYS:
+        # The colors are saved by name when they have one, and as hexadecimal RGB otherwise
+        if key in changed_keys and QColor(chart_settings[key]) == QColor(current_settings[key]):
+            changed_keys.discard(key)
+
+    if "data_sampling_mode" in changed_keys:
+        # Switching to the synchronous mode resets the time span
+        changed_keys.update(TIME_SPAN_KEYS)
+    if changed_keys.intersection(BUFFER_RESIZING_KEYS):
+        # The buffer size of the file may equal the current one, and still be lost once the buffer is resized
+        changed_keys.add("buffer_size")
+    return changed_keys
+
+
+def read_settings(filename):
+    with open(filename, 'r') as json_file:
+        return json.load(json_file)
+
+
+def load_settings(filename, is_cancelled=None, report_progress=None):
+    """
+    Read a settings file, migrate it to the current format and validate it, and load the data of the recorded
+    curves it refers to. Nothing here touches the display, so that the files can be read on a worker thread.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the settings file, a snapshot, or the manifest of a recording
+    is_cancelled : callable
+        Called between the steps of the loading, which stops if it returns True
+    report_progress : callable
+        Called with the percentage of the loading done after each step
+
+    Returns
+    -------
+    The settings ready to be applied by SettingsImporter.apply_settings, or None if the loading was cancelled : dict
+    """
+    # The snapshot module imports the exporters, which are only needed here when a snapshot is imported
+    from data_io.snapshot import SNAPSHOT_KEY, load_snapshot_curves
+    from data_io.recording import load_recording_curves
+
+    settings = upgrade_settings(read_settings(filename))
+    chart_settings = settings["chart_settings"]
+
+    if is_cancelled and is_cancelled():
+        return None
+    if report_progress:
+        report_progress(SETTINGS_READ_PROGRESS)
+
+    if SNAPSHOT_KEY in settings:
+        # A snapshot reloads the recorded curves instead of reconnecting to their PVs
+        return dict(curve_specs=list(), frozen_curves=load_snapshot_curves(filename, settings[SNAPSHOT_KEY]),
+                    chart_settings=chart_settings)
+    if RECORDING_KEY in settings:
+        # A recording made in headless mode is reviewed the same way
+        return dict(curve_specs=list(), frozen_curves=load_recording_curves(filename, settings),
+                    chart_settings=chart_settings)
+    return get_loaded_settings(settings)
+
+
+def get_loaded_settings(settings):
+    """
+    Turn settings in the current format, without recorded curves, into the form SettingsImporter.apply_settings takes.
+
+    Parameters
+    ----------
+    settings : dict
+        The settings, as returned by upgrade_settings
+
+    Returns
+    -------
+    The settings ready to be applied : dict
+    """
+    curve_specs = list()
+    for curve_name, pv_settings in settings["pvs"].items():
+        curve_specs.append(dict(pv_name=pv_settings["y_channel"], curve_name=curve_name,
+                                color=pv_settings["color"], line_style=pv_settings["line_style"],
+                                line_width=pv_settings["line_width"], symbol=pv_settings["symbol"],
+                                symbol_size=pv_settings["symbol_size"]))
+    return dict(curve_specs=curve_specs, frozen_curves=list(), chart_settings=settings["chart_settings"])
+
+
+class SettingsLoader(QObject):
+    progress_changed = Signal(int)
+    import_finished = Signal(object)
+    import_failed = Signal(str)
+
+    def __init__(self, filename):
+        """
+        Read a settings file on a worker thread. The loaded settings are handed back to the GUI thread, which applies
+        them with SettingsImporter.apply_settings.
+
+        Parameters
+        ----------
+        filename : str
+            The path of the settings file
+        """
+        super(SettingsLoader, self).__init__()
+        self.filename = filename
+        self._is_cancelled = False
+
+    def cancel(self):
+        self._is_cancelled = True
+
+    @Slot()
+    def run(self):
+        try:
+            loaded_settings = load_settings(self.filename, is_cancelled=lambda: self._is_cancelled,
+                                            report_progress=self.progress_changed.emit)
+        except SETTINGS_LOAD_ERRORS as error:
+            logger.error("Cannot import the settings from '{0}'. Exception: {1}".format(self.filename, error))
+            self.import_failed.emit("Cannot import the settings from '{0}': {1}".format(self.filename, error))
+            return
+
+        if loaded_settings is None or self._is_cancelled:
+            self.import_failed.emit("The import was cancelled.")
+            return
+
+        self.progress_changed.emit(100)
+        self.import_finished.emit(loaded_settings)
+
+
+@contextmanager
+def _blocked_signals(widgets):
+    previous_states = [widget.blockSignals(True) for widget in widgets]
+    try:
+        yield
+    finally:
+        for widget, was_blocked in zip(widgets, previous_states):
+            widget.blockSignals(was_blocked)
+
 
 class SettingsImporter:
     def __init__(self, pydm_main_display):
         self.main_display = pydm_main_display
 
-    def import_settings(self, filename):
-        with open(filename, 'r') as json_file:
-            settings = json.load(json_file)
-            self._parse(settings)
+    def import_settings(self, filename, replace_curves=False):
+        self.apply_settings(load_settings(filename), replace_curves=replace_curves)
+
+    def apply_settings(self, loaded_settings, replace_curves=False):
+        """
+        Apply loaded settings over the current session as a single batch, changing only what differs. The new PVs are
+        added, the curves of the PVs already plotted are restyled in place if their appearance changed, keeping their
+        buffers and connections, and only the chart settings that changed are applied. The signals of the settings
+        widgets are blocked while their values are set, and the chart settings are applied directly instead; the
+        display is repainted once, and the channels of the new curves are connected in a single pass at the end.
+
+        Parameters
+        ----------
+        loaded_settings : dict
+            The settings, as returned by load_settings
+        replace_curves : bool
+            True to also remove the curves of the PVs missing from the settings; False to keep them
+        """
+        main_display = self.main_display
+        # The redraws may already be suspended, e.g. while the window is minimized
+        was_redraw_suspended = main_display.chart.isRedrawSuspended()
+        main_display.setUpdatesEnabled(False)
+        main_display.chart.setRedrawSuspended(True)
+        try:
+            self._add_frozen_curves(loaded_settings["frozen_curves"])
+            needs_connections = self._apply_curve_specs(loaded_settings["curve_specs"], replace_curves) > 0
+
+            chart_settings = loaded_settings["chart_settings"]
+            if len(chart_settings):
+                changed_keys = self._get_changed_chart_settings(chart_settings)
+                with _blocked_signals(self._get_settings_widgets()):
+                    self._apply_chart_settings(chart_settings, changed_keys)
+                needs_connections = needs_connections or "data_sampling_mode" in changed_keys
+        finally:
+            main_display.chart.setRedrawSuspended(was_redraw_suspended)
+            main_display.setUpdatesEnabled(True)
+
+        if needs_connections:
+            # Restyling or reattaching curves leaves nothing new to connect
+            main_display.app.establish_widget_connections(main_display)
+        main_display.update()
+
+    def _apply_curve_specs(self, specs, replace_curves):
+        """
+        Add the curves of the new PVs, restyle the curves of the PVs already plotted whose appearance differs, and
+        optionally remove the curves of the PVs not listed.
+
+        Parameters
+        ----------
+        specs : list
+            The keyword arguments of add_y_channel for each curve, with the colors as names
+        replace_curves : bool
+            True to remove the live curves of the PVs not in the specs
 
-    def _parse(self, settings):
-        pv_settings = settings["pvs"]
+        Returns
+        -------
+        The number of curves added : int
+        """
+        from data_io.settings_exporter import SettingsExporter
 
-        for k, v in pv_settings.items():
-            self.main_display.add_y_channel(pv_name=v["y_channel"], curve_name=k, color=QColor(v["color"]),
-                                            line_style=v["line_style"], line_width=v["line_width"],
-                                            symbol=v["symbol"], symbol_size=v["symbol_size"])
-        chart_settings = settings["chart_settings"]
-        if len(chart_settings):
-            chart = self.main_display.chart
+        main_display = self.main_display
+        if replace_curves:
+            new_pv_names = set(spec["pv_name"] for spec in specs)
+            # The exported PVs are the live ones, which have a PV to reconnect to
+            for pv_name in list(SettingsExporter(main_display, True, False).build_settings()["pvs"].keys()):
+                if pv_name not in new_pv_names:
+                    main_display.remove_curve(pv_name)
 
-            self.main_display.chart_title_line_edt.textChanged.emit(chart_settings["title"])
+        added_specs = list()
+        for spec in specs:
+            curve = main_display.channel_map.get(spec["pv_name"])
+            if curve is None:
+                added_specs.append(dict(spec, color=QColor(spec["color"])))
+                continue
 
+            current_style = validate_section(SettingsExporter.get_curve_settings(curve), PV_SETTINGS_FIELDS,
+                                             "settings of '{0}'".format(spec["pv_name"]))
+            changes = dict((key, spec[key]) for key in CURVE_STYLE_KEYS if spec[key] != current_style[key])
+            if "color" in changes:
+                if QColor(changes["color"]) == QColor(current_style["color"]):
+                    del changes["color"]
+                else:
+                    changes["color"] = QColor(changes["color"])
+            if changes:
+                main_display.restyle_curves([spec["pv_name"]], **changes)
+
+        # The channels are connected once, after the chart settings are applied
+        return main_display.add_y_channels(added_specs, establish_connections=False)
+
+    def _get_changed_chart_settings(self, chart_settings):
+        """
+        Compare the chart settings to apply with the current ones.
+
+        Returns
+        -------
+        The keys of the chart settings to apply : set
+        """
+        from data_io.settings_exporter import SettingsExporter
+
+        current_settings = validate_section(SettingsExporter(self.main_display, False, True).build_settings()[
+            "chart_settings"], CHART_SETTINGS_FIELDS, "current chart settings")
+        return get_chart_keys_to_apply(current_settings, chart_settings)
+
+    def _get_settings_widgets(self):
+        main_display = self.main_display
+        return (main_display.chart_title_line_edt, main_display.chart_redraw_rate_spin,
+                main_display.chart_adaptive_redraw_chk, main_display.chart_sync_mode_sync_radio,
+                main_display.chart_sync_mode_async_radio, main_display.chart_data_async_sampling_rate_spin,
+                main_display.chart_limit_time_span_hours_line_edt, main_display.chart_limit_time_span_minutes_line_edt,
+                main_display.chart_limit_time_span_seconds_line_edt, main_display.chart_limit_time_span_chk,
+                main_display.chart_ring_buffer_size_edt, main_display.show_legend_chk, main_display.show_x_grid_chk,
+                main_display.show_y_grid_chk, main_display.grid_opacity_slr)
+
+    def _apply_chart_settings(self, chart_settings, changed_keys):
+        """
+        Apply the chart settings that changed, with the signals of the settings widgets blocked.
+
+        Parameters
+        ----------
+        chart_settings : dict
+            The validated chart settings
+        changed_keys : set
+            The keys of the settings to apply, as returned by _get_changed_chart_settings
+        """
+        main_display = self.main_display
+        chart = main_display.chart
+
+        if "title" in changed_keys:
+            main_display.chart_title_line_edt.setText(chart_settings["title"])
+            chart.setPlotTitle(chart_settings["title"])
+
+        if changed_keys.intersection(AXIS_LABEL_KEYS):
             chart.setLabel("bottom", text=chart_settings["x_axis_label"])
             chart.labels["bottom"] = chart_settings["x_axis_label"]
 
@@ -39,61 +330,86 @@ class SettingsImporter:
             chart.setLabel("right", text=chart_settings["right_y_axis_label"])
             chart.setLabel("right", unit=chart_settings["right_y_axis_unit"])
 
-            self.main_display.chart_redraw_rate_spin.setValue(chart_settings["redraw_rate"])
-            self.main_display.chart_redraw_rate_spin.valueChanged.emit(chart_settings["redraw_rate"])
-
-            data_sampling_mode = chart_settings["data_sampling_mode"]
-            self.main_display.chart_sync_mode_sync_radio.setChecked(
-                data_sampling_mode == SYNC_DATA_SAMPLING)
-            self.main_display.chart_sync_mode_async_radio.setChecked(
-                data_sampling_mode == ASYNC_DATA_SAMPLING)
-            self.main_display.chart_sync_mode_async_radio.toggled.emit(
-                data_sampling_mode == ASYNC_DATA_SAMPLING)
+        if "redraw_rate" in changed_keys:
+            main_display.chart_redraw_rate_spin.setValue(chart_settings["redraw_rate"])
+            main_display.handle_redraw_rate_changed(main_display.chart_redraw_rate_spin.value())
 
-            self.main_display.chart_data_async_sampling_rate_spin.setValue(chart_settings["update_interval_hz"])
-            self.main_display.chart_data_async_sampling_rate_spin.valueChanged.emit(
-                chart_settings["update_interval_hz"])
+        if "adaptive_redraw" in changed_keys:
+            adaptive_redraw = chart_settings["adaptive_redraw"]
+            main_display.chart_adaptive_redraw_chk.setChecked(adaptive_redraw)
+            main_display.handle_adaptive_redraw_checkbox_clicked(adaptive_redraw)
 
-            time_span_limit_hours = int(chart_settings["time_span_limit_hours"])
-            time_span_limit_minutes = int(chart_settings["time_span_limit_minutes"])
-            time_span_limit_seconds = int(chart_settings["time_span_limit_seconds"])
+        if "data_sampling_mode" in changed_keys:
+            data_sampling_mode = chart_settings["data_sampling_mode"]
+            main_display.chart_sync_mode_sync_radio.setChecked(data_sampling_mode == SYNC_DATA_SAMPLING)
+            main_display.chart_sync_mode_async_radio.setChecked(data_sampling_mode == ASYNC_DATA_SAMPLING)
+            main_display.apply_data_sampling_mode(data_sampling_mode)
 
-            if time_span_limit_hours != 0 or time_span_limit_minutes != 0 or time_span_limit_seconds != 0:
-                self.main_display.chart_limit_time_span_hours_line_edt.setText(str(time_span_limit_hours))
-                self.main_display.chart_limit_time_span_hours_line_edt.textChanged.emit(str(time_span_limit_hours))
+        if "update_interval_hz" in changed_keys:
+            main_display.chart_data_async_sampling_rate_spin.setValue(int(round(chart_settings["update_interval_hz"])))
+            main_display.handle_data_sampling_rate_changed(main_display.chart_data_async_sampling_rate_spin.value())
 
-                self.main_display.chart_limit_time_span_minutes_line_edt.setText(str(time_span_limit_minutes))
-                self.main_display.chart_limit_time_span_minutes_line_edt.textChanged.emit(str(time_span_limit_minutes))
+        time_span_limit_hours = chart_settings["time_span_limit_hours"]
+        time_span_limit_minutes = chart_settings["time_span_limit_minutes"]
+        time_span_limit_seconds = chart_settings["time_span_limit_seconds"]
 
-                self.main_display.chart_limit_time_span_seconds_line_edt.setText(str(time_span_limit_seconds))
-                self.main_display.chart_limit_time_span_seconds_line_edt.textChanged.emit(str(time_span_limit_seconds))
+        if changed_keys.intersection(TIME_SPAN_KEYS) and \
+                (time_span_limit_hours != 0 or time_span_limit_minutes != 0 or time_span_limit_seconds != 0):
+            main_display.chart_limit_time_span_hours_line_edt.setText(str(time_span_limit_hours))
+            main_display.chart_limit_time_span_minutes_line_edt.setText(str(time_span_limit_minutes))
+            main_display.chart_limit_time_span_seconds_line_edt.setText(str(time_span_limit_seconds))
+            main_display.handle_time_span_edt_text_changed(str(time_span_limit_seconds))
 
-                self.main_display.chart_limit_time_span_chk.setChecked(chart_settings["limit_time_span"])
-                self.main_display.chart_limit_time_span_chk.clicked.emit(chart_settings["limit_time_span"])
+            main_display.chart_limit_time_span_chk.setChecked(chart_settings["limit_time_span"])
+            main_display.handle_limit_time_span_checkbox_clicked(chart_settings["limit_time_span"])
 
-                self.main_display.chart_limit_time_span_activate_btn.clicked.emit()
+            main_display.handle_chart_limit_time_span_activate_btn_clicked()
 
-            self.main_display.chart_ring_buffer_size_edt.setText(str(chart_settings["buffer_size"]))
-            self.main_display.chart_ring_buffer_size_edt.textChanged.emit(str(chart_settings["buffer_size"]))
+        # The buffer size is applied after the sampling rate and the time span, which resize the buffer
+        if "buffer_size" in changed_keys:
+            main_display.chart_ring_buffer_size_edt.setText(str(chart_settings["buffer_size"]))
+            main_display.handle_buffer_size_changed(str(chart_settings["buffer_size"]))
 
-            self.main_display.show_legend_chk.setChecked(chart_settings["show_legend"])
-            self.main_display.show_legend_chk.clicked.emit(chart_settings["show_legend"])
+        if "show_legend" in changed_keys:
+            main_display.show_legend_chk.setChecked(chart_settings["show_legend"])
+            chart.setShowLegend(chart_settings["show_legend"])
 
+        if "background_color" in changed_keys:
             background_color = QColor(chart_settings["background_color"])
-            self.main_display.chart.setBackgroundColor(background_color)
-            self.main_display.background_color_btn.setStyleSheet("background-color: " + background_color.name())
+            chart.setBackgroundColor(background_color)
+            main_display.background_color_btn.setStyleSheet("background-color: " + background_color.name())
 
+        if "axis_color" in changed_keys:
             axis_color = QColor(chart_settings["axis_color"])
-            self.main_display.chart.setAxisColor(axis_color)
-            self.main_display.axis_color_btn.setStyleSheet("background-color: " + axis_color.name())
+            chart.setAxisColor(axis_color)
+            main_display.axis_color_btn.setStyleSheet("background-color: " + axis_color.name())
+
+        if changed_keys.intersection(GRID_KEYS):
+            # The grid opacity is set first, so that the grids are shown once, with their final opacity
+            main_display.grid_opacity_slr.setValue(chart_settings["grid_alpha"])
+            main_display.grid_alpha = main_display.grid_opacity_slr.value() / 10.0
 
-            self.main_display.show_x_grid_chk.setChecked(chart_settings["show_x_grid"])
-            self.main_display.show_x_grid_chk.clicked.emit(chart_settings["show_x_grid"])
+            main_display.show_x_grid_chk.setChecked(chart_settings["show_x_grid"])
+            main_display.handle_show_x_grid_checkbox_clicked(chart_settings["show_x_grid"])
 
-            self.main_display.show_y_grid_chk.setChecked(chart_settings["show_y_grid"])
-            self.main_display.show_y_grid_chk.clicked.emit(chart_settings["show_y_grid"])
+            main_display.show_y_grid_chk.setChecked(chart_settings["show_y_grid"])
+            main_display.handle_show_y_grid_checkbox_clicked(chart_settings["show_y_grid"])
 
-            self.main_display.grid_opacity_slr.valueChanged.emit(chart_settings["grid_alpha"])
-            self.main_display.grid_opacity_slr.setValue(chart_settings["grid_alpha"])
+    def _add_frozen_curves(self, curves):
+        """
+        Add recorded curves, e.g. from a snapshot or a headless recording, as frozen curves.
 
-            self.main_display.app.establish_widget_connections(self.main_display)
+        Parameters
+        ----------
+        curves : list
+            The curves, as returned by load_snapshot_curves or load_recording_curves
+        """
+        for curve in curves:
+            curve_settings = curve["settings"]
+            self.main_display.add_frozen_curve(curve["name"], curve["timestamps"], curve["values"],
+                                               curve["lod_pyramid"], source_address=curve_settings["y_channel"],
+                                               color=QColor(curve_settings["color"]),
+                                               line_style=curve_settings["line_style"],
+                                               line_width=curve_settings["line_width"],
+                                               symbol=curve_settings["symbol"],
+                                               symbol_size=curve_settings["symbol_size"])
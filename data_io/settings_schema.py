@@ -0,0 +1,212 @@
+# The Versioned Schema of the Settings Files
+from collections import OrderedDict
+import math
+
+# Stamped on the settings files from the format version 2 on. The "__version__" key holds the version of the
+# application, and does not tell the format apart
+FORMAT_VERSION_KEY = "format_version"
+SETTINGS_FORMAT_VERSION = 2
+
+# The files written before the format was versioned
+UNVERSIONED_FORMAT_VERSION = 1
+
+# Qt.SolidLine
+DEFAULT_LINE_STYLE = 1
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    raise TypeError("expected a boolean, got {0!r}".format(value))
+
+
+def _to_int(value):
+    if isinstance(value, bool):
+        raise TypeError("expected an integer, got {0!r}".format(value))
+    # The numbers typed in the line edits were saved as text
+    return int(round(_to_float(value))) if value != "" else 0
+
+
+def _to_optional_int(value):
+    return None if value is None else _to_int(value)
+
+
+def _to_float(value):
+    if isinstance(value, bool):
+        raise TypeError("expected a number, got {0!r}".format(value))
+    value = float(value)
+    if not math.isfinite(value):
+        raise OverflowError("expected a finite number, got {0!r}".format(value))
+    return value
+
+
+def _to_str(value):
+    if not isinstance(value, str):
+        raise TypeError("expected a string, got {0!r}".format(value))
+    return value
+
+
+def _to_optional_str(value):
+    return None if value is None else _to_str(value)
+
+
+# The fields of each section, with the converter checking their type, and their default value. A field without a
+# default is required
+REQUIRED = object()
+
+PV_SETTINGS_FIELDS = OrderedDict((
+    ("color", (_to_str, "white")),
+    ("y_channel", (_to_str, REQUIRED)),
+    ("line_style", (_to_int, DEFAULT_LINE_STYLE)),
+    ("line_width", (_to_int, 2)),
+    ("symbol", (_to_optional_str, None)),
+    ("symbol_size", (_to_optional_int, 10)),
+))
+
+# The defaults are the settings of a new chart
+CHART_SETTINGS_FIELDS = OrderedDict((
+    ("title", (_to_str, "Time Plot")),
+    ("x_axis_label", (_to_str, "")),
+    ("x_axis_unit", (_to_str, "")),
+    ("left_y_axis_label", (_to_str, "")),
+    ("left_y_axis_unit", (_to_str, "")),
+    ("right_y_axis_label", (_to_str, "")),
+    ("right_y_axis_unit", (_to_str, "")),
+    ("redraw_rate", (_to_int, 30)),
+    ("adaptive_redraw", (_to_bool, False)),
+    ("data_sampling_mode", (_to_int, 0)),
+    ("update_interval_hz", (_to_float, 10.0)),
+    ("limit_time_span", (_to_bool, False)),
+    ("time_span_limit_hours", (_to_int, 0)),
+    ("time_span_limit_minutes", (_to_int, 0)),
+    ("time_span_limit_seconds", (_to_int, 0)),
+    ("buffer_size", (_to_int, 7200)),
+    ("show_legend", (_to_bool, False)),
+    ("background_color", (_to_str, "black")),
+    ("axis_color", (_to_str, "white")),
+    ("show_x_grid", (_to_bool, False)),
+    ("show_y_grid", (_to_bool, False)),
+    ("grid_alpha", (_to_int, 5)),
+))
+
+
+def _migrate_from_version_1(settings):
+    """
+    The format version 1 saved the time span limits as the text of their line edits, the grid opacity as a float,
+    and lacked the adaptive redraw setting, which was added without a version change.
+    """
+    chart_settings = settings.get("chart_settings")
+    if chart_settings:
+        for key in ("time_span_limit_hours", "time_span_limit_minutes", "time_span_limit_seconds", "grid_alpha"):
+            if key in chart_settings:
+                try:
+                    chart_settings[key] = _to_int(chart_settings[key])
+                except OverflowError:
+                    # The validation fills in the default
+                    del chart_settings[key]
+        chart_settings.setdefault("adaptive_redraw", False)
+    return settings
+
+
+# The migration from each format version to the next one
+MIGRATIONS = {
+    UNVERSIONED_FORMAT_VERSION: _migrate_from_version_1,
+}
+
+
+def get_format_version(settings):
+    return settings.get(FORMAT_VERSION_KEY, UNVERSIONED_FORMAT_VERSION)
+
+
+def upgrade_settings(settings):
+    """
+    Migrate settings read from a file to the current format version, and validate them against the schema. The
+    fields missing from the PV and the chart settings get their defaults, and the values are converted to the types
+    of the fields. An empty chart settings section, exported without the chart settings, is left empty.
+
+    Parameters
+    ----------
+    settings : dict
+        The settings, as read from the file. The dict is modified in place.
+
+    Returns
+    -------
+    The settings in the current format : dict
+    """
+    if not isinstance(settings, dict) or "chart_settings" not in settings:
+        raise ValueError("This is not a settings file.")
+
+    version = get_format_version(settings)
+    if version > SETTINGS_FORMAT_VERSION:
+        raise ValueError("The settings format version {0} is not supported.".format(version))
+    while version < SETTINGS_FORMAT_VERSION:
+        settings = MIGRATIONS[version](settings)
+        version += 1
+    settings[FORMAT_VERSION_KEY] = SETTINGS_FORMAT_VERSION
+
+    pv_settings = settings.setdefault("pvs", OrderedDict())
+    for curve_name in list(pv_settings.keys()):
+        pv_settings[curve_name] = validate_section(pv_settings[curve_name], PV_SETTINGS_FIELDS,
+                                                   "settings of '{0}'".format(curve_name))
+
+    if settings["chart_settings"]:
+        settings["chart_settings"] = validate_section(settings["chart_settings"], CHART_SETTINGS_FIELDS,
+                                                      "chart settings")
+    return settings
+
+
+def validate_section(section, fields, description):
+    """
+    Check the values of a section against its fields, filling in the defaults of the missing ones, and of those
+    holding a number out of range, e.g. 1e400 read as infinity. The keys not in the schema are kept as they are.
+
+    Parameters
+    ----------
+    section : dict
+        The section of the settings
+    fields : OrderedDict
+        The (converter, default) of each field
+    description : str
+        What the section holds, for the error messages
+
+    Returns
+    -------
+    The validated section, with the fields in the schema order : OrderedDict
+    """
+    if not isinstance(section, dict):
+        raise ValueError("The {0} are not a JSON object.".format(description))
+
+    validated_section = OrderedDict()
+    for key, (converter, default) in fields.items():
+        if key not in section:
+            if default is REQUIRED:
+                raise ValueError("The {0} lack the required '{1}'.".format(description, key))
+            validated_section[key] = default
+            continue
+        try:
+            validated_section[key] = converter(section[key])
+        except OverflowError as error:
+            if default is REQUIRED:
+                raise ValueError("Invalid '{0}' in the {1}: {2}".format(key, description, error))
+            validated_section[key] = default
+        except (TypeError, ValueError) as error:
+            raise ValueError("Invalid '{0}' in the {1}: {2}".format(key, description, error))
+
+    for key, value in section.items():
+        if key not in validated_section:
+            validated_section[key] = value
+    return validated_section
+
+
+def get_changed_keys(current_section, new_section):
+    """
+    Get the keys whose values differ between two validated sections.
+
+    Returns
+    -------
+    The keys of the new section that are missing from the current one, or hold another value : set
+    """
+    return set(key for key, value in new_section.items() if key not in current_section or
+               current_section[key] != value)
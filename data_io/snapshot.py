@@ -0,0 +1,302 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+
+from qtpy.QtCore import QObject, Signal, Slot
+
+from data_io.curve_data_exporter import EXPORT_BLOCK_SIZE
+from data_io.settings_exporter import SettingsExporter
+from utilities.lod_pyramid import LodPyramid, NUM_AGGREGATE_FIELDS
+from widgets.charting_time_plot import TIMESTAMP_FIELD, VALUE_FIELD
+
+from pydmcharting_logging import logging
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = "snapshot"
+SNAPSHOT_FORMAT_VERSION = 1
+
+# The arrays of a snapshot are kept in a directory next to its JSON file, named after it
+DATA_DIRECTORY_SUFFIX = "_data"
+
+# Written in the data directory, to tell it from a directory of the user that happens to have the same name
+MANIFEST_FILE_NAME = "snapshot_manifest.json"
+
+# The files of the data directories written before the manifest was added
+ARRAY_FILE_PATTERN = re.compile(r"^curve_\d+_.+\.npy$")
+
+# Appended to the names of the curves reloaded from a snapshot, to tell them apart from the live curves of the same PVs
+FROZEN_CURVE_NAME_SUFFIX = " (snapshot)"
+
+
+def collect_snapshot_curves(main_display):
+    """
+    Copy the data, the multi-resolution history, and the appearance settings of all the curves, so that the snapshot
+    can be written from a worker thread while the curves keep receiving new samples.
+
+    Parameters
+    ----------
+    main_display : PyDMChartingDisplay
+        The main display window owning the curves
+
+    Returns
+    -------
+    A list of dicts, one per curve : list
+    """
+    curves = list()
+    for curve_name, curve in main_display.channel_map.items():
+        curve.syncLodPyramid()
+        data = curve.ring_buffer.to_array()
+        lod_levels, lod_pending = curve.lod_pyramid.to_arrays()
+
+        curves.append(dict(name=curve_name,
+                           settings=SettingsExporter.get_curve_settings(curve),
+                           timestamps=data[TIMESTAMP_FIELD],
+                           values=data[VALUE_FIELD],
+                           lod_factors=list(curve.lod_pyramid.factors),
+                           lod_levels=lod_levels,
+                           lod_pending=lod_pending,
+                           samples_added=curve.lod_pyramid.samples_added))
+    return curves
+
+
+def get_data_directory(filename):
+    return os.path.splitext(filename)[0] + DATA_DIRECTORY_SUFFIX
+
+
+def is_snapshot_data_directory(directory):
+    """
+    Check whether a directory holds the data of a snapshot, and can be replaced by a new snapshot with the same name.
+
+    Parameters
+    ----------
+    directory : str
+        The path of the directory
+
+    Returns
+    -------
+    True if the directory holds the manifest of a snapshot, or only the array files of a snapshot : bool
+    """
+    file_names = os.listdir(directory)
+    if MANIFEST_FILE_NAME in file_names:
+        return True
+    return all(ARRAY_FILE_PATTERN.match(file_name) for file_name in file_names)
+
+
+class SnapshotWriter(QObject):
+    progress_changed = Signal(int)
+    export_finished = Signal(str)
+    export_failed = Signal(str)
+
+    def __init__(self, settings, curves, filename):
+        """
+        Write a snapshot, i.e. the chart settings as JSON, and the samples of each curve as contiguous binary arrays
+        in a directory next to it, so that the arrays can be memory-mapped when the snapshot is reloaded. This is meant
+        to be moved to a worker thread, like CurveDataExporter.
+
+        Parameters
+        ----------
+        settings : OrderedDict
+            The settings to write, as built by SettingsExporter
+        curves : list
+            The curve data to write, as returned by collect_snapshot_curves
+        filename : str
+            The path of the JSON file to write
+        """
+        super(SnapshotWriter, self).__init__()
+        self.settings = settings
+        self.curves = curves
+        self.filename = filename
+        self.data_directory = get_data_directory(filename)
+        # The arrays are written to a new directory, which only replaces the data directory once complete
+        self.temp_directory = None
+        self._is_json_started = False
+        self._is_cancelled = False
+
+    def cancel(self):
+        """
+        Stop the snapshot at the next block boundary. The partially written files are removed.
+        """
+        self._is_cancelled = True
+
+    @Slot()
+    def run(self):
+        try:
+            completed = self._write()
+        except (IOError, OSError) as error:
+            logger.error("Cannot write the snapshot to '{0}'. Exception: {1}".format(self.filename, error))
+            self._remove_partial_files()
+            self.export_failed.emit(str(error))
+            return
+
+        if completed:
+            self.export_finished.emit(self.filename)
+        else:
+            self._remove_partial_files()
+            self.export_failed.emit("The export was cancelled.")
+
+    def _write(self):
+        if os.path.exists(self.data_directory) and not (os.path.isdir(self.data_directory) and
+                                                        is_snapshot_data_directory(self.data_directory)):
+            raise IOError("'{0}' already exists, and does not hold the data of a snapshot. Choose another file "
+                          "name.".format(self.data_directory))
+
+        self.temp_directory = tempfile.mkdtemp(prefix=os.path.basename(self.data_directory) + ".", suffix=".tmp",
+                                               dir=os.path.dirname(os.path.abspath(self.data_directory)))
+
+        total_samples = max(sum(len(curve["timestamps"]) for curve in self.curves), 1)
+        written_samples = 0
+
+        snapshot_curves = OrderedDict()
+        for i, curve in enumerate(self.curves):
+            prefix = "curve_{0}".format(i)
+            curve_entry = OrderedDict()
+            curve_entry["settings"] = curve["settings"]
+            curve_entry["count"] = len(curve["timestamps"])
+
+            for key in ("timestamps", "values"):
+                file_name = "{0}_{1}.npy".format(prefix, key)
+                if not self._write_array(file_name, curve[key]):
+                    return False
+                curve_entry[key] = file_name
+
+            written_samples += len(curve["timestamps"])
+            self.progress_changed.emit(int(99 * written_samples / total_samples))
+
+            # The multi-resolution history is a fraction of the size of the samples, so it is written at once
+            curve_entry["lod_factors"] = curve["lod_factors"]
+            curve_entry["lod_levels"] = list()
+            curve_entry["lod_pending"] = list()
+            for j, (level, pending) in enumerate(zip(curve["lod_levels"], curve["lod_pending"])):
+                level_file_name = "{0}_lod_{1}.npy".format(prefix, j)
+                pending_file_name = "{0}_lod_{1}_pending.npy".format(prefix, j)
+                np.save(os.path.join(self.temp_directory, level_file_name), level, allow_pickle=False)
+                np.save(os.path.join(self.temp_directory, pending_file_name), pending, allow_pickle=False)
+                curve_entry["lod_levels"].append(level_file_name)
+                curve_entry["lod_pending"].append(pending_file_name)
+            curve_entry["samples_added"] = curve["samples_added"]
+
+            snapshot_curves[curve["name"]] = curve_entry
+
+        snapshot = OrderedDict()
+        snapshot["format_version"] = SNAPSHOT_FORMAT_VERSION
+        snapshot["data_directory"] = os.path.basename(self.data_directory)
+        snapshot["curves"] = snapshot_curves
+        self.settings[SNAPSHOT_KEY] = snapshot
+
+        manifest = OrderedDict()
+        manifest["format_version"] = SNAPSHOT_FORMAT_VERSION
+        manifest["snapshot_file"] = os.path.basename(self.filename)
+        with open(os.path.join(self.temp_directory, MANIFEST_FILE_NAME), 'w') as manifest_file:
+            json.dump(manifest, manifest_file, indent=4)
+        self._replace_data_directory()
+
+        # The JSON file is written last, so that a snapshot whose JSON file exists is always complete
+        self._is_json_started = True
+        with open(self.filename, 'w') as json_file:
+            json.dump(self.settings, json_file, separators=(',', ':'), indent=4)
+
+        self.progress_changed.emit(100)
+        return True
+
+    def _replace_data_directory(self):
+        """
+        Move the complete arrays into place, replacing the data directory of a previous snapshot with the same name.
+        """
+        old_directory = None
+        if os.path.isdir(self.data_directory):
+            old_directory = self.temp_directory + ".old"
+            os.rename(self.data_directory, old_directory)
+        os.rename(self.temp_directory, self.data_directory)
+        self.temp_directory = None
+        if old_directory is not None:
+            shutil.rmtree(old_directory, ignore_errors=True)
+
+    def _write_array(self, file_name, array):
+        """
+        Write a 1-D array as a .npy file in blocks, checking for cancellation between blocks.
+
+        Returns
+        -------
+        True if the array was written; False if the snapshot was cancelled : bool
+        """
+        output = np.lib.format.open_memmap(os.path.join(self.temp_directory, file_name), mode="w+",
+                                           dtype=np.float64, shape=(len(array),))
+        try:
+            for block_start in range(0, len(array), EXPORT_BLOCK_SIZE):
+                if self._is_cancelled:
+                    return False
+                block_stop = block_start + EXPORT_BLOCK_SIZE
+                output[block_start:block_stop] = array[block_start:block_stop]
+            output.flush()
+        finally:
+            del output
+        return True
+
+    def _remove_partial_files(self):
+        """
+        Remove what was written of the snapshot. The data directory and the JSON file of a previous snapshot are
+        left as they are, unless the new JSON file was being written over them.
+        """
+        if self.temp_directory is not None:
+            shutil.rmtree(self.temp_directory, ignore_errors=True)
+            self.temp_directory = None
+        if self._is_json_started:
+            try:
+                os.remove(self.filename)
+            except OSError:
+                pass
+
+
+def _load_array(data_directory, file_name):
+    path = os.path.join(data_directory, file_name)
+    try:
+        return np.load(path, mmap_mode="r", allow_pickle=False)
+    except ValueError:
+        # Empty arrays cannot be memory-mapped
+        return np.load(path, allow_pickle=False)
+
+
+def load_snapshot_curves(filename, snapshot):
+    """
+    Open the arrays of a snapshot as memory-mapped files, so that only the parts of the history being drawn are read
+    from the disk.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the JSON file of the snapshot
+    snapshot : dict
+        The snapshot section of the JSON file
+
+    Returns
+    -------
+    A list of dicts, each holding the name, the appearance settings, the timestamps, the values, and the
+    multi-resolution history of a curve : list
+    """
+    if snapshot.get("format_version", SNAPSHOT_FORMAT_VERSION) > SNAPSHOT_FORMAT_VERSION:
+        raise ValueError("The snapshot format version {0} is not supported.".format(snapshot["format_version"]))
+
+    data_directory = os.path.join(os.path.dirname(os.path.abspath(filename)), snapshot["data_directory"])
+
+    curves = list()
+    for curve_name, curve_entry in snapshot["curves"].items():
+        levels = [_load_array(data_directory, f) for f in curve_entry["lod_levels"]]
+        pending = [_load_array(data_directory, f).reshape(NUM_AGGREGATE_FIELDS, -1)
+                   for f in curve_entry["lod_pending"]]
+        lod_pyramid = LodPyramid.from_arrays(levels, pending, curve_entry["samples_added"],
+                                             factors=curve_entry["lod_factors"])
+
+        if not curve_name.endswith(FROZEN_CURVE_NAME_SUFFIX):
+            curve_name += FROZEN_CURVE_NAME_SUFFIX
+
+        curves.append(dict(name=curve_name,
+                           settings=curve_entry["settings"],
+                           timestamps=_load_array(data_directory, curve_entry["timestamps"]),
+                           values=_load_array(data_directory, curve_entry["values"]),
+                           lod_pyramid=lod_pyramid))
+    return curves
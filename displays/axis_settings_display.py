@@ -6,8 +6,6 @@ from qtpy.QtCore import Qt, QSize
 from qtpy.QtWidgets import QFormLayout, QCheckBox, QFileDialog, QLabel, QLineEdit, QPushButton
 from pydm import Display
 
-X_AXIS_LABEL_SEPARATOR = " -- "
-
 
 class AxisSettingsDisplay(Display):
     def __init__(self, main_display, parent=None):
@@ -20,11 +18,8 @@ class AxisSettingsDisplay(Display):
 
         self.x_axis_lbl = QLabel("x-axis Label")
         self.x_axis_label_line_edt = QLineEdit()
-        current_x_label = self.chart.labels["bottom"]
-        if current_x_label:
-            current_x_label = current_x_label[current_x_label.find(X_AXIS_LABEL_SEPARATOR) +
-                                              len(X_AXIS_LABEL_SEPARATOR):]
-            self.x_axis_label_line_edt.setText(current_x_label)
+        if self.chart.labels["bottom"]:
+            self.x_axis_label_line_edt.setText(self.chart.labels["bottom"])
         self.x_axis_label_line_edt.textChanged.connect(partial(self.handle_axis_label_change, "bottom"))
 
         self.x_axis_unit_lbl = QLabel("x-axis Unit")
@@ -137,12 +132,6 @@ class AxisSettingsDisplay(Display):
             self.chart.setLabel(axis_position, units=new_label)
             self.chart.units[axis_position] = new_label
         else:
-            if axis_position == "bottom":
-                current_label = self.chart.getBottomAxisLabel()
-                if X_AXIS_LABEL_SEPARATOR in current_label:
-                    current_label = current_label[:current_label.find(X_AXIS_LABEL_SEPARATOR) -
-                                                   len(X_AXIS_LABEL_SEPARATOR)]
-                new_label = current_label + X_AXIS_LABEL_SEPARATOR + new_label
             self.chart.setLabel(axis_position, text=new_label)
             self.chart.labels[axis_position] = new_label
         return
@@ -1,37 +1,24 @@
 # The Dialog to Export Data from a Chart
 
-from qtpy.QtCore import Qt, QSize
+import os
+
+from qtpy.QtCore import Qt, QSize, QThread
 from qtpy.QtWidgets import QVBoxLayout, QFormLayout, QCheckBox, QLineEdit, QFileDialog, QLabel, QComboBox, \
-    QPushButton, QColorDialog, QMessageBox
+    QPushButton, QColorDialog, QMessageBox, QProgressDialog
 from qtpy.QtGui import QColor
 
-from pyqtgraph.exporters import CSVExporter, ImageExporter
-from pyqtgraph.parametertree import Parameter
-
 from pydm import Display
 from data_io.settings_exporter import SettingsExporter
+from data_io.curve_data_exporter import CurveDataExporter, snapshot_curve_data, CSV_FORMAT, NPZ_FORMAT
+from data_io.snapshot import SnapshotWriter, collect_snapshot_curves
+from data_io.chart_image_exporter import ChartImageExporter, ChartImageSnapshot, get_image_outputs, IMAGE_FORMATS, \
+    PNG_FORMAT, JPEG_FORMAT
 from utilities.utils import display_message_box
 
 DEFAULT_EXPORTED_IMAGE_WIDTH = "800"
 DEFAULT_EXPORTED_IMAGE_HEIGHT = "600"
 
-
-class PyDMChartImageExporter(ImageExporter):
-    """
-    Override the buggy widthChanged and heightChanged settings from pyqtgraph
-    """
-    def __init__(self, item):
-        super(PyDMChartImageExporter, self).__init__(item=item)
-
-    def widthChanged(self):
-        sr = self.getSourceRect()
-        ar = float(sr.height()) / sr.width()
-        self.params.param('height').setValue(int(self.params['width'] * ar))
-
-    def heightChanged(self):
-        sr = self.getSourceRect()
-        ar = float(sr.width()) / sr.height()
-        self.params.param('width').setValue(int(self.params['height'] * ar))
+IMAGE_SIZE_SEPARATOR = "x"
 
 
 class ChartDataExportDisplay(Display):
@@ -45,7 +32,7 @@ class ChartDataExportDisplay(Display):
         self.export_options_lbl = QLabel()
         self.export_options_lbl.setText("Export Options")
         self.export_options_cmb = QComboBox()
-        self.export_options_cmb.addItems(("Curve Data", "Chart Settings", "Image File"))
+        self.export_options_cmb.addItems(("Curve Data", "Chart Settings", "Image File", "Snapshot"))
         self.export_options_cmb.currentIndexChanged.connect(self.handle_export_options_index_changed)
 
         # Options for Chart Settings
@@ -69,6 +56,16 @@ class ChartDataExportDisplay(Display):
         self.image_height_edt.editingFinished.connect(self.handle_image_dimension_value)
         self.image_height_edt.setText(DEFAULT_EXPORTED_IMAGE_HEIGHT)
 
+        self.image_extra_sizes_lbl = QLabel("More sizes")
+        self.image_extra_sizes_edt = QLineEdit()
+        self.image_extra_sizes_edt.setPlaceholderText("e.g. 1920x1080, 8000x4000")
+        self.image_extra_sizes_edt.setToolTip("Additional image sizes to export in the same batch, as width{0}height, "
+                                              "separated by commas".format(IMAGE_SIZE_SEPARATOR))
+
+        self.image_png_format_chk = QCheckBox("PNG")
+        self.image_png_format_chk.setChecked(True)
+        self.image_jpeg_format_chk = QCheckBox("JPEG")
+
         self.anti_alias_chk = QCheckBox("Anti-alias")
         self.anti_alias_chk.setChecked(True)
 
@@ -81,7 +78,7 @@ class ChartDataExportDisplay(Display):
         self.export_format_lbl = QLabel()
         self.export_format_lbl.setText("Export Format")
         self.file_format_cmb = QComboBox()
-        self.file_format_cmb.addItems(("csv", "json", "png"))
+        self.file_format_cmb.addItems((",".join((CSV_FORMAT, NPZ_FORMAT)), "json", ",".join(IMAGE_FORMATS), "json"))
         self.file_format = ""
         self.exported_image_background_color = QColor(Qt.black)
 
@@ -91,6 +88,10 @@ class ChartDataExportDisplay(Display):
         self.image_width = 0
         self.image_height = 0
 
+        self.export_thread = None
+        self.data_exporter = None
+        self.export_progress_dlg = None
+
         self.setFixedSize(QSize(300, 150))
         self.setWindowTitle("Export Chart Data")
         self.setWindowModality(Qt.ApplicationModal)
@@ -118,8 +119,11 @@ class ChartDataExportDisplay(Display):
 
         self.image_dimension_layout.addRow(self.image_width_lbl, self.image_width_edt)
         self.image_dimension_layout.addRow(self.image_height_lbl, self.image_height_edt)
+        self.image_dimension_layout.addRow(self.image_extra_sizes_lbl, self.image_extra_sizes_edt)
         self.main_layout.addLayout(self.image_dimension_layout)
 
+        self.main_layout.addWidget(self.image_png_format_chk)
+        self.main_layout.addWidget(self.image_jpeg_format_chk)
         self.main_layout.addWidget(self.anti_alias_chk)
         self.main_layout.addWidget(self.export_image_background_color_lbl)
         self.main_layout.addWidget(self.export_image_background_btn)
@@ -134,7 +138,9 @@ class ChartDataExportDisplay(Display):
         self.image_height_edt.editingFinished.emit()
 
     def handle_export_options_index_changed(self, selected_index):
-        if selected_index != 0:
+        if selected_index == 2:
+            self.setFixedSize(QSize(300, 420))
+        elif selected_index != 0:
             self.setFixedSize(QSize(300, 300))
             self.main_layout.setAlignment(Qt.AlignVCenter)
 
@@ -145,6 +151,10 @@ class ChartDataExportDisplay(Display):
         self.image_width_edt.setVisible(selected_index == 2)
         self.image_height_lbl.setVisible(selected_index == 2)
         self.image_height_edt.setVisible(selected_index == 2)
+        self.image_extra_sizes_lbl.setVisible(selected_index == 2)
+        self.image_extra_sizes_edt.setVisible(selected_index == 2)
+        self.image_png_format_chk.setVisible(selected_index == 2)
+        self.image_jpeg_format_chk.setVisible(selected_index == 2)
         self.anti_alias_chk.setVisible(selected_index == 2)
         self.export_image_background_color_lbl.setVisible(selected_index == 2)
         self.export_image_background_btn.setVisible(selected_index == 2)
@@ -165,25 +175,155 @@ class ChartDataExportDisplay(Display):
 
         if saved_file_name:
             if self.export_options_cmb.currentIndex() == 0:
-                data_exporter = CSVExporter(self.main_display.chart.plotItem)
-                data_exporter.export(saved_file_name)
+                self.export_curve_data(saved_file_name)
+            elif self.export_options_cmb.currentIndex() == 3:
+                self.export_snapshot(saved_file_name)
             elif self.export_options_cmb.currentIndex() == 2:
-                image_exporter = PyDMChartImageExporter(self.main_display.chart.plotItem)
-                image_exporter.params = Parameter(name='params', type='group', children=[
-                    {'name': 'width', 'type': 'int', 'value': self.image_width, 'limits': (0, None)},
-                    {'name': 'height', 'type': 'int', 'value': self.image_height, 'limits': (0, None)},
-                    {'name': 'antialias', 'type': 'bool', 'value': True},
-                    {'name': 'background', 'type': 'color', 'value': QColor(0, 0, 0)},
-                ])
-
-                image_exporter.widthChanged()
-                image_exporter.heightChanged()
-                image_exporter.export(fileName=saved_file_name)
+                self.export_images(saved_file_name)
             else:
                 settings_exporter = SettingsExporter(self.main_display, self.include_pv_chk.isChecked(),
                                                      self.include_chart_settings_chk.isChecked())
                 settings_exporter.export_settings(saved_file_name)
 
+    def export_curve_data(self, filename):
+        """
+        Export the data of all the curves from a worker thread, reading the curve buffers directly. A progress dialog
+        allows the user to cancel the export.
+
+        Parameters
+        ----------
+        filename : str
+            The path of the file to write. The extension selects between the CSV and the NumPy archive formats.
+        """
+        if self._is_export_running():
+            return
+
+        file_format = NPZ_FORMAT if os.path.splitext(filename)[1] == "." + NPZ_FORMAT else CSV_FORMAT
+        self._start_export(CurveDataExporter(snapshot_curve_data(self.main_display), filename, file_format),
+                           "Exporting curve data...")
+
+    def export_snapshot(self, filename):
+        """
+        Save the chart settings and the history of all the curves as a snapshot, which can be imported back to display
+        the history as frozen curves. The arrays are written from a worker thread.
+
+        Parameters
+        ----------
+        filename : str
+            The path of the JSON file to write. The arrays are written to a directory next to it.
+        """
+        if self._is_export_running():
+            return
+
+        settings = SettingsExporter(self.main_display, True, True).build_settings()
+        self._start_export(SnapshotWriter(settings, collect_snapshot_curves(self.main_display), filename),
+                           "Saving snapshot...")
+
+    def export_images(self, filename):
+        """
+        Export images of the chart, in all the chosen sizes and formats, from a worker thread. Only the view range,
+        the settings, and the visible data of the curves are copied on the GUI thread; the chart keeps updating while
+        the images are rendered.
+
+        Parameters
+        ----------
+        filename : str
+            The path chosen for the image. With several sizes, each file name gets the size as a suffix.
+        """
+        if self._is_export_running():
+            return
+
+        try:
+            sizes = [(self.image_width, self.image_height)] + self.get_extra_image_sizes()
+        except ValueError:
+            display_message_box(QMessageBox.Critical, "Invalid Sizes",
+                                "Please enter the additional sizes as width{0}height, separated by commas, with "
+                                "integer values larger than 0.".format(IMAGE_SIZE_SEPARATOR))
+            return
+
+        image_formats = list()
+        if self.image_png_format_chk.isChecked():
+            image_formats.append(PNG_FORMAT)
+        if self.image_jpeg_format_chk.isChecked():
+            image_formats.append(JPEG_FORMAT)
+        if not image_formats:
+            display_message_box(QMessageBox.Critical, "No Image Format", "Please select at least one image format.")
+            return
+
+        snapshot = ChartImageSnapshot(self.main_display, self.exported_image_background_color,
+                                      max(width for width, _ in sizes))
+        self._start_export(ChartImageExporter(snapshot, get_image_outputs(filename, sizes, image_formats),
+                                              self.anti_alias_chk.isChecked()),
+                           "Exporting images...")
+
+    def get_extra_image_sizes(self):
+        """
+        Parse the additional image sizes.
+
+        Returns
+        -------
+        The (width, height) of each additional image : list
+        """
+        sizes = list()
+        for size_text in self.image_extra_sizes_edt.text().split(","):
+            size_text = size_text.strip().lower()
+            if not size_text:
+                continue
+            width, height = (int(value) for value in size_text.split(IMAGE_SIZE_SEPARATOR))
+            if width <= 0 or height <= 0:
+                raise ValueError("Invalid image size '{0}'.".format(size_text))
+            if (width, height) not in sizes and (width, height) != (self.image_width, self.image_height):
+                sizes.append((width, height))
+        return sizes
+
+    def _is_export_running(self):
+        if self.export_thread and self.export_thread.isRunning():
+            display_message_box(QMessageBox.Warning, "Export in Progress",
+                                "Please wait for the current export to complete.")
+            return True
+        return False
+
+    def _start_export(self, data_exporter, progress_text):
+        """
+        Run an exporter on a worker thread, showing its progress in a dialog that allows the user to cancel it.
+
+        Parameters
+        ----------
+        data_exporter : QObject
+            The exporter, providing the run and cancel methods, and the progress_changed, export_finished, and
+            export_failed signals
+        progress_text : str
+            The text of the progress dialog
+        """
+        self.data_exporter = data_exporter
+
+        self.export_progress_dlg = QProgressDialog(progress_text, "Cancel", 0, 100, self)
+        self.export_progress_dlg.setWindowTitle("Export Chart Data")
+        self.export_progress_dlg.setWindowModality(Qt.WindowModal)
+        self.export_progress_dlg.canceled.connect(self.data_exporter.cancel)
+
+        self.export_thread = QThread(self)
+        self.data_exporter.moveToThread(self.export_thread)
+        self.export_thread.started.connect(self.data_exporter.run)
+
+        self.data_exporter.progress_changed.connect(self.export_progress_dlg.setValue)
+        self.data_exporter.export_finished.connect(self.handle_export_finished)
+        self.data_exporter.export_failed.connect(self.handle_export_failed)
+
+        self.export_progress_dlg.show()
+        self.export_thread.start()
+
+    def handle_export_finished(self, filename):
+        self.export_thread.quit()
+        self.export_progress_dlg.reset()
+
+    def handle_export_failed(self, message):
+        self.export_thread.quit()
+        was_cancelled = self.export_progress_dlg.wasCanceled()
+        self.export_progress_dlg.reset()
+        if not was_cancelled:
+            display_message_box(QMessageBox.Critical, "Export Failed", message)
+
     def handle_export_image_background_button_clicked(self):
         self.exported_image_background_color = QColorDialog.getColor()
         self.export_image_background_btn.setStyleSheet("background-color: " +
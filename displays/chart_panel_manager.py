@@ -0,0 +1,220 @@
+# The Manager of the Chart Panels Showing More Views of the Curves Next to the Main Chart
+from collections import OrderedDict
+
+from qtpy.QtCore import Qt, Signal
+from qtpy.QtWidgets import QWidget, QHBoxLayout, QVBoxLayout, QLabel, QPushButton
+
+from widgets.charting_time_plot import ChartingTimePlot
+
+STACKED_LAYOUT = "Stacked"
+TILED_LAYOUT = "Tiled"
+PANEL_LAYOUTS = (STACKED_LAYOUT, TILED_LAYOUT)
+
+PANEL_NAME_FORMAT = "Panel {0}"
+
+
+class ChartPanel(QWidget):
+    # Emitted with the name of the panel when its Close button is clicked
+    close_requested = Signal(str)
+
+    def __init__(self, name, chart, parent=None):
+        """
+        A chart under a header holding the name of the panel and its Close button.
+
+        Parameters
+        ----------
+        name : str
+            The name of the panel
+        chart : ChartingTimePlot
+            The chart of the panel
+        parent : QWidget
+            The parent widget of the panel
+        """
+        super(ChartPanel, self).__init__(parent)
+        self.name = name
+        self.chart = chart
+
+        self.name_lbl = QLabel(name)
+        self.close_btn = QPushButton("Close")
+        self.close_btn.clicked.connect(lambda: self.close_requested.emit(self.name))
+
+        self.header_layout = QHBoxLayout()
+        self.header_layout.setContentsMargins(0, 0, 0, 0)
+        self.header_layout.addWidget(self.name_lbl)
+        self.header_layout.addStretch()
+        self.header_layout.addWidget(self.close_btn)
+
+        self.panel_layout = QVBoxLayout()
+        self.panel_layout.setContentsMargins(0, 0, 0, 0)
+        self.panel_layout.addLayout(self.header_layout)
+        self.panel_layout.addWidget(self.chart)
+        self.setLayout(self.panel_layout)
+
+
+class ChartPanelManager:
+    def __init__(self, main_display, splitter):
+        """
+        Show the curves of the main display on more charts, stacked or tiled next to the main chart, with their
+        x-axes linked to it. The curves of the main display remain the only ones connected to the PVs and buffering
+        their data; each panel shows views of them, which draw from their buffers. The views of each PV are counted,
+        and all released with the curve they draw from.
+
+        Parameters
+        ----------
+        main_display : PyDMChartingDisplay
+            The main display window owning the main chart and the curves
+        splitter : QSplitter
+            The splitter holding the main chart, to which the panels are added
+        """
+        self.main_display = main_display
+        self.splitter = splitter
+        self.panels = OrderedDict()
+        self.panel_count = 0
+
+        # The views of each PV, by panel name
+        self.views = dict()
+
+    def add_panel(self):
+        """
+        Add an empty panel after the others, with the settings of the main chart.
+
+        Returns
+        -------
+        The name of the new panel : str
+        """
+        self.panel_count += 1
+        name = PANEL_NAME_FORMAT.format(self.panel_count)
+
+        main_chart = self.main_display.chart
+        # The controls of the curves are updated from the main chart, so this manager stands in for the display
+        chart = ChartingTimePlot(plot_by_timestamps=main_chart._plot_by_timestamps, plot_display=self)
+        chart.setPlotTitle(name)
+        # The time is shown on the main chart
+        chart.clock_item.hide()
+        chart.setXLink(main_chart.getViewBox())
+
+        panel = ChartPanel(name, chart)
+        panel.close_requested.connect(self.main_display.handle_chart_panel_close_requested)
+        self.panels[name] = panel
+        self.apply_chart_settings(chart)
+        chart.setRedrawSuspended(main_chart.isRedrawSuspended())
+        self.splitter.addWidget(panel)
+        return name
+
+    def remove_panel(self, name):
+        """
+        Remove a panel with all its views. The curves they draw from stay on the main chart.
+
+        Parameters
+        ----------
+        name : str
+            The name of the panel
+        """
+        panel = self.panels.pop(name, None)
+        if panel is None:
+            return
+
+        for pv_name in list(self.views.keys()):
+            self._remove_view(pv_name, name, panel)
+        panel.chart.setXLink(None)
+        panel.setParent(None)
+        panel.deleteLater()
+
+    def show_curve(self, pv_name, panel_name):
+        """
+        Show a curve of the main display on a panel.
+
+        Parameters
+        ----------
+        pv_name : str
+            The name of the PV the curve is being plotted for
+        panel_name : str
+            The name of the panel
+
+        Returns
+        -------
+        True if the curve was added to the panel; False if the curve or the panel does not exist, or if the panel
+        already shows the curve : bool
+        """
+        source_curve = self.main_display.channel_map.get(pv_name)
+        panel = self.panels.get(panel_name)
+        if source_curve is None or panel is None:
+            return False
+
+        panel_views = self.views.setdefault(pv_name, OrderedDict())
+        if panel_name in panel_views:
+            return False
+
+        view = panel.chart.addLinkedCurve(source_curve, name=pv_name)
+        panel.chart.addLegendItem(view, pv_name, self.main_display.show_legend_chk.isChecked())
+        panel_views[panel_name] = view
+        return True
+
+    def get_views(self, pv_name):
+        return list(self.views.get(pv_name, dict()).values())
+
+    def release_views(self, pv_name, source_curve):
+        """
+        Remove all the views of a curve, e.g. because the curve is removed or detached from the main display. The
+        curves of the hidden workspaces may plot the same PV as a curve shown, so the views are matched by their
+        source curve.
+
+        Parameters
+        ----------
+        pv_name : str
+            The name of the PV the curve is being plotted for
+        source_curve : BasePlotCurveItem
+            The curve the views draw from
+        """
+        for panel_name, view in list(self.views.get(pv_name, dict()).items()):
+            if view.source_curve is source_curve:
+                self._remove_view(pv_name, panel_name, self.panels[panel_name])
+
+    def _remove_view(self, pv_name, panel_name, panel):
+        panel_views = self.views.get(pv_name)
+        if not panel_views or panel_name not in panel_views:
+            return
+
+        view = panel_views.pop(panel_name)
+        panel.chart.removeLegendItem(pv_name)
+        panel.chart.removeLinkedCurve(view)
+        if not panel_views:
+            del self.views[pv_name]
+
+    def set_layout(self, layout):
+        """
+        Stack the panels under the main chart, or tile them side by side with it.
+
+        Parameters
+        ----------
+        layout : str
+            STACKED_LAYOUT or TILED_LAYOUT
+        """
+        self.splitter.setOrientation(Qt.Horizontal if layout == TILED_LAYOUT else Qt.Vertical)
+
+    def apply_chart_settings(self, chart=None):
+        """
+        Give the panels the colors, the legend, the redraw rate and the decimation of the main chart.
+
+        Parameters
+        ----------
+        chart : ChartingTimePlot
+            The chart of a single panel to update, or None to update all the panels
+        """
+        main_chart = self.main_display.chart
+        charts = [chart] if chart is not None else [panel.chart for panel in self.panels.values()]
+        for chart in charts:
+            chart.setBackgroundColor(main_chart.getBackgroundColor())
+            chart.setAxisColor(main_chart.getAxisColor())
+            chart.setShowLegend(self.main_display.show_legend_chk.isChecked())
+            chart.maxRedrawRate = main_chart.maxRedrawRate
+            chart.setDecimationEnabled(main_chart.getDecimationEnabled())
+            chart.setDecimationFactor(main_chart.getDecimationFactor())
+
+    def set_redraw_suspended(self, suspended):
+        for panel in self.panels.values():
+            panel.chart.setRedrawSuspended(suspended)
+
+    def update_curve_data(self, curve):
+        # The views share the data, and hence the status, of the curves of the main chart
+        pass
@@ -0,0 +1,60 @@
+# The Per-Curve Controls State
+
+import numpy as np
+
+
+class CurveControls:
+    def __init__(self, pv_name, color):
+        """
+        Hold the state of the controls of a single curve, i.e. one row of the curve list. No widget is created per
+        curve: the curve list view paints the rows from this state, and only for the rows on the screen.
+
+        Parameters
+        ----------
+        pv_name : str
+            The name of the PV the curve is being plotted for, including the protocol
+        color : QColor
+            The current color of the curve
+        """
+        self.pv_name = pv_name
+        self.display_name = pv_name.split("://")[-1]
+        self.color = color
+        self.is_checked = True
+
+        # None until the first data update, so that the first update always applies the states
+        self.is_active = None
+        self.value = np.nan
+        self.status_text = ""
+        self.buffer_text = ""
+
+    def set_active(self, is_active):
+        """
+        Enable the controls if the PV becomes active, or disable them if the PV becomes inactive. The checkbox of an
+        inactive PV is unchecked, and checked again when the PV comes back.
+
+        Parameters
+        ----------
+        is_active : bool
+            True if the PV currently has a valid (non-NaN) value; False otherwise
+
+        Returns
+        -------
+        True if the state has flipped; False otherwise : bool
+        """
+        is_active = bool(is_active)
+        if is_active == self.is_active:
+            return False
+
+        if not is_active:
+            self.is_checked = False
+        elif self.is_active is not None:
+            # The PV comes back after being inactive
+            self.is_checked = True
+
+        self.is_active = is_active
+        return True
+
+    @property
+    def is_enabled(self):
+        # The controls are enabled until the PV is known to be inactive
+        return self.is_active is not False
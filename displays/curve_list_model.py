@@ -0,0 +1,260 @@
+# The Model of the Curve List
+
+import numpy as np
+
+from qtpy.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Signal
+
+from displays.curve_controls import CurveControls
+
+NAME_COLUMN = 0
+VALUE_COLUMN = 1
+ACTIONS_COLUMN = 2
+
+COLUMN_HEADERS = ("Curve", "Value", "")
+
+PV_NAME_ROLE = Qt.UserRole
+ENABLED_ROLE = Qt.UserRole + 1
+
+ALL_STATUS_FILTER = "All"
+ACTIVE_STATUS_FILTER = "Active"
+INACTIVE_STATUS_FILTER = "Inactive"
+HIDDEN_STATUS_FILTER = "Hidden"
+STATUS_FILTERS = (ALL_STATUS_FILTER, ACTIVE_STATUS_FILTER, INACTIVE_STATUS_FILTER, HIDDEN_STATUS_FILTER)
+
+
+class CurveListModel(QAbstractTableModel):
+    # Emitted with the PV name and the new state when the user checks or unchecks a curve
+    visibility_toggled = Signal(str, bool)
+
+    def __init__(self, parent=None):
+        """
+        A table of the curves of the chart, one row per curve, holding the state of the curve controls. The rows
+        changed by a refresh are reported to the views in a single notification.
+
+        Parameters
+        ----------
+        parent : QObject
+            The parent of the model
+        """
+        super(CurveListModel, self).__init__(parent)
+        self.rows = list()
+        self.row_numbers = dict()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMN_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return COLUMN_HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        controls = self.rows[index.row()]
+        column = index.column()
+        if role == Qt.DisplayRole:
+            if column == NAME_COLUMN:
+                return controls.display_name
+            if column == VALUE_COLUMN:
+                return controls.status_text
+        elif role == Qt.CheckStateRole and column == NAME_COLUMN:
+            return Qt.Checked if controls.is_checked else Qt.Unchecked
+        elif role == Qt.ForegroundRole and column != ACTIONS_COLUMN:
+            return controls.color
+        elif role == Qt.ToolTipRole:
+            return "\n".join(text for text in (controls.pv_name, controls.buffer_text) if text)
+        elif role == PV_NAME_ROLE:
+            return controls.pv_name
+        elif role == ENABLED_ROLE:
+            return controls.is_enabled
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+
+        controls = self.rows[index.row()]
+        if index.column() == ACTIONS_COLUMN:
+            # Keep the Remove button enabled to make removing inactive PVs possible anytime
+            return Qt.ItemIsEnabled
+        if not controls.is_enabled:
+            return Qt.NoItemFlags
+        if index.column() == NAME_COLUMN:
+            return Qt.ItemIsEnabled | Qt.ItemIsUserCheckable
+        return Qt.ItemIsEnabled
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or index.column() != NAME_COLUMN or role != Qt.CheckStateRole:
+            return False
+
+        controls = self.rows[index.row()]
+        controls.is_checked = value == Qt.Checked
+        # All the roles may change, so that the proxy model filters the row again by its status
+        self.dataChanged.emit(index, index)
+        self.visibility_toggled.emit(controls.pv_name, controls.is_checked)
+        return True
+
+    def get_controls(self, pv_name):
+        row = self.row_numbers.get(pv_name)
+        return None if row is None else self.rows[row]
+
+    def add_curve(self, pv_name, color):
+        """
+        Append a row for a new curve.
+
+        Parameters
+        ----------
+        pv_name : str
+            The name of the PV the curve is being plotted for
+        color : QColor
+            The color of the curve, used to paint its name and value
+
+        Returns
+        -------
+        The state of the new row : CurveControls
+        """
+        row = len(self.rows)
+        self.beginInsertRows(QModelIndex(), row, row)
+        controls = CurveControls(pv_name, color)
+        self.rows.append(controls)
+        self.row_numbers[pv_name] = row
+        self.endInsertRows()
+        return controls
+
+    def remove_curve(self, pv_name):
+        row = self.row_numbers.get(pv_name)
+        if row is None:
+            return
+
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.rows[row]
+        del self.row_numbers[pv_name]
+        for later_row in range(row, len(self.rows)):
+            self.row_numbers[self.rows[later_row].pv_name] = later_row
+        self.endRemoveRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.rows = list()
+        self.row_numbers = dict()
+        self.endResetModel()
+
+    def set_checked(self, pv_name, is_checked):
+        """
+        Check or uncheck a curve without reporting it as toggled by the user.
+        """
+        row = self.row_numbers.get(pv_name)
+        if row is not None:
+            self.rows[row].is_checked = is_checked
+            self.dataChanged.emit(self.index(row, NAME_COLUMN), self.index(row, NAME_COLUMN))
+
+    def set_active(self, pv_name, is_active):
+        """
+        Update the active state of a curve. The views are only notified if the state actually flips.
+
+        Parameters
+        ----------
+        pv_name : str
+            The name of the PV the curve is being plotted for
+        is_active : bool
+            True if the PV currently has a valid (non-NaN) value; False otherwise
+        """
+        row = self.row_numbers.get(pv_name)
+        if row is not None and self.rows[row].set_active(is_active):
+            self.dataChanged.emit(self.index(row, NAME_COLUMN), self.index(row, ACTIONS_COLUMN))
+
+    def set_color(self, pv_name, color):
+        row = self.row_numbers.get(pv_name)
+        if row is not None:
+            self.rows[row].color = color
+            self.dataChanged.emit(self.index(row, NAME_COLUMN), self.index(row, VALUE_COLUMN),
+                                  [Qt.ForegroundRole])
+
+    def update_statuses(self, statuses):
+        """
+        Update the value and buffer texts of several curves, notifying the views once for all the rows whose texts
+        changed.
+
+        Parameters
+        ----------
+        statuses : list
+            (pv_name, value, status_text, buffer_text) tuples
+        """
+        first_row = None
+        last_row = None
+        for pv_name, value, status_text, buffer_text in statuses:
+            row = self.row_numbers.get(pv_name)
+            if row is None:
+                continue
+
+            controls = self.rows[row]
+            controls.value = value
+            if status_text == controls.status_text and buffer_text == controls.buffer_text:
+                continue
+            controls.status_text = status_text
+            controls.buffer_text = buffer_text
+            first_row = row if first_row is None else min(first_row, row)
+            last_row = row if last_row is None else max(last_row, row)
+
+        if first_row is not None:
+            self.dataChanged.emit(self.index(first_row, NAME_COLUMN), self.index(last_row, VALUE_COLUMN),
+                                  [Qt.DisplayRole, Qt.ToolTipRole])
+
+
+class CurveListProxyModel(QSortFilterProxyModel):
+    def __init__(self, parent=None):
+        """
+        Filter the curve list by name and status, and sort it by name or value. Without a sort column, the curves
+        keep the order they were added in.
+
+        Parameters
+        ----------
+        parent : QObject
+            The parent of the proxy model
+        """
+        super(CurveListProxyModel, self).__init__(parent)
+        self.status_filter = ALL_STATUS_FILTER
+        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.setFilterKeyColumn(NAME_COLUMN)
+
+    def set_status_filter(self, status_filter):
+        """
+        Show only the curves with a status.
+
+        Parameters
+        ----------
+        status_filter : str
+            One of STATUS_FILTERS
+        """
+        self.status_filter = status_filter
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not super(CurveListProxyModel, self).filterAcceptsRow(source_row, source_parent):
+            return False
+
+        controls = self.sourceModel().rows[source_row]
+        if self.status_filter == ACTIVE_STATUS_FILTER:
+            return controls.is_active is True
+        if self.status_filter == INACTIVE_STATUS_FILTER:
+            return controls.is_active is False
+        if self.status_filter == HIDDEN_STATUS_FILTER:
+            return not controls.is_checked
+        return True
+
+    def lessThan(self, left, right):
+        rows = self.sourceModel().rows
+        return _get_sort_key(rows[left.row()], left.column()) < _get_sort_key(rows[right.row()], right.column())
+
+
+def _get_sort_key(controls, column):
+    if column == VALUE_COLUMN:
+        # The inactive curves and the curves without a value yet go last
+        has_value = controls.is_active is not False and not np.isnan(controls.value)
+        return not has_value, controls.value if has_value else 0.0, controls.display_name.lower()
+    return controls.display_name.lower()
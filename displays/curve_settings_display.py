@@ -4,21 +4,22 @@ from pydm import Display
 from pydm.widgets.baseplot import BasePlotCurveItem
 
 from qtpy.QtCore import Qt, QSize
-from qtpy.QtWidgets import QFormLayout, QLabel, QComboBox, QSpinBox, QPushButton, QColorDialog, QCheckBox
-from qtpy.QtGui import QPalette
+from qtpy.QtWidgets import QFormLayout, QLabel, QComboBox, QSpinBox, QPushButton, QColorDialog
 
 
 class CurveSettingsDisplay(Display):
-    def __init__(self, main_display, pv_name, parent=None):
+    def __init__(self, main_display, pv_names, parent=None):
         """
-        Create all the widgets for the curve appearance settings.
+        Create all the widgets for the curve appearance settings. Each change is applied to all the curves the
+        dialog is brought up for.
 
         Parameters
         ----------
         main_display : PyDMChartingDisplay
             The main display window
-        pv_name: str
-            The name of the PV the current curve is being plotted for
+        pv_names: list
+            The names of the PVs the curves are being plotted for. The dialog starts with the settings of the first
+            curve
         parent : QWidget
             The parent widget, if applicable
         """
@@ -27,11 +28,16 @@ class CurveSettingsDisplay(Display):
         self.main_display = main_display
 
         self.chart = self.main_display.chart
-        self.pv_name = pv_name
+        self.pv_names = list(pv_names)
+        self.pv_name = self.pv_names[0]
         self.channel_map = self.main_display.channel_map
-        self.app = self.main_display.app
 
-        self.curve_original_color = None
+        # The colors the curves had when the dialog was brought up, restored by the Reset button
+        self.curve_original_colors = dict()
+        for pv_name in self.pv_names:
+            curve = self.channel_map.get(pv_name)
+            if curve:
+                self.curve_original_colors[pv_name] = curve.color
         self.curve_color_lbl = QLabel("Curve Color ")
         self.curve_color_btn = QPushButton()
         self.curve_color_btn.setMaximumWidth(20)
@@ -53,7 +59,10 @@ class CurveSettingsDisplay(Display):
         self.close_dialog_btn = QPushButton("Close")
         self.close_dialog_btn.clicked.connect(self.handle_close_button_clicked)
 
-        self.setWindowTitle(self.pv_name.split("://")[1])
+        if len(self.pv_names) == 1:
+            self.setWindowTitle(self.pv_name.split("://")[-1])
+        else:
+            self.setWindowTitle("{0} Curves".format(len(self.pv_names)))
         self.setFixedSize(QSize(300, 200))
         self.setWindowModality(Qt.ApplicationModal)
 
@@ -112,7 +121,7 @@ class CurveSettingsDisplay(Display):
         """
         Make the dialog widgets display the current appearance settings of the current curve.
         """
-        curve = self.chart.findCurve(self.pv_name)
+        curve = self.channel_map.get(self.pv_name)
         if curve:
             self.curve_color_btn.setStyleSheet("background-color: " + curve.color.name())
 
@@ -142,16 +151,12 @@ class CurveSettingsDisplay(Display):
 
     def handle_curve_color_button_clicked(self):
         selected_color = QColorDialog.getColor()
-        curve = self.chart.findCurve(self.pv_name)
-        if curve:
-            self.curve_original_color = curve.color
-            curve.color = selected_color
-            self.curve_color_btn.setStyleSheet("background-color: " + curve.color.name())
+        if not selected_color.isValid():
+            # The color dialog was canceled
+            return
 
-            self.chart.refreshCurve(curve)
-            self.channel_map[self.pv_name] = curve
-
-            self.app.establish_widget_connections(self.main_display)
+        self.curve_color_btn.setStyleSheet("background-color: " + selected_color.name())
+        self.main_display.restyle_curves(self.pv_names, color=selected_color)
 
     def handle_symbol_index_changed(self, selected_index):
         """
@@ -162,13 +167,8 @@ class CurveSettingsDisplay(Display):
         selected_index : int
             The currently selected index from the symbol combo box
         """
-        curve = self.chart.findCurve(self.pv_name)
-        if curve:
-            curve.symbol = BasePlotCurveItem.symbols[self.symbol_cmb.itemText(selected_index)]
-            self.chart.refreshCurve(curve)
-            self.channel_map[self.pv_name] = curve
-
-            self.app.establish_widget_connections(self.main_display)
+        symbol = BasePlotCurveItem.symbols[self.symbol_cmb.itemText(selected_index)]
+        self.main_display.restyle_curves(self.pv_names, symbol=symbol)
 
     def handle_symbol_size_changed(self, new_size):
         """
@@ -179,13 +179,7 @@ class CurveSettingsDisplay(Display):
         new_size : int
             The new symbol size set by the user.
         """
-        curve = self.chart.findCurve(self.pv_name)
-        if curve:
-            curve.symbolSize = new_size
-            self.chart.refreshCurve(curve)
-            self.channel_map[self.pv_name] = curve
-
-            self.app.establish_widget_connections(self.main_display)
+        self.main_display.restyle_curves(self.pv_names, symbol_size=new_size)
 
     def handle_line_width_changed(self, new_width):
         """
@@ -196,13 +190,7 @@ class CurveSettingsDisplay(Display):
         new_width: int
             The new line width set by the user.
         """
-        curve = self.chart.findCurve(self.pv_name)
-        if curve:
-            curve.lineWidth = new_width
-            self.chart.refreshCurve(curve)
-            self.channel_map[self.pv_name] = curve
-
-            self.app.establish_widget_connections(self.main_display)
+        self.main_display.restyle_curves(self.pv_names, line_width=new_width)
 
     def handle_line_style_index_changed(self, selected_index):
         """
@@ -213,30 +201,25 @@ class CurveSettingsDisplay(Display):
         selected_index : int
             The currently selected index from the line style combo box
         """
-        curve = self.chart.findCurve(self.pv_name)
-        if curve:
-            curve.lineStyle = BasePlotCurveItem.lines[self.line_style_cmb.itemText(selected_index)]
-            self.chart.refreshCurve(curve)
-            self.channel_map[self.pv_name] = curve
-
-            self.app.establish_widget_connections(self.main_display)
+        line_style = BasePlotCurveItem.lines[self.line_style_cmb.itemText(selected_index)]
+        self.main_display.restyle_curves(self.pv_names, line_style=line_style)
 
     def handle_reset_button_clicked(self):
         """
-        Handle the click of the Reset button. This will set all the dialog widgets to the default curve appearance
-        settings.
+        Handle the click of the Reset button. This will restore the original curve colors, and set all the dialog
+        widgets to the default curve appearance settings.
         """
-        curve = self.chart.findCurve(self.pv_name)
-        if curve:
-            if self.curve_original_color:
-                curve.color = self.curve_original_color
-                self.curve_color_btn.setStyleSheet("background-color: " + curve.color.name())
+        for pv_name, color in self.curve_original_colors.items():
+            self.main_display.restyle_curves([pv_name], color=color)
+        original_color = self.curve_original_colors.get(self.pv_name)
+        if original_color:
+            self.curve_color_btn.setStyleSheet("background-color: " + original_color.name())
 
-            self.symbol_cmb.setCurrentIndex(0)
-            self.symbol_size_spin.setValue(10)
+        self.symbol_cmb.setCurrentIndex(0)
+        self.symbol_size_spin.setValue(10)
 
-            self.line_style_cmb.setCurrentIndex(1)
-            self.line_width_spin.setValue(1)
+        self.line_style_cmb.setCurrentIndex(1)
+        self.line_width_spin.setValue(1)
 
     def closeEvent(self, event):
         self.handle_close_button_clicked()
@@ -246,16 +229,3 @@ class CurveSettingsDisplay(Display):
         Close the dialog when the Close button is clicked.
         """
         self.close()
-
-        curve = self.chart.findCurve(self.pv_name)
-        if curve:
-            # Update the widget checkbox text to the current curve color
-            widgets = self.main_display.findChildren((QCheckBox, QLabel), self.pv_name)
-            for w in widgets:
-                palette = w.palette()
-                palette.setColor(QPalette.Active, QPalette.WindowText, curve.color)
-                w.setPalette(palette)
-                if isinstance(w, QCheckBox):
-                    w.setText(self.pv_name.split("://")[1])
-
-
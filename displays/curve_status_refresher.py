@@ -0,0 +1,100 @@
+# The Batched Refresher for the Curve Status Labels
+
+from qtpy.QtCore import QObject, QTimer
+
+MIN_STATUS_REFRESH_RATE_HZ = 1
+MAX_STATUS_REFRESH_RATE_HZ = 30
+DEFAULT_STATUS_REFRESH_RATE_HZ = 4
+
+STATUS_TEXT_FORMAT = "{0:.3f}"
+VIEW_RANGE_TEXT_FORMAT = "yMin = {0:.3f}, yMax = {1:.3f}"
+BUFFER_TOOLTIP_FORMAT = "Buffer: {0} of {1} points, {2:.1f} MB"
+
+
+class CurveStatusRefresher(QObject):
+    def __init__(self, main_display, refresh_rate_hz=DEFAULT_STATUS_REFRESH_RATE_HZ):
+        """
+        Collect the latest value of every curve updated since the last refresh, and repaint their status labels in
+        one pass on a timer of its own, independently of the data rate.
+
+        Parameters
+        ----------
+        main_display : PyDMChartingDisplay
+            The main display window owning the curve controls
+        refresh_rate_hz : int
+            How many times per second the labels are repainted
+        """
+        super(CurveStatusRefresher, self).__init__(parent=main_display)
+        self.main_display = main_display
+        # The latest values received since the last refresh, by PV name
+        self.latest_values = dict()
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.set_refresh_rate(refresh_rate_hz)
+
+    def set_refresh_rate(self, refresh_rate_hz):
+        """
+        Change how often the labels are repainted.
+
+        Parameters
+        ----------
+        refresh_rate_hz : int
+            How many times per second the labels are repainted
+        """
+        self.refresh_timer.setInterval(int(1000 / refresh_rate_hz))
+
+    def start(self):
+        self.refresh_timer.start()
+
+    def stop(self):
+        self.refresh_timer.stop()
+
+    def update_value(self, pv_name, value):
+        """
+        Record the latest value of a curve. The label is only repainted on the next refresh.
+
+        Parameters
+        ----------
+        pv_name : str
+            The name of the PV the curve is being plotted for
+        value : float
+            The latest y value of the curve
+        """
+        self.latest_values[pv_name] = value
+
+    def remove(self, pv_name):
+        self.latest_values.pop(pv_name, None)
+
+    def refresh(self):
+        """
+        Update the values of the active curves updated since the last refresh in one pass, the list repainting only
+        the rows whose text has changed and are on the screen. The buffer fill level and memory use of each of these
+        curves are reported as the tooltip of its row, and the y range of the view once above the list.
+        """
+        y_min, y_max = self.main_display.chart.getViewBox().viewRange()[1]
+        view_range_text = VIEW_RANGE_TEXT_FORMAT.format(y_min, y_max)
+        view_range_lbl = self.main_display.curve_view_range_lbl
+        if view_range_text != view_range_lbl.text():
+            view_range_lbl.setText(view_range_text)
+
+        if not self.latest_values:
+            return
+
+        curve_list_model = self.main_display.curve_list_model
+        channel_map = self.main_display.channel_map
+
+        latest_values = self.latest_values
+        self.latest_values = dict()
+
+        statuses = list()
+        for pv_name, value in latest_values.items():
+            controls = curve_list_model.get_controls(pv_name)
+            curve = channel_map.get(pv_name)
+            if not controls or not controls.is_active or not curve:
+                continue
+
+            buffer_text = BUFFER_TOOLTIP_FORMAT.format(curve.points_accumulated, curve.getBufferSize(),
+                                                       curve.getBufferMemory() / 1048576.0)
+            statuses.append((pv_name, value, STATUS_TEXT_FORMAT.format(value), buffer_text))
+        curve_list_model.update_statuses(statuses)
@@ -2,49 +2,67 @@
 from setup_paths import setup_paths
 setup_paths()
 
+from collections import OrderedDict
 from functools import partial
-import datetime
+import re
+from timeit import default_timer
 
 import numpy as np
 from pyqtgraph import TextItem, ViewBox
 
 from pydm import Display
-from pydm.widgets.timeplot import PyDMTimePlot, DEFAULT_X_MIN
-from data_io.settings_importer import SettingsImporter
+from pydm.widgets.timeplot import DEFAULT_X_MIN
 
 from pydmcharting_logging import logging
 logger = logging.getLogger(__name__)
 
-from qtpy.QtCore import Qt, QEvent, Slot, QSize, QTimer
+from qtpy.QtCore import Qt, QEvent, Slot, QSize, QThread, QTimer
 from qtpy.QtWidgets import QApplication, QWidget, QCheckBox, QHBoxLayout, QVBoxLayout, QFormLayout, QLabel, QSplitter,\
     QComboBox, QLineEdit, QPushButton, QSlider, QSpinBox, QTabWidget, QColorDialog, QGroupBox, QRadioButton,\
-    QMessageBox, QFileDialog, QScrollArea, QFrame, QSizePolicy, QLayout
-from qtpy.QtGui import QColor, QPalette
-
-from displays.curve_settings_display import CurveSettingsDisplay
-from displays.axis_settings_display import AxisSettingsDisplay
-from displays.chart_data_export_display import ChartDataExportDisplay
+    QMessageBox, QFileDialog, QTableView, QHeaderView, QAbstractItemView, QProgressDialog
+from qtpy.QtGui import QColor
+
+from displays.curve_list_model import CurveListModel, CurveListProxyModel, STATUS_FILTERS, NAME_COLUMN, \
+    VALUE_COLUMN, ACTIONS_COLUMN, PV_NAME_ROLE
+from widgets.curve_style import StyleCache
+from widgets.curve_actions_delegate import CurveActionsDelegate, MODIFY_ACTION, FOCUS_ACTION, ANNOTATE_ACTION, \
+    REMOVE_ACTION
+from widgets.charting_time_plot import ChartingTimePlot
+from widgets.redraw_governor import RedrawGovernor, DEFAULT_FRAME_BUDGET
+from displays.curve_status_refresher import CurveStatusRefresher, MIN_STATUS_REFRESH_RATE_HZ, \
+    MAX_STATUS_REFRESH_RATE_HZ, DEFAULT_STATUS_REFRESH_RATE_HZ
+from displays.performance_monitor import PerformanceMonitor, JSON_FORMAT, PROMETHEUS_FORMAT
+from displays.chart_panel_manager import ChartPanelManager, PANEL_LAYOUTS
+from displays.workspace_manager import WorkspaceManager, SESSION_WORKSPACE_NAME, MIN_WORKSPACE_MEMORY_MB, \
+    MAX_WORKSPACE_MEMORY_MB, DEFAULT_WORKSPACE_MEMORY_MB
 from utilities.utils import random_color, display_message_box
-from data_io.settings_importer import ASYNC_DATA_SAMPLING, SYNC_DATA_SAMPLING
+from data_io.settings_importer import ASYNC_DATA_SAMPLING, SYNC_DATA_SAMPLING, SETTINGS_LOAD_ERRORS
+from data_io.archive_data_source import ARCHIVE_PROTOCOL
 
 MINIMUM_BUFFER_SIZE = 1200
-MAXIMUM_BUFER_SIZE = 65535
+MAXIMUM_BUFFER_SIZE = 10000000
 DEFAULT_BUFFER_SIZE = 7200
 
 MIN_REDRAW_RATE_HZ = 1
 MAX_REDRAW_RATE_HZ = 240
 DEFAULT_REDRAW_RATE_HZ = 30
 
+MIN_FRAME_BUDGET_PERCENT = 10
+MAX_FRAME_BUDGET_PERCENT = 90
+
 MIN_DATA_SAMPLING_RATE_HZ = 1
-MAX_DATA_SAMPLING_RATE_HZ = 360
+MAX_DATA_SAMPLING_RATE_HZ = 10000
 DEFAULT_DATA_SAMPLING_RATE_HZ = 10
 
+GRAPH_DRAWING_SETTINGS_SYNC_HEIGHT = 280
+GRAPH_DRAWING_SETTINGS_ASYNC_HEIGHT = 370
+
 DEFAULT_CHART_BACKGROUND_COLOR = QColor("black")
 DEFAULT_CHART_AXIS_COLOR = QColor("white")
 
-MAX_DISPLAY_PV_NAME_LENGTH = 40
+CURVE_LIST_VALUE_COLUMN_WIDTH = 80
 
-X_AXIS_LABEL_SEPARATOR = " -- "
+PV_LIST_SEPARATORS = re.compile(r"[,;\s]+")
 IMPORT_FILE_FORMAT = "json"
 
 
@@ -65,6 +83,7 @@ class PyDMChartingDisplay(Display):
         super(PyDMChartingDisplay, self).__init__(parent=parent, args=args, macros=macros)
 
         self.channel_map = dict()
+        self.style_cache = StyleCache()
         self.setWindowTitle("PyDM Charting Tool")
 
         self.main_layout = QVBoxLayout()
@@ -76,26 +95,35 @@ class PyDMChartingDisplay(Display):
         self.pv_name_line_edt.installEventFilter(self)
 
         self.pv_protocol_cmb = QComboBox()
-        self.pv_protocol_cmb.addItems(["ca://", "archive://"])
+        self.pv_protocol_cmb.addItems(["ca://", ARCHIVE_PROTOCOL])
 
         self.pv_connect_push_btn = QPushButton("Connect")
         self.pv_connect_push_btn.clicked.connect(self.add_curve)
 
+        self.workspace_lbl = QLabel("Workspace")
+        self.workspace_cmb = QComboBox()
+        self.workspace_cmb.setMinimumContentsLength(16)
+        self.workspace_cmb.addItem(SESSION_WORKSPACE_NAME)
+        self.workspace_cmb.currentTextChanged.connect(self.handle_workspace_changed)
+
+        self.load_workspaces_btn = QPushButton("Load Workspaces...")
+        self.load_workspaces_btn.setToolTip("Add a workspace for each settings file in a directory")
+        self.load_workspaces_btn.clicked.connect(self.handle_load_workspaces_btn_clicked)
+
         self.tab_panel = QTabWidget()
-        self.tab_panel.setMaximumWidth(450)
+        self.tab_panel.setMaximumWidth(560)
         self.curve_settings_tab = QWidget()
         self.chart_settings_tab = QWidget()
 
         self.charting_layout = QHBoxLayout()
-        self.chart = PyDMTimePlot(plot_by_timestamps=False, plot_display=self)
+        self.chart = ChartingTimePlot(plot_by_timestamps=False, plot_display=self)
         self.chart.setPlotTitle("Time Plot")
 
-        self.splitter = QSplitter()
+        # The main chart and the panels showing more views of its curves
+        self.chart_splitter = QSplitter(Qt.Vertical)
+        self.chart_panel_manager = ChartPanelManager(self, self.chart_splitter)
 
-        self.curve_settings_layout = QVBoxLayout()
-        self.curve_settings_layout.setAlignment(Qt.AlignTop)
-        self.curve_settings_layout.setSizeConstraint(QLayout.SetMinAndMaxSize)
-        self.curve_settings_layout.setSpacing(5)
+        self.splitter = QSplitter()
 
         self.crosshair_settings_layout = QVBoxLayout()
         self.crosshair_settings_layout.setAlignment(Qt.AlignTop)
@@ -104,15 +132,90 @@ class PyDMChartingDisplay(Display):
         self.enable_crosshair_chk = QCheckBox("Enable Crosshair")
         self.cross_hair_coord_lbl = QLabel()
 
-        self.curve_settings_inner_frame = QFrame()
-        self.curve_settings_inner_frame.setLayout(self.curve_settings_layout)
-
-        self.curve_settings_scroll = QScrollArea()
-        self.curve_settings_scroll.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        self.curve_settings_scroll.setWidget(self.curve_settings_inner_frame)
-
-        self.curves_tab_layout = QHBoxLayout()
-        self.curves_tab_layout.addWidget(self.curve_settings_scroll)
+        # The curve controls are rows of a model, painted by the view only while they are on the screen
+        self.curve_list_model = CurveListModel(self)
+        self.curve_list_model.visibility_toggled.connect(self.handle_curve_visibility_toggled)
+
+        self.curve_list_proxy_model = CurveListProxyModel(self)
+        self.curve_list_proxy_model.setSourceModel(self.curve_list_model)
+
+        self.curve_actions_delegate = CurveActionsDelegate(self)
+        self.curve_actions_delegate.action_triggered.connect(self.handle_curve_action_triggered)
+
+        self.curve_list_view = QTableView()
+        self.curve_list_view.setModel(self.curve_list_proxy_model)
+        self.curve_list_view.setItemDelegateForColumn(ACTIONS_COLUMN, self.curve_actions_delegate)
+        self.curve_list_view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.curve_list_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.curve_list_view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.curve_list_view.setTextElideMode(Qt.ElideMiddle)
+        self.curve_list_view.setWordWrap(False)
+        self.curve_list_view.setShowGrid(False)
+        self.curve_list_view.verticalHeader().hide()
+        buttons_size = CurveActionsDelegate.getButtonsSize(self.curve_list_view.fontMetrics())
+        # All the rows have the same height, so that the view never measures the rows off the screen
+        self.curve_list_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.curve_list_view.verticalHeader().setDefaultSectionSize(buttons_size.height())
+
+        curve_list_header = self.curve_list_view.horizontalHeader()
+        curve_list_header.setSectionResizeMode(NAME_COLUMN, QHeaderView.Stretch)
+        curve_list_header.setSectionResizeMode(VALUE_COLUMN, QHeaderView.Interactive)
+        curve_list_header.resizeSection(VALUE_COLUMN, CURVE_LIST_VALUE_COLUMN_WIDTH)
+        curve_list_header.setSectionResizeMode(ACTIONS_COLUMN, QHeaderView.Fixed)
+        curve_list_header.resizeSection(ACTIONS_COLUMN, buttons_size.width())
+        # Keep the order the curves were added in, until the user sorts the list
+        curve_list_header.setSortIndicator(-1, Qt.AscendingOrder)
+        self.curve_list_view.setSortingEnabled(True)
+
+        self.curve_filter_edt = QLineEdit()
+        self.curve_filter_edt.setPlaceholderText("Filter by name")
+        self.curve_filter_edt.setClearButtonEnabled(True)
+        self.curve_filter_edt.textChanged.connect(self.curve_list_proxy_model.setFilterFixedString)
+
+        self.curve_status_filter_cmb = QComboBox()
+        self.curve_status_filter_cmb.addItems(STATUS_FILTERS)
+        self.curve_status_filter_cmb.currentTextChanged.connect(self.curve_list_proxy_model.set_status_filter)
+
+        self.curve_view_range_lbl = QLabel()
+
+        self.modify_selected_curves_btn = QPushButton("Modify Selected...")
+        self.modify_selected_curves_btn.setToolTip("Change the appearance of all the curves selected in the list")
+        self.modify_selected_curves_btn.setEnabled(False)
+        self.modify_selected_curves_btn.clicked.connect(self.handle_modify_selected_curves_btn_clicked)
+        self.curve_list_view.selectionModel().selectionChanged.connect(self.handle_curve_selection_changed)
+
+        self.show_in_panel_btn = QPushButton("Show Selected In")
+        self.show_in_panel_btn.setToolTip("Show the curves selected in the list on another chart panel, sharing their "
+                                          "data with the main chart")
+        self.show_in_panel_btn.setEnabled(False)
+        self.show_in_panel_btn.clicked.connect(self.handle_show_in_panel_btn_clicked)
+
+        self.new_chart_panel_text = "New Panel"
+        self.chart_panel_cmb = QComboBox()
+        self.chart_panel_cmb.addItem(self.new_chart_panel_text)
+
+        self.chart_panel_layout_lbl = QLabel("Panels")
+        self.chart_panel_layout_cmb = QComboBox()
+        self.chart_panel_layout_cmb.addItems(PANEL_LAYOUTS)
+        self.chart_panel_layout_cmb.currentTextChanged.connect(self.chart_panel_manager.set_layout)
+
+        self.curve_filter_layout = QHBoxLayout()
+        self.curve_filter_layout.addWidget(self.curve_filter_edt)
+        self.curve_filter_layout.addWidget(self.curve_status_filter_cmb)
+        self.curve_filter_layout.addWidget(self.modify_selected_curves_btn)
+
+        self.curve_panel_layout = QHBoxLayout()
+        self.curve_panel_layout.addWidget(self.show_in_panel_btn)
+        self.curve_panel_layout.addWidget(self.chart_panel_cmb)
+        self.curve_panel_layout.addStretch()
+        self.curve_panel_layout.addWidget(self.chart_panel_layout_lbl)
+        self.curve_panel_layout.addWidget(self.chart_panel_layout_cmb)
+
+        self.curves_tab_layout = QVBoxLayout()
+        self.curves_tab_layout.addLayout(self.curve_filter_layout)
+        self.curves_tab_layout.addLayout(self.curve_panel_layout)
+        self.curves_tab_layout.addWidget(self.curve_view_range_lbl)
+        self.curves_tab_layout.addWidget(self.curve_list_view)
 
         self.enable_crosshair_chk.setChecked(False)
         self.enable_crosshair_chk.clicked.connect(self.handle_enable_crosshair_checkbox_clicked)
@@ -186,6 +289,27 @@ class PyDMChartingDisplay(Display):
         self.chart_redraw_rate_spin.setValue(DEFAULT_REDRAW_RATE_HZ)
         self.chart_redraw_rate_spin.valueChanged.connect(self.handle_redraw_rate_changed)
 
+        self.redraw_governor = RedrawGovernor(self.chart, DEFAULT_REDRAW_RATE_HZ)
+        self.redraw_governor.effective_settings_changed.connect(self.handle_effective_redraw_settings_changed)
+
+        self.chart_adaptive_redraw_layout = QHBoxLayout()
+        self.chart_adaptive_redraw_layout.setSpacing(5)
+
+        self.chart_adaptive_redraw_chk = QCheckBox("Adaptive")
+        self.chart_adaptive_redraw_chk.setToolTip("Lower the redraw rate, then coarsen the decimation, when the "
+                                                  "frames take more than the CPU budget")
+        self.chart_adaptive_redraw_chk.clicked.connect(self.handle_adaptive_redraw_checkbox_clicked)
+
+        self.chart_frame_budget_lbl = QLabel("CPU Budget (%)")
+        self.chart_frame_budget_spin = QSpinBox()
+        self.chart_frame_budget_spin.setRange(MIN_FRAME_BUDGET_PERCENT, MAX_FRAME_BUDGET_PERCENT)
+        self.chart_frame_budget_spin.setValue(int(DEFAULT_FRAME_BUDGET * 100))
+        self.chart_frame_budget_spin.valueChanged.connect(self.handle_frame_budget_changed)
+        self.chart_frame_budget_spin.setEnabled(False)
+
+        self.chart_effective_redraw_rate_lbl = QLabel()
+        self.handle_effective_redraw_settings_changed(DEFAULT_REDRAW_RATE_HZ, 1)
+
         self.chart_data_sampling_rate_lbl = QLabel("Asynchronous Data Sampling Rate (Hz)")
         self.chart_data_async_sampling_rate_spin = QSpinBox()
         self.chart_data_async_sampling_rate_spin.setRange(MIN_DATA_SAMPLING_RATE_HZ, MAX_DATA_SAMPLING_RATE_HZ)
@@ -194,6 +318,16 @@ class PyDMChartingDisplay(Display):
         self.chart_data_sampling_rate_lbl.hide()
         self.chart_data_async_sampling_rate_spin.hide()
 
+        self.chart_status_refresh_rate_lbl = QLabel("Curve Status Refresh Rate (Hz)")
+        self.chart_status_refresh_rate_spin = QSpinBox()
+        self.chart_status_refresh_rate_spin.setRange(MIN_STATUS_REFRESH_RATE_HZ, MAX_STATUS_REFRESH_RATE_HZ)
+        self.chart_status_refresh_rate_spin.setValue(DEFAULT_STATUS_REFRESH_RATE_HZ)
+        self.chart_status_refresh_rate_spin.valueChanged.connect(self.handle_status_refresh_rate_changed)
+
+        self.chart_decimation_chk = QCheckBox("Min/Max Decimation")
+        self.chart_decimation_chk.setChecked(self.chart.getDecimationEnabled())
+        self.chart_decimation_chk.clicked.connect(self.handle_decimation_checkbox_clicked)
+
         self.chart_limit_time_span_layout = QHBoxLayout()
         self.chart_limit_time_span_layout.setSpacing(5)
 
@@ -266,11 +400,44 @@ class PyDMChartingDisplay(Display):
         self.curve_checkbox_panel = QWidget()
 
         self.graph_drawing_settings_grpbx = QGroupBox()
-        self.graph_drawing_settings_grpbx.setFixedHeight(270)
+        self.graph_drawing_settings_grpbx.setFixedHeight(GRAPH_DRAWING_SETTINGS_ASYNC_HEIGHT)
 
         self.axis_settings_grpbx = QGroupBox()
         self.axis_settings_grpbx.setFixedHeight(180)
 
+        self.performance_layout = QVBoxLayout()
+        self.performance_layout.setSpacing(5)
+
+        self.performance_grpbx = QGroupBox("Performance")
+        self.performance_grpbx.setFixedHeight(120)
+
+        self.show_performance_overlay_chk = QCheckBox("Show Performance Overlay")
+        self.show_performance_overlay_chk.setChecked(False)
+        self.show_performance_overlay_chk.clicked.connect(self.handle_show_performance_overlay_checkbox_clicked)
+
+        self.export_performance_metrics_btn = QPushButton("Export Performance Metrics...")
+        self.export_performance_metrics_btn.clicked.connect(self.handle_export_performance_metrics_btn_clicked)
+
+        self.workspace_memory_layout = QHBoxLayout()
+        self.workspace_memory_layout.setSpacing(5)
+
+        self.workspace_memory_lbl = QLabel("Hidden Workspaces Memory (MB)")
+        self.workspace_memory_spin = QSpinBox()
+        self.workspace_memory_spin.setRange(MIN_WORKSPACE_MEMORY_MB, MAX_WORKSPACE_MEMORY_MB)
+        self.workspace_memory_spin.setValue(DEFAULT_WORKSPACE_MEMORY_MB)
+        self.workspace_memory_spin.setToolTip("The memory the curves of the hidden workspaces may keep; the least "
+                                              "recently shown workspaces are released first")
+        self.workspace_memory_spin.valueChanged.connect(self.handle_workspace_memory_changed)
+
+        self.workspace_manager = WorkspaceManager(self, DEFAULT_WORKSPACE_MEMORY_MB * 1048576)
+
+        self.performance_monitor = PerformanceMonitor(self)
+
+        self.curve_status_refresher = CurveStatusRefresher(self)
+
+        # The optional engine receiving the PV values in worker processes instead of through channels
+        self.ingestion_engine = None
+
         self.app = QApplication.instance()
         self.setup_ui()
 
@@ -278,6 +445,10 @@ class PyDMChartingDisplay(Display):
         self.axis_settings_disp = None
         self.chart_data_export_disp = None
         self.chart_data_import_disp = None
+        self.settings_import_thread = None
+        self.settings_loader = None
+        self.settings_import_replace_curves = False
+        self.settings_import_progress_dlg = None
         self.grid_alpha = 5
         self.time_span_limit_hours = None
         self.time_span_limit_minutes = None
@@ -313,6 +484,10 @@ class PyDMChartingDisplay(Display):
         self.pv_layout.addWidget(self.pv_protocol_cmb)
         self.pv_layout.addWidget(self.pv_name_line_edt)
         self.pv_layout.addWidget(self.pv_connect_push_btn)
+        self.pv_layout.addSpacing(20)
+        self.pv_layout.addWidget(self.workspace_lbl)
+        self.pv_layout.addWidget(self.workspace_cmb)
+        self.pv_layout.addWidget(self.load_workspaces_btn)
         QTimer.singleShot(0, self.pv_name_line_edt.setFocus)
 
         self.curve_settings_tab.setLayout(self.curves_tab_layout)
@@ -337,7 +512,8 @@ class PyDMChartingDisplay(Display):
         self.chart_control_layout.setStretch(4, 15)
         self.chart_control_layout.insertSpacing(5, 350)
 
-        self.chart_layout.addWidget(self.chart)
+        self.chart_splitter.addWidget(self.chart)
+        self.chart_layout.addWidget(self.chart_splitter)
         self.chart_layout.addLayout(self.chart_control_layout)
 
         self.chart_panel.setLayout(self.chart_layout)
@@ -402,8 +578,16 @@ class PyDMChartingDisplay(Display):
         self.graph_drawing_settings_layout.addLayout(self.graph_background_color_layout)
         self.graph_drawing_settings_layout.addWidget(self.chart_redraw_rate_lbl)
         self.graph_drawing_settings_layout.addWidget(self.chart_redraw_rate_spin)
+        self.chart_adaptive_redraw_layout.addWidget(self.chart_adaptive_redraw_chk)
+        self.chart_adaptive_redraw_layout.addWidget(self.chart_frame_budget_lbl)
+        self.chart_adaptive_redraw_layout.addWidget(self.chart_frame_budget_spin)
+        self.chart_adaptive_redraw_layout.addWidget(self.chart_effective_redraw_rate_lbl)
+        self.graph_drawing_settings_layout.addLayout(self.chart_adaptive_redraw_layout)
+        self.graph_drawing_settings_layout.addWidget(self.chart_decimation_chk)
         self.graph_drawing_settings_layout.addWidget(self.chart_data_sampling_rate_lbl)
         self.graph_drawing_settings_layout.addWidget(self.chart_data_async_sampling_rate_spin)
+        self.graph_drawing_settings_layout.addWidget(self.chart_status_refresh_rate_lbl)
+        self.graph_drawing_settings_layout.addWidget(self.chart_status_refresh_rate_spin)
         self.graph_drawing_settings_layout.addWidget(self.chart_limit_time_span_chk)
         self.graph_drawing_settings_layout.addLayout(self.chart_limit_time_span_layout)
         self.graph_drawing_settings_layout.addWidget(self.chart_ring_buffer_size_lbl)
@@ -418,12 +602,21 @@ class PyDMChartingDisplay(Display):
         self.axis_settings_layout.addWidget(self.grid_opacity_slr)
         self.axis_settings_grpbx.setLayout(self.axis_settings_layout)
 
+        self.performance_layout.addWidget(self.show_performance_overlay_chk)
+        self.performance_layout.addWidget(self.export_performance_metrics_btn)
+        self.workspace_memory_layout.addWidget(self.workspace_memory_lbl)
+        self.workspace_memory_layout.addWidget(self.workspace_memory_spin)
+        self.performance_layout.addLayout(self.workspace_memory_layout)
+        self.performance_grpbx.setLayout(self.performance_layout)
+
         self.chart_settings_layout.addWidget(self.graph_drawing_settings_grpbx)
         self.chart_settings_layout.addWidget(self.axis_settings_grpbx)
+        self.chart_settings_layout.addWidget(self.performance_grpbx)
         self.chart_settings_layout.addWidget(self.reset_chart_settings_btn)
 
         self.chart_sync_mode_async_radio.toggled.emit(True)
         self.update_datetime_timer.start(1000)
+        self.curve_status_refresher.start()
 
     def eventFilter(self, obj, event):
         """
@@ -455,22 +648,59 @@ class PyDMChartingDisplay(Display):
                     buffer_size = int(self.chart_ring_buffer_size_edt.text())
                     if buffer_size < MINIMUM_BUFFER_SIZE:
                         self.chart_ring_buffer_size_edt.setText(str(MINIMUM_BUFFER_SIZE))
+                    elif buffer_size > MAXIMUM_BUFFER_SIZE:
+                        self.chart_ring_buffer_size_edt.setText(str(MAXIMUM_BUFFER_SIZE))
                 except ValueError:
                     display_message_box(QMessageBox.Critical, "Invalid Values",  "Only integer values are accepted.")
                 return True
         return super(PyDMChartingDisplay, self).eventFilter(obj, event)
 
+    def changeEvent(self, event):
+        """
+        Suspend the chart redraws and the label updates while the window is minimized, and catch up when it is
+        restored. The curves keep buffering their data in the meantime.
+
+        Parameters
+        ----------
+        event : QEvent
+            The change event of the window
+        """
+        super(PyDMChartingDisplay, self).changeEvent(event)
+        if event.type() != QEvent.WindowStateChange:
+            return
+
+        is_minimized = self.isMinimized()
+        self.chart.setRedrawSuspended(is_minimized)
+        self.chart_panel_manager.set_redraw_suspended(is_minimized)
+        if is_minimized:
+            self.update_datetime_timer.stop()
+            self.curve_status_refresher.stop()
+        elif not self.curve_status_refresher.refresh_timer.isActive():
+            self.handle_update_datetime_timer_timeout()
+            self.update_datetime_timer.start(1000)
+            self.curve_status_refresher.refresh()
+            self.curve_status_refresher.start()
+
     def add_curve(self):
         """
-        Add a new curve to the chart.
+        Add new curves to the chart. The PV name box accepts a single PV, or a list of PVs separated by commas,
+        semicolons, spaces, or new lines.
         """
-        pv_name = self._get_full_pv_name(self.pv_name_line_edt.text())
-        color = random_color()
-        for k, v in self.channel_map.items():
-            if color == v.color:
+        used_colors = [v.color for v in self.channel_map.values()]
+        specs = list()
+        for pv_name in PV_LIST_SEPARATORS.split(self.pv_name_line_edt.text()):
+            pv_name = self._get_full_pv_name(pv_name)
+            if not pv_name:
+                continue
+
+            color = random_color()
+            if color in used_colors:
                 color = random_color()
+            used_colors.append(color)
+
+            specs.append(dict(pv_name=pv_name, curve_name=pv_name, color=color))
 
-        self.add_y_channel(pv_name=pv_name, curve_name=pv_name, color=color)
+        self.add_y_channels(specs)
 
     def handle_enable_crosshair_checkbox_clicked(self, is_checked):
         self.chart.enableCrosshair(is_checked)
@@ -478,126 +708,178 @@ class PyDMChartingDisplay(Display):
 
     def add_y_channel(self, pv_name, curve_name, color, line_style=Qt.SolidLine, line_width=2, symbol=None,
                       symbol_size=None):
+        self.add_y_channels([dict(pv_name=pv_name, curve_name=curve_name, color=color, line_style=line_style,
+                                  line_width=line_width, symbol=symbol, symbol_size=symbol_size)])
+
+    def add_y_channels(self, specs, establish_connections=True):
+        """
+        Add several curves to the chart at once. All the curves and their controls are created first, and then the
+        PV channels are connected in a single pass over the display.
+
+        Parameters
+        ----------
+        specs : list
+            A list of dicts, each holding the keyword arguments of add_y_channel for one curve, i.e. pv_name,
+            curve_name, color, and optionally line_style, line_width, symbol, and symbol_size
+        establish_connections : bool
+            True to connect the channels of the new curves right away; False if the caller will do it later
+
+        Returns
+        -------
+        The number of curves added : int
+        """
+        added_count = 0
+        for spec in specs:
+            if self._create_y_channel(**spec):
+                added_count += 1
+
+        if added_count:
+            self.enable_chart_control_buttons()
+            if establish_connections:
+                self.app.establish_widget_connections(self)
+        return added_count
+
+    def _create_y_channel(self, pv_name, curve_name, color, line_style=Qt.SolidLine, line_width=2, symbol=None,
+                          symbol_size=None):
+        """
+        Create a curve and its controls, without connecting the curve's channel.
+
+        Returns
+        -------
+        True if the curve was created; False if the PV has already been added : bool
+        """
         if pv_name in self.channel_map:
             logger.error("'{0}' has already been added.".format(pv_name))
-            return
-
-        curve = self.chart.addYChannel(y_channel=pv_name, name=curve_name, color=color, lineStyle=line_style,
-                                       lineWidth=line_width, symbol=symbol, symbolSize=symbol_size)
+            return False
+
+        if pv_name.startswith(ARCHIVE_PROTOCOL):
+            # Archived data is fetched in the background rather than through a channel
+            curve = self.chart.addArchiveCurve(pv_name, name=curve_name, color=color, lineStyle=line_style,
+                                               lineWidth=line_width, symbol=symbol, symbolSize=symbol_size)
+        elif self.ingestion_engine:
+            curve = self.chart.addFedCurve(pv_name, name=curve_name, color=color, lineStyle=line_style,
+                                           lineWidth=line_width, symbol=symbol, symbolSize=symbol_size)
+            self.ingestion_engine.add_curve(pv_name, curve)
+        else:
+            curve = self.chart.addYChannel(y_channel=pv_name, name=curve_name, color=color, lineStyle=line_style,
+                                           lineWidth=line_width, symbol=symbol, symbolSize=symbol_size)
         self.channel_map[pv_name] = curve
         self.generate_pv_controls(pv_name, color)
+        return True
+
+    def add_frozen_curve(self, curve_name, timestamps, values, lod_pyramid, source_address=None, color=None,
+                         line_style=Qt.SolidLine, line_width=2, symbol=None, symbol_size=None):
+        """
+        Add a curve displaying recorded data, e.g. reloaded from a snapshot. The curve gets the same controls as the
+        live curves, but has no channel to connect.
 
+        Parameters
+        ----------
+        curve_name : str
+            The name of the curve, including the protocol of the PV it was recorded from
+        timestamps : numpy.ndarray
+            The timestamps of the samples, in ascending order
+        values : numpy.ndarray
+            The values of the samples
+        lod_pyramid : LodPyramid
+            The multi-resolution history of the samples
+        source_address : str
+            The address of the PV the data was recorded from
+
+        Returns
+        -------
+        True if the curve was added; False if a curve with the same name already exists : bool
+        """
+        if curve_name in self.channel_map:
+            logger.error("'{0}' has already been added.".format(curve_name))
+            return False
+
+        if color is None:
+            color = random_color()
+
+        curve = self.chart.addFrozenCurve(timestamps, values, lod_pyramid, source_address=source_address,
+                                          name=curve_name, color=color, lineStyle=line_style, lineWidth=line_width,
+                                          symbol=symbol, symbolSize=symbol_size)
+        self.channel_map[curve_name] = curve
+        self.generate_pv_controls(curve_name, color)
         self.enable_chart_control_buttons()
-        self.app.establish_widget_connections(self)
+        return True
+
+    def enable_ingestion_engine(self, ingestion_engine):
+        """
+        Receive the values of the PVs added from now on through an ingestion engine, which samples them in worker
+        processes, instead of through channels on the GUI thread.
+
+        Parameters
+        ----------
+        ingestion_engine : IngestionEngine
+            The engine, not started yet
+        """
+        self.ingestion_engine = ingestion_engine
+        self.ingestion_engine.start()
+        self.update_ingestion_engine_sampling()
+
+    def update_ingestion_engine_sampling(self):
+        if self.ingestion_engine:
+            self.ingestion_engine.configure(self.data_sampling_mode == ASYNC_DATA_SAMPLING,
+                                            self.chart_data_async_sampling_rate_spin.value())
 
     def generate_pv_controls(self, pv_name, curve_color):
         """
-        Generate a set of widgets to manage the appearance of a curve. The set of widgets includes:
+        Add a row for a curve to the curve list. The row holds:
             1. A checkbox which shows the curve on the chart if checked, and hide the curve if not checked
-            2. Two buttons -- Modify... and Remove. Modify... will bring up the Curve Settings dialog. Remove will
-               delete the curve from the chart
-        This set of widgets will be hidden initially, until the first curve is plotted.
+            2. The latest value of the curve
+            3. Four buttons -- Modify..., Focus, Annotate... and Remove. Modify... will bring up the Curve Settings
+               dialog. Remove will delete the curve from the chart
+        The curve list will be hidden initially, until the first curve is plotted.
 
         Parameters
         ----------
         pv_name: str
             The name of the PV the current curve is being plotted for
-
         curve_color : QColor
-            The color of the curve to paint for the checkbox label to help the user track the curve to the checkbox
+            The color of the curve to paint for the curve name to help the user track the curve to its row
         """
-        checkbox = QCheckBox()
-        checkbox.setObjectName(pv_name)
-
-        palette = checkbox.palette()
-        palette.setColor(QPalette.Active, QPalette.WindowText, curve_color)
-        checkbox.setPalette(palette)
-
-        display_name = pv_name.split("://")[1]
-        if len(display_name) > MAX_DISPLAY_PV_NAME_LENGTH:
-            # Only display max allowed number of characters of the PV Name
-            display_name = display_name[:int(MAX_DISPLAY_PV_NAME_LENGTH / 2) - 1] + "..." + \
-                           display_name[-int(MAX_DISPLAY_PV_NAME_LENGTH / 2) + 2:]
-
-        checkbox.setText(display_name)
-
-        data_text = QLabel()
-        data_text.setObjectName(pv_name)
-        data_text.setPalette(palette)
-
-        checkbox.setChecked(True)
-        checkbox.clicked.connect(partial(self.handle_curve_chkbox_toggled, checkbox))
-
-        curve_btn_layout = QHBoxLayout()
-
-        modify_curve_btn = QPushButton("Modify...")
-        modify_curve_btn.setObjectName(pv_name)
-        modify_curve_btn.setMaximumWidth(100)
-        modify_curve_btn.clicked.connect(partial(self.display_curve_settings_dialog, pv_name))
-
-        focus_curve_btn = QPushButton("Focus")
-        focus_curve_btn.setObjectName(pv_name)
-        focus_curve_btn.setMaximumWidth(100)
-        focus_curve_btn.clicked.connect(partial(self.focus_curve, pv_name))
-
-        annotate_curve_btn = QPushButton("Annotate...")
-        annotate_curve_btn.setObjectName(pv_name)
-        annotate_curve_btn.setMaximumWidth(100)
-        annotate_curve_btn.clicked.connect(partial(self.annotate_curve, pv_name))
-
-        remove_curve_btn = QPushButton("Remove")
-        remove_curve_btn.setObjectName(pv_name)
-        remove_curve_btn.setMaximumWidth(100)
-        remove_curve_btn.clicked.connect(partial(self.remove_curve, pv_name))
-
-        curve_btn_layout.addWidget(modify_curve_btn)
-        curve_btn_layout.addWidget(focus_curve_btn)
-        curve_btn_layout.addWidget(annotate_curve_btn)
-        curve_btn_layout.addWidget(remove_curve_btn)
-
-        individual_curve_layout = QVBoxLayout()
-        individual_curve_layout.addWidget(checkbox)
-        individual_curve_layout.addWidget(data_text)
-        individual_curve_layout.addLayout(curve_btn_layout)
-
-        size_policy = QSizePolicy()
-        size_policy.setVerticalPolicy(QSizePolicy.Fixed)
-        individual_curve_grpbx = QGroupBox()
-        individual_curve_grpbx.setSizePolicy(size_policy)
-
-        individual_curve_grpbx.setObjectName(pv_name)
-        individual_curve_grpbx.setLayout(individual_curve_layout)
-
-        self.curve_settings_layout.addWidget(individual_curve_grpbx)
+        self.curve_list_model.add_curve(pv_name, curve_color)
         self.tab_panel.show()
 
-    def handle_curve_chkbox_toggled(self, checkbox):
+    def handle_curve_visibility_toggled(self, pv_name, is_visible):
         """
-        Handle a checkbox's checked and unchecked events.
+        Handle a curve being checked or unchecked in the curve list.
 
-        If a checkbox is checked, find the curve from the channel map. If found, re-draw the curve with its previous
+        If a curve is checked, find the curve from the channel map. If found, re-draw the curve with its previous
         appearance settings.
 
-        If a checkbox is unchecked, remove the curve from the chart, but keep the cached data in the channel map.
+        If a curve is unchecked, hide the curve from the chart, but keep buffering its data.
 
         Parameters
         ----------
-        checkbox : QCheckBox
-            The current checkbox being toggled
+        pv_name : str
+            The name of the PV the curve is being plotted for
+        is_visible : bool
+            True if the curve has been checked; False otherwise
         """
-        pv_name = self._get_full_pv_name(checkbox.text())
-
-        if checkbox.isChecked():
+        if is_visible:
             curve = self.channel_map.get(pv_name, None)
             if curve:
                 self.chart.addLegendItem(curve, pv_name, self.show_legend_chk.isChecked())
                 curve.show()
         else:
-            curve = self.chart.findCurve(pv_name)
+            curve = self.channel_map.get(pv_name)
             if curve:
                 curve.hide()
                 self.chart.removeLegendItem(pv_name)
 
+    def handle_curve_action_triggered(self, action, pv_name):
+        if action == MODIFY_ACTION:
+            self.display_curve_settings_dialog(pv_name)
+        elif action == FOCUS_ACTION:
+            self.focus_curve(pv_name)
+        elif action == ANNOTATE_ACTION:
+            self.annotate_curve(pv_name)
+        elif action == REMOVE_ACTION:
+            self.remove_curve(pv_name)
+
     def display_curve_settings_dialog(self, pv_name):
         """
         Bring up the Curve Settings dialog to modify the appearance of a curve.
@@ -608,16 +890,75 @@ class PyDMChartingDisplay(Display):
             The name of the PV the curve is being plotted for
 
         """
-        self.curve_settings_disp = CurveSettingsDisplay(self, pv_name)
+        self.display_curves_settings_dialog([pv_name])
+
+    def display_curves_settings_dialog(self, pv_names):
+        """
+        Bring up the Curve Settings dialog to modify the appearance of several curves at once.
+
+        Parameters
+        ----------
+        pv_names : list
+            The names of the PVs the curves are being plotted for
+        """
+        # The dialog modules are imported on first use, to keep them out of the startup time
+        from displays.curve_settings_display import CurveSettingsDisplay
+
+        self.curve_settings_disp = CurveSettingsDisplay(self, pv_names)
         self.curve_settings_disp.show()
 
+    def get_selected_curve_names(self):
+        return [index.data(PV_NAME_ROLE) for index in self.curve_list_view.selectionModel().selectedRows()]
+
+    def handle_curve_selection_changed(self, selected, deselected):
+        has_selection = self.curve_list_view.selectionModel().hasSelection()
+        self.modify_selected_curves_btn.setEnabled(has_selection)
+        self.show_in_panel_btn.setEnabled(has_selection)
+
+    def handle_modify_selected_curves_btn_clicked(self):
+        pv_names = self.get_selected_curve_names()
+        if pv_names:
+            self.display_curves_settings_dialog(pv_names)
+
+    def restyle_curves(self, pv_names, **changes):
+        """
+        Change the appearance of curves in place, with the pens and brushes of the style cache, along with their views
+        on the chart panels. The channels of the curves stay connected, and no other curve is touched.
+
+        Parameters
+        ----------
+        pv_names : list
+            The names of the PVs the curves are being plotted for
+        changes : dict
+            The new values of any of color, line_width, line_style, symbol and symbol_size
+        """
+        for pv_name in pv_names:
+            curve = self.channel_map.get(pv_name)
+            if not curve:
+                continue
+
+            self.style_cache.restyle(curve, **changes)
+            for view in self.chart_panel_manager.get_views(pv_name):
+                self.style_cache.restyle(view, **changes)
+            if "color" in changes:
+                self.curve_list_model.set_color(pv_name, curve.color)
+
+        legend = self.chart.plotItem.legend
+        if legend is not None:
+            # The legend samples are painted with the curve styles
+            legend.update()
+
     def focus_curve(self, pv_name):
-        curve = self.chart.findCurve(pv_name)
+        curve = self.channel_map.get(pv_name)
         if curve:
-            self.chart.plotItem.setYRange(curve.minY, curve.maxY, padding=0)
+            y_min, y_max = curve.minY, curve.maxY
+            if np.isnan(y_min):
+                # No value has been received yet
+                return
+            self.chart.plotItem.setYRange(y_min, y_max, padding=0)
 
     def annotate_curve(self, pv_name):
-        curve = self.chart.findCurve(pv_name)
+        curve = self.channel_map.get(pv_name)
         if curve:
             annot = TextItem(html='<div style="text-align: center"><span style="color: #FFF;">This is the'
                                   '</span><br><span style="color: #FF0; font-size: 16pt;">PEAK</span></div>',
@@ -635,24 +976,94 @@ class PyDMChartingDisplay(Display):
         pv_name : str
             The name of the PV the curve is being plotted for
         """
-        curve = self.chart.findCurve(pv_name)
+        # The curves of the hidden workspaces are on the chart too, so the curve is looked up among those shown
+        curve = self.channel_map.get(pv_name)
         if curve:
-            self.chart.removeYChannel(curve)
             del self.channel_map[pv_name]
+            self.release_curve(pv_name, curve)
             self.chart.removeLegendItem(pv_name)
 
-            widgets = self.findChildren((QCheckBox, QLabel, QPushButton, QGroupBox), pv_name)
-            for w in widgets:
-                w.deleteLater()
+            self.curve_list_model.remove_curve(pv_name)
+            self.curve_status_refresher.remove(pv_name)
 
-        if len(self.chart.getCurves()) < 1:
+        if not self.channel_map:
             self.enable_chart_control_buttons(False)
             self.show_legend_chk.setChecked(False)
 
+    def release_curve(self, pv_name, curve):
+        """
+        Remove a curve from the chart, disconnecting its channel, whether it is shown or detached with a hidden
+        workspace. The views of the curve on the chart panels are removed too.
+
+        Parameters
+        ----------
+        pv_name : str
+            The name of the PV the curve is being plotted for
+        curve : BasePlotCurveItem
+            The curve to remove
+        """
+        self.chart_panel_manager.release_views(pv_name, curve)
+        # The workspace shown may plot the same PV with a curve of its own
+        if pv_name not in self.channel_map:
+            self.curve_status_refresher.remove(pv_name)
+        self.chart.removeYChannel(curve)
+        if self.ingestion_engine:
+            self.ingestion_engine.remove_curve(pv_name, curve)
+
+    def get_hidden_curve_names(self):
+        return set(controls.pv_name for controls in self.curve_list_model.rows if not controls.is_checked)
+
+    def detach_curves(self):
+        """
+        Take all the curves off the display, e.g. to show another workspace. The curves stay on the chart, hidden
+        and still buffering their data, but lose their rows in the curve list, their legend items, and their views on
+        the chart panels.
+
+        Returns
+        -------
+        The detached curves by PV name : OrderedDict
+        """
+        curves = OrderedDict(self.channel_map)
+        for pv_name, curve in curves.items():
+            curve.hide()
+            self.chart.removeLegendItem(pv_name)
+            self.curve_status_refresher.remove(pv_name)
+            self.chart_panel_manager.release_views(pv_name, curve)
+
+        self.channel_map.clear()
+        self.curve_list_model.clear()
+        self.enable_chart_control_buttons(False)
+        return curves
+
+    def attach_curves(self, curves, hidden_pv_names=()):
+        """
+        Put detached curves back on the display, with their history.
+
+        Parameters
+        ----------
+        curves : OrderedDict
+            The curves by PV name, as returned by detach_curves
+        hidden_pv_names : set
+            The PV names of the curves to keep hidden, i.e. unchecked in the curve list
+        """
+        for pv_name, curve in curves.items():
+            self.channel_map[pv_name] = curve
+            self.generate_pv_controls(pv_name, curve.color)
+            if pv_name in hidden_pv_names:
+                self.curve_list_model.set_checked(pv_name, False)
+            else:
+                self.chart.addLegendItem(curve, pv_name, self.show_legend_chk.isChecked())
+                curve.show()
+
+        if curves:
+            self.enable_chart_control_buttons()
+
     def handle_title_text_changed(self, new_text):
         self.chart.setPlotTitle(new_text)
 
     def handle_change_axis_settings_clicked(self):
+        from displays.axis_settings_display import AxisSettingsDisplay
+
         self.axis_settings_disp = AxisSettingsDisplay(self)
         self.axis_settings_disp.show()
 
@@ -693,33 +1104,84 @@ class PyDMChartingDisplay(Display):
         else:
             timeout_milliseconds = (self.time_span_limit_hours * 3600 + self.time_span_limit_minutes * 60 +
                                     self.time_span_limit_seconds) * 1000
+            required_buffer_size = timeout_milliseconds / 1000.0 * self.chart_data_async_sampling_rate_spin.value()
+            if required_buffer_size > MAXIMUM_BUFFER_SIZE:
+                display_message_box(QMessageBox.Critical, "Invalid Values",
+                                    "The time span requires a buffer of {0} points, which exceeds the maximum buffer "
+                                    "size of {1} points.".format(int(required_buffer_size), MAXIMUM_BUFFER_SIZE))
+                return
             self.chart.setTimeSpan(timeout_milliseconds / 1000.0)
             self.chart_ring_buffer_size_edt.setText(str(self.chart.getBufferSize()))
 
     def handle_buffer_size_changed(self, new_buffer_size):
         try:
-            if new_buffer_size and int(new_buffer_size) > MINIMUM_BUFFER_SIZE:
+            if new_buffer_size and MINIMUM_BUFFER_SIZE < int(new_buffer_size) <= MAXIMUM_BUFFER_SIZE:
                 self.chart.setBufferSize(new_buffer_size)
         except ValueError:
             display_message_box(QMessageBox.Critical, "Invalid Values", "Only integer values are accepted.")
 
     def handle_redraw_rate_changed(self, new_redraw_rate):
-        self.chart.maxRedrawRate = new_redraw_rate
+        # The governor applies the rate to the chart, or keeps it as the upper limit in adaptive mode
+        self.redraw_governor.set_requested_rate(new_redraw_rate)
+
+    def handle_adaptive_redraw_checkbox_clicked(self, is_checked):
+        self.chart_frame_budget_spin.setEnabled(is_checked)
+        self.redraw_governor.set_enabled(is_checked)
+
+    def handle_frame_budget_changed(self, new_frame_budget_percent):
+        self.redraw_governor.set_frame_budget(new_frame_budget_percent / 100.0)
+
+    def handle_effective_redraw_settings_changed(self, redraw_rate, decimation_factor):
+        text = "Effective: {0} Hz".format(redraw_rate)
+        if decimation_factor > 1:
+            text += ", 1/{0} resolution".format(decimation_factor)
+        self.chart_effective_redraw_rate_lbl.setText(text)
+        self.chart_panel_manager.apply_chart_settings()
+
+    def handle_decimation_checkbox_clicked(self, is_checked):
+        self.chart.setDecimationEnabled(is_checked)
+        self.chart_panel_manager.apply_chart_settings()
+
+    def handle_status_refresh_rate_changed(self, new_refresh_rate):
+        self.curve_status_refresher.set_refresh_rate(new_refresh_rate)
+
+    def handle_show_performance_overlay_checkbox_clicked(self, is_checked):
+        self.performance_monitor.set_enabled(is_checked)
+
+    def handle_export_performance_metrics_btn_clicked(self):
+        saved_file_info = QFileDialog.getSaveFileName(self, caption="Export Performance Metrics",
+                                                      filter="*.{0};;*.{1}".format(JSON_FORMAT, PROMETHEUS_FORMAT))
+        saved_file_name = saved_file_info[0]
+        if not saved_file_name:
+            return
+
+        extension = saved_file_info[1][1:]
+        if not saved_file_name.endswith(extension):
+            saved_file_name += extension
+
+        try:
+            self.performance_monitor.export(saved_file_name)
+        except (IOError, OSError) as error:
+            display_message_box(QMessageBox.Critical, "Export Error",
+                                "Cannot export the performance metrics to '{0}': {1}".format(saved_file_name, error))
 
     def handle_data_sampling_rate_changed(self, new_data_sampling_rate):
         # The chart expects the value in milliseconds
         sampling_rate_seconds = 1 / new_data_sampling_rate
         self.chart.setUpdateInterval(sampling_rate_seconds)
+        self.update_ingestion_engine_sampling()
 
     def handle_background_color_button_clicked(self):
         selected_color = QColorDialog.getColor()
         self.chart.setBackgroundColor(selected_color)
         self.background_color_btn.setStyleSheet("background-color: " + selected_color.name())
+        self.chart_panel_manager.apply_chart_settings()
 
     def handle_axis_color_button_clicked(self):
         selected_color = QColorDialog.getColor()
         self.chart.setAxisColor(selected_color)
         self.axis_color_btn.setStyleSheet("background-color: " + selected_color.name())
+        self.chart_panel_manager.apply_chart_settings()
 
     def handle_grid_opacity_slider_mouse_release(self):
         self.grid_alpha = float(self.grid_opacity_slr.value()) / 10.0
@@ -744,44 +1206,183 @@ class PyDMChartingDisplay(Display):
 
     def handle_show_legend_checkbox_clicked(self, is_checked):
         self.chart.setShowLegend(is_checked)
+        self.chart_panel_manager.apply_chart_settings()
 
     def handle_export_data_btn_clicked(self):
+        from displays.chart_data_export_display import ChartDataExportDisplay
+
         self.chart_data_export_disp = ChartDataExportDisplay(self)
         self.chart_data_export_disp.show()
 
     def handle_import_data_btn_clicked(self):
         open_file_info = QFileDialog.getOpenFileName(self, caption="Save File", filter="*." + IMPORT_FILE_FORMAT)
         open_file_name = open_file_info[0]
-        if open_file_name:
-            importer = SettingsImporter(self)
-            importer.import_settings(open_file_name)
+        if not open_file_name:
+            return
 
-    def handle_sync_mode_radio_toggle(self, radio_btn):
-        if radio_btn.isChecked():
-            if radio_btn.text() == "Synchronous":
-                self.data_sampling_mode = SYNC_DATA_SAMPLING
+        replace_curves = False
+        if self.channel_map:
+            reply = QMessageBox.question(self, "Import Data", "Remove the curves of the PVs missing from the imported "
+                                         "settings?\n\nThe curves of the PVs in both keep their data either way.",
+                                         QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel, QMessageBox.No)
+            if reply == QMessageBox.Cancel:
+                return
+            replace_curves = reply == QMessageBox.Yes
+        self.import_settings_file(open_file_name, replace_curves=replace_curves)
+
+    def import_settings_file(self, filename, replace_curves=False):
+        """
+        Read a settings file, a snapshot or a recording on a worker thread, and then apply it over the current session
+        in a single batch, changing only what differs. A progress dialog allows the user to cancel the import while
+        the files are being read.
+
+        Parameters
+        ----------
+        filename : str
+            The path of the file to import
+        replace_curves : bool
+            True to remove the curves of the PVs missing from the file; False to keep them
+        """
+        if self.settings_import_thread and self.settings_import_thread.isRunning():
+            display_message_box(QMessageBox.Warning, "Import in Progress",
+                                "Please wait for the current import to complete.")
+            return
 
-                self.chart_data_sampling_rate_lbl.hide()
-                self.chart_data_async_sampling_rate_spin.hide()
+        from data_io.settings_importer import SettingsLoader
 
-                self.chart.resetTimeSpan()
-                self.chart_limit_time_span_chk.setChecked(False)
-                self.chart_limit_time_span_chk.clicked.emit(False)
-                self.chart_limit_time_span_chk.hide()
-                self.graph_drawing_settings_grpbx.setFixedHeight(180)
+        self.settings_loader = SettingsLoader(filename)
+        self.settings_import_replace_curves = replace_curves
 
-                self.chart.setUpdatesAsynchronously(False)
-            elif radio_btn.text() == "Asynchronous":
-                self.data_sampling_mode = ASYNC_DATA_SAMPLING
+        self.settings_import_progress_dlg = QProgressDialog("Importing settings...", "Cancel", 0, 100, self)
+        self.settings_import_progress_dlg.setWindowTitle("Import Data")
+        self.settings_import_progress_dlg.setWindowModality(Qt.WindowModal)
+        self.settings_import_progress_dlg.canceled.connect(self.settings_loader.cancel)
+
+        self.settings_import_thread = QThread(self)
+        self.settings_loader.moveToThread(self.settings_import_thread)
+        self.settings_import_thread.started.connect(self.settings_loader.run)
+
+        self.settings_loader.progress_changed.connect(self.settings_import_progress_dlg.setValue)
+        self.settings_loader.import_finished.connect(self.handle_settings_import_finished)
+        self.settings_loader.import_failed.connect(self.handle_settings_import_failed)
 
-                self.chart_data_sampling_rate_lbl.show()
-                self.chart_data_async_sampling_rate_spin.show()
-                self.chart_limit_time_span_chk.show()
-                self.graph_drawing_settings_grpbx.setFixedHeight(270)
+        self.settings_import_progress_dlg.show()
+        self.settings_import_thread.start()
+
+    def handle_settings_import_finished(self, loaded_settings):
+        from data_io.settings_importer import SettingsImporter
+
+        self.settings_import_thread.quit()
+        self.settings_import_progress_dlg.reset()
+        try:
+            SettingsImporter(self).apply_settings(loaded_settings, replace_curves=self.settings_import_replace_curves)
+        except SETTINGS_LOAD_ERRORS as error:
+            logger.error("Cannot apply the imported settings. Exception: {0}".format(error))
+            display_message_box(QMessageBox.Critical, "Import Failed",
+                                "Cannot apply the imported settings: {0}".format(error))
+
+    def handle_settings_import_failed(self, message):
+        self.settings_import_thread.quit()
+        was_cancelled = self.settings_import_progress_dlg.wasCanceled()
+        self.settings_import_progress_dlg.reset()
+        if not was_cancelled:
+            display_message_box(QMessageBox.Critical, "Import Failed", message)
+
+    def handle_load_workspaces_btn_clicked(self):
+        directory = QFileDialog.getExistingDirectory(self, caption="Load Workspaces")
+        if not directory:
+            return
+
+        names = self.workspace_manager.load_directory(directory)
+        if not names:
+            display_message_box(QMessageBox.Warning, "No Workspace Found",
+                                "There is no settings file in '{0}'.".format(directory))
+            return
+
+        self.workspace_cmb.blockSignals(True)
+        for name in names:
+            if self.workspace_cmb.findText(name) < 0:
+                self.workspace_cmb.addItem(name)
+        self.workspace_cmb.blockSignals(False)
+
+    def handle_workspace_changed(self, name):
+        try:
+            self.workspace_manager.switch_to(name)
+        except SETTINGS_LOAD_ERRORS as error:
+            logger.error("Cannot switch to the workspace '{0}'. Exception: {1}".format(name, error))
+            display_message_box(QMessageBox.Critical, "Workspace Error",
+                                "Cannot load the workspace '{0}': {1}".format(name, error))
 
-                self.chart.setUpdatesAsynchronously(True)
+            self.workspace_cmb.blockSignals(True)
+            self.workspace_cmb.setCurrentText(self.workspace_manager.active_name)
+            self.workspace_cmb.blockSignals(False)
+
+    def handle_workspace_memory_changed(self, new_memory_mb):
+        self.workspace_manager.set_max_bytes(new_memory_mb * 1048576)
+
+    def handle_show_in_panel_btn_clicked(self):
+        """
+        Show the curves selected in the list on the chart panel chosen, or on a new panel. The curves keep a single
+        connection and buffer each, which the panel views share with the main chart.
+        """
+        pv_names = self.get_selected_curve_names()
+        if not pv_names:
+            return
+
+        panel_name = self.chart_panel_cmb.currentText()
+        if panel_name == self.new_chart_panel_text:
+            panel_name = self.chart_panel_manager.add_panel()
+            self.chart_panel_cmb.addItem(panel_name)
+            self.chart_panel_cmb.setCurrentText(panel_name)
+
+        for pv_name in pv_names:
+            self.chart_panel_manager.show_curve(pv_name, panel_name)
+
+    def handle_chart_panel_close_requested(self, panel_name):
+        self.chart_panel_manager.remove_panel(panel_name)
+        index = self.chart_panel_cmb.findText(panel_name)
+        if index >= 0:
+            self.chart_panel_cmb.removeItem(index)
+
+    def handle_sync_mode_radio_toggle(self, radio_btn):
+        if radio_btn.isChecked():
+            if radio_btn.text() == "Synchronous":
+                self.apply_data_sampling_mode(SYNC_DATA_SAMPLING)
+            elif radio_btn.text() == "Asynchronous":
+                self.apply_data_sampling_mode(ASYNC_DATA_SAMPLING)
         self.app.establish_widget_connections(self)
 
+    def apply_data_sampling_mode(self, data_sampling_mode):
+        """
+        Switch the chart and the settings widgets to a data sampling mode. The channels are left for the caller to
+        connect.
+
+        Parameters
+        ----------
+        data_sampling_mode : int
+            SYNC_DATA_SAMPLING or ASYNC_DATA_SAMPLING
+        """
+        self.data_sampling_mode = data_sampling_mode
+        if data_sampling_mode == SYNC_DATA_SAMPLING:
+            self.chart_data_sampling_rate_lbl.hide()
+            self.chart_data_async_sampling_rate_spin.hide()
+
+            self.chart.resetTimeSpan()
+            self.chart_limit_time_span_chk.setChecked(False)
+            self.handle_limit_time_span_checkbox_clicked(False)
+            self.chart_limit_time_span_chk.hide()
+            self.graph_drawing_settings_grpbx.setFixedHeight(GRAPH_DRAWING_SETTINGS_SYNC_HEIGHT)
+
+            self.chart.setUpdatesAsynchronously(False)
+        else:
+            self.chart_data_sampling_rate_lbl.show()
+            self.chart_data_async_sampling_rate_spin.show()
+            self.chart_limit_time_span_chk.show()
+            self.graph_drawing_settings_grpbx.setFixedHeight(GRAPH_DRAWING_SETTINGS_ASYNC_HEIGHT)
+
+            self.chart.setUpdatesAsynchronously(True)
+        self.update_ingestion_engine_sampling()
+
     def handle_auto_scale_btn_clicked(self):
         self.chart.resetAutoRangeX()
         self.chart.resetAutoRangeY()
@@ -804,7 +1405,13 @@ class PyDMChartingDisplay(Display):
         self.chart_ring_buffer_size_edt.setText(str(DEFAULT_BUFFER_SIZE))
 
         self.chart_redraw_rate_spin.setValue(DEFAULT_REDRAW_RATE_HZ)
+        self.chart_adaptive_redraw_chk.setChecked(False)
+        self.chart_adaptive_redraw_chk.clicked.emit(False)
+        self.chart_frame_budget_spin.setValue(int(DEFAULT_FRAME_BUDGET * 100))
+        self.chart_decimation_chk.setChecked(True)
+        self.chart.setDecimationEnabled(True)
         self.chart_data_async_sampling_rate_spin.setValue(DEFAULT_DATA_SAMPLING_RATE_HZ)
+        self.chart_status_refresh_rate_spin.setValue(DEFAULT_STATUS_REFRESH_RATE_HZ)
         self.chart_data_sampling_rate_lbl.hide()
         self.chart_data_async_sampling_rate_spin.hide()
 
@@ -839,12 +1446,13 @@ class PyDMChartingDisplay(Display):
         self.chart.setShowXGrid(False)
         self.chart.setShowYGrid(False)
         self.chart.setShowLegend(False)
+        self.chart_panel_manager.apply_chart_settings()
 
     def enable_chart_control_buttons(self, enabled=True):
         self.auto_scale_btn.setEnabled(enabled)
         self.view_all_btn.setEnabled(enabled)
         self.reset_chart_btn.setEnabled(enabled)
-        self.pause_chart_btn.setText(self.pause_chart_text)
+        self.pause_chart_btn.setText(self.resume_chart_text if self.chart.isPaused() else self.pause_chart_text)
         self.pause_chart_btn.setEnabled(enabled)
         self.export_data_btn.setEnabled(enabled)
 
@@ -862,19 +1470,30 @@ class PyDMChartingDisplay(Display):
         return pv_name
 
     def handle_update_datetime_timer_timeout(self):
-        current_label = self.chart.getBottomAxisLabel()
-        new_label = "Current Time: " + PyDMChartingDisplay.get_current_datetime()
+        self.chart.clock_item.refresh()
+
+    def update_curve_data(self, curve):
+        """
+        Update the controls of a curve after a redraw, timing the update if the performance monitor is enabled.
 
-        if X_AXIS_LABEL_SEPARATOR in current_label:
-            current_label = current_label[current_label.find(X_AXIS_LABEL_SEPARATOR) + len(X_AXIS_LABEL_SEPARATOR):]
-            new_label += X_AXIS_LABEL_SEPARATOR + current_label
+        Parameters
+        ----------
+        curve : PlotItem
+           A PlotItem, i.e. a plot, to draw on the chart.
+        """
+        if not self.performance_monitor.enabled:
+            self._update_curve_data(curve)
+            return
 
-        self.chart.setLabel("bottom", text=new_label)
+        start = default_timer()
+        self._update_curve_data(curve)
+        self.performance_monitor.record_update_curve_data(default_timer() - start)
 
-    def update_curve_data(self, curve):
+    def _update_curve_data(self, curve):
         """
         Determine if the PV is active. If not, disable the related PV controls. If the PV is active, update the PV
-        controls' states.
+        controls' states, and hand the latest value over to the curve status refresher, which repaints the labels on
+        its own timer.
 
         Parameters
         ----------
@@ -882,40 +1501,20 @@ class PyDMChartingDisplay(Display):
            A PlotItem, i.e. a plot, to draw on the chart.
         """
         pv_name = curve.name()
-        max_x = self.chart.getViewBox().viewRange()[1][0]
-        max_y = self.chart.getViewBox().viewRange()[1][1]
-        current_y = curve.data_buffer[1, -1]
-
-        widgets = self.findChildren((QCheckBox, QLabel, QPushButton), pv_name)
-        for w in widgets:
-            if np.isnan(current_y):
-                if isinstance(w, QCheckBox):
-                    w.setChecked(False)
-            else:
-                if isinstance(w, QCheckBox) and not w.isEnabled():
-                    w.setChecked(True)
-                if isinstance(w, QLabel):
-                    w.clear()
-                    w.setText("(yMin = {0:.3f}, yMax = {1:.3f}) y = {2:.3f}".format(max_x, max_y, current_y))
-                    w.show()
-            w.setEnabled(not np.isnan(current_y))
-
-            if isinstance(w, QPushButton) and w.text() == "Remove":
-                # Enable the Remove button to make removing inactive PVs possible anytime
-                w.setEnabled(True)
+        if self.channel_map.get(pv_name) is not curve:
+            # The curves of the hidden workspaces stay on the chart, and may plot the same PV as a curve shown
+            return
+
+        current_y = curve.getLatestY()
+        is_active = not np.isnan(current_y)
+        self.curve_list_model.set_active(pv_name, is_active)
+        if is_active:
+            self.curve_status_refresher.update_value(pv_name, current_y)
 
     def show_mouse_coordinates(self, x, y):
         self.cross_hair_coord_lbl.clear()
         self.cross_hair_coord_lbl.setText("x = {0:.3f}, y = {1:.3f}".format(x, y))
 
-    @staticmethod
-    def get_current_datetime():
-        current_date = datetime.datetime.now().strftime("%b %d, %Y")
-        current_time = datetime.datetime.now().strftime("%H:%M:%S")
-        current_datetime = current_time + ' (' + current_date + ')'
-
-        return current_datetime
-
     @property
     def gridAlpha(self):
         return self.grid_alpha
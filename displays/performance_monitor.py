@@ -0,0 +1,281 @@
+# The Performance Monitor of the Chart
+from collections import OrderedDict
+import json
+import time
+from timeit import default_timer
+
+from qtpy.QtCore import Qt, QObject, QTimer
+
+DEFAULT_REPORT_INTERVAL_MS = 1000
+
+# How often the event loop is probed for the delay of its timers
+LATENCY_PROBE_INTERVAL_MS = 50
+
+# The number of curves listed in the overlay, the others being only exported
+MAX_OVERLAY_CURVES = 10
+
+PROMETHEUS_METRIC_PREFIX = "pydmcharting_"
+
+JSON_FORMAT = "json"
+PROMETHEUS_FORMAT = "prom"
+
+# The name, help text and key of the chart metrics, in their export order
+CHART_METRICS = (
+    ("requested_redraw_rate_hz", "The maximum redraw rate set for the chart"),
+    ("effective_redraw_rate_hz", "The maximum redraw rate applied to the chart, lowered in adaptive mode"),
+    ("achieved_redraw_rate_hz", "The number of redraws per second actually performed"),
+    ("redraw_time_ms", "The mean time spent in a redraw, including update_curve_data"),
+    ("redraw_time_max_ms", "The longest time spent in a redraw"),
+    ("paint_time_ms", "The mean time spent painting the chart"),
+    ("paint_time_max_ms", "The longest time spent painting the chart"),
+    ("update_curve_data_time_ms", "The mean time spent in update_curve_data"),
+    ("update_curve_data_time_max_ms", "The longest time spent in update_curve_data"),
+    ("event_loop_latency_ms", "The mean delay of the event loop in running a due timer"),
+    ("event_loop_latency_max_ms", "The longest delay of the event loop in running a due timer"),
+)
+
+CURVE_METRICS = (
+    ("samples_per_second", "The number of samples appended to the curve per second"),
+    ("buffer_points", "The number of points held in the curve buffer"),
+    ("buffer_size", "The number of points the curve buffer retains"),
+    ("buffer_fill_ratio", "The fraction of the curve buffer filled"),
+)
+
+
+class DurationStats:
+    def __init__(self):
+        """
+        The number, total and maximum of durations recorded over a reporting interval.
+        """
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+
+    def reset(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class PerformanceMonitor(QObject):
+    def __init__(self, main_display, report_interval_ms=DEFAULT_REPORT_INTERVAL_MS):
+        """
+        Measure the data rate of every curve, the time spent redrawing the chart and updating the curve controls, and
+        the latency of the event loop, and show the metrics over the chart. While the monitor is disabled, its timers
+        are stopped and the instrumented code paths only check a flag.
+
+        Parameters
+        ----------
+        main_display : PyDMChartingDisplay
+            The main display window owning the chart
+        report_interval_ms : int
+            How often the metrics are computed and the overlay updated, in milliseconds
+        """
+        super(PerformanceMonitor, self).__init__(parent=main_display)
+        self.main_display = main_display
+        self.enabled = False
+
+        self.redraw_stats = DurationStats()
+        self.paint_stats = DurationStats()
+        self.update_curve_data_stats = DurationStats()
+        self.latency_stats = DurationStats()
+
+        self.metrics = OrderedDict()
+        self._sample_counts = dict()
+        self._last_report_time = default_timer()
+        self._last_probe_time = default_timer()
+
+        self.report_timer = QTimer(self)
+        self.report_timer.setInterval(report_interval_ms)
+        self.report_timer.timeout.connect(self.report)
+
+        self.latency_timer = QTimer(self)
+        self.latency_timer.setTimerType(Qt.PreciseTimer)
+        self.latency_timer.setInterval(LATENCY_PROBE_INTERVAL_MS)
+        self.latency_timer.timeout.connect(self.probe_latency)
+
+    def set_enabled(self, enabled):
+        """
+        Start or stop measuring, and show or hide the overlay.
+
+        Parameters
+        ----------
+        enabled : bool
+            True to measure and show the metrics; False to stop all the measurements
+        """
+        self.enabled = enabled
+        chart = self.main_display.chart
+        chart.performance_overlay.setVisible(enabled)
+
+        if enabled:
+            chart.addFrameListener(self)
+            self.collect()
+            self._last_probe_time = default_timer()
+            self.latency_timer.start()
+            self.report_timer.start()
+        else:
+            chart.removeFrameListener(self)
+            self.latency_timer.stop()
+            self.report_timer.stop()
+
+    def record_redraw(self, duration):
+        self.redraw_stats.add(duration)
+
+    def record_paint(self, duration):
+        self.paint_stats.add(duration)
+
+    def record_update_curve_data(self, duration):
+        self.update_curve_data_stats.add(duration)
+
+    def probe_latency(self):
+        """
+        Record how late the probe timer fires, i.e. how long the event loop was busy when the timer was due.
+        """
+        now = default_timer()
+        self.latency_stats.add(max(now - self._last_probe_time - LATENCY_PROBE_INTERVAL_MS / 1000.0, 0.0))
+        self._last_probe_time = now
+
+    def collect(self):
+        """
+        Compute the metrics over the time elapsed since the previous collection, and start a new interval.
+
+        Returns
+        -------
+        The chart metrics, with the metrics of each curve under the "curves" key : OrderedDict
+        """
+        now = default_timer()
+        elapsed = max(now - self._last_report_time, 1e-9)
+        self._last_report_time = now
+
+        chart = self.main_display.chart
+        metrics = OrderedDict()
+        metrics["timestamp"] = time.time()
+        metrics["requested_redraw_rate_hz"] = float(self.main_display.redraw_governor.requested_rate_hz)
+        metrics["effective_redraw_rate_hz"] = float(chart.maxRedrawRate)
+        metrics["achieved_redraw_rate_hz"] = self.redraw_stats.count / elapsed
+        metrics["redraw_time_ms"] = self.redraw_stats.mean * 1000
+        metrics["redraw_time_max_ms"] = self.redraw_stats.max * 1000
+        metrics["paint_time_ms"] = self.paint_stats.mean * 1000
+        metrics["paint_time_max_ms"] = self.paint_stats.max * 1000
+        metrics["update_curve_data_time_ms"] = self.update_curve_data_stats.mean * 1000
+        metrics["update_curve_data_time_max_ms"] = self.update_curve_data_stats.max * 1000
+        metrics["event_loop_latency_ms"] = self.latency_stats.mean * 1000
+        metrics["event_loop_latency_max_ms"] = self.latency_stats.max * 1000
+
+        curves = OrderedDict()
+        sample_counts = dict()
+        for curve_name, curve in self.main_display.channel_map.items():
+            # Only the live curves receive samples
+            sample_count = getattr(curve, "samples_appended", None)
+            samples_per_second = 0.0
+            if sample_count is not None:
+                sample_counts[curve_name] = sample_count
+                # A count lower than the previous one means the buffer was reset in between
+                new_count = sample_count - self._sample_counts.get(curve_name, sample_count)
+                samples_per_second = (new_count if new_count >= 0 else sample_count) / elapsed
+
+            buffer_size = curve.getBufferSize()
+            curve_metrics = OrderedDict()
+            curve_metrics["samples_per_second"] = samples_per_second
+            curve_metrics["buffer_points"] = curve.points_accumulated
+            curve_metrics["buffer_size"] = buffer_size
+            curve_metrics["buffer_fill_ratio"] = float(curve.points_accumulated) / buffer_size if buffer_size else 0.0
+            curves[curve_name] = curve_metrics
+        metrics["curves"] = curves
+
+        self._sample_counts = sample_counts
+        self.redraw_stats.reset()
+        self.paint_stats.reset()
+        self.update_curve_data_stats.reset()
+        self.latency_stats.reset()
+
+        self.metrics = metrics
+        return metrics
+
+    def report(self):
+        """
+        Collect the metrics of the last interval, and show them over the chart.
+        """
+        metrics = self.collect()
+
+        lines = [
+            "Redraw: {0:.1f} / {1:.0f} Hz, {2:.2f} ms (max {3:.2f} ms)".format(
+                metrics["achieved_redraw_rate_hz"], metrics["requested_redraw_rate_hz"], metrics["redraw_time_ms"],
+                metrics["redraw_time_max_ms"]),
+            "Paint: {0:.2f} ms (max {1:.2f} ms)".format(metrics["paint_time_ms"], metrics["paint_time_max_ms"]),
+            "update_curve_data: {0:.3f} ms (max {1:.3f} ms)".format(
+                metrics["update_curve_data_time_ms"], metrics["update_curve_data_time_max_ms"]),
+            "Event loop latency: {0:.2f} ms (max {1:.2f} ms)".format(
+                metrics["event_loop_latency_ms"], metrics["event_loop_latency_max_ms"]),
+        ]
+
+        curves = metrics["curves"]
+        for curve_name, curve_metrics in list(curves.items())[:MAX_OVERLAY_CURVES]:
+            lines.append("{0}: {1:.1f} samples/s, buffer {2:.0%}".format(
+                curve_name, curve_metrics["samples_per_second"], curve_metrics["buffer_fill_ratio"]))
+        if len(curves) > MAX_OVERLAY_CURVES:
+            lines.append("... and {0} more curves".format(len(curves) - MAX_OVERLAY_CURVES))
+
+        self.main_display.chart.performance_overlay.setMetricsText("\n".join(lines))
+
+    def get_export_metrics(self):
+        # While the monitor is disabled, the buffer metrics and the data rates are still meaningful
+        return self.metrics if self.enabled and self.metrics else self.collect()
+
+    def to_json(self):
+        return json.dumps(self.get_export_metrics(), indent=4)
+
+    def to_prometheus(self):
+        """
+        Format the metrics in the Prometheus text exposition format, the curve metrics being labeled with the curve
+        names.
+
+        Returns
+        -------
+        The metrics, one sample per line : str
+        """
+        metrics = self.get_export_metrics()
+        lines = list()
+
+        for key, help_text in CHART_METRICS:
+            name = PROMETHEUS_METRIC_PREFIX + key
+            lines.append("# HELP {0} {1}".format(name, help_text))
+            lines.append("# TYPE {0} gauge".format(name))
+            lines.append("{0} {1}".format(name, repr(float(metrics[key]))))
+
+        for key, help_text in CURVE_METRICS:
+            name = PROMETHEUS_METRIC_PREFIX + "curve_" + key
+            lines.append("# HELP {0} {1}".format(name, help_text))
+            lines.append("# TYPE {0} gauge".format(name))
+            for curve_name, curve_metrics in metrics["curves"].items():
+                lines.append("{0}{{curve=\"{1}\"}} {2}".format(name, _escape_label_value(curve_name),
+                                                              repr(float(curve_metrics[key]))))
+        return "\n".join(lines) + "\n"
+
+    def export(self, filename):
+        """
+        Save the metrics to a file, in the Prometheus text format if the file extension is PROMETHEUS_FORMAT, or as
+        JSON otherwise.
+
+        Parameters
+        ----------
+        filename : str
+            The path of the file
+        """
+        text = self.to_prometheus() if filename.endswith("." + PROMETHEUS_FORMAT) else self.to_json()
+        with open(filename, 'w') as metrics_file:
+            metrics_file.write(text)
+
+
+def _escape_label_value(value):
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
@@ -0,0 +1,204 @@
+# The Manager of the Workspaces, i.e. Named Sets of Curves Switched on the Same Chart
+from collections import OrderedDict
+import glob
+import os
+from timeit import default_timer
+
+from utilities.lru_cache import MemoryBoundedLruCache
+
+from pydmcharting_logging import logging
+logger = logging.getLogger(__name__)
+
+# The workspace holding the curves added before any workspace is selected
+SESSION_WORKSPACE_NAME = "Session"
+
+MIN_WORKSPACE_MEMORY_MB = 16
+MAX_WORKSPACE_MEMORY_MB = 65536
+DEFAULT_WORKSPACE_MEMORY_MB = 1024
+
+WORKSPACE_FILE_PATTERN = "*.json"
+
+
+def get_curves_memory(curves):
+    """
+    Get the memory a set of curves may take once their buffers are full, in bytes. The detached curves keep
+    buffering, so the memory they hold when they are detached would under-count them.
+
+    Parameters
+    ----------
+    curves : dict
+        The curves by PV name
+
+    Returns
+    -------
+    The memory of the buffers of the curves, in bytes : int
+    """
+    return sum(curve.getMaxBufferMemory() for curve in curves.values())
+
+
+class Workspace:
+    def __init__(self, name, filename=None):
+        """
+        A named set of curves with its chart settings. While another workspace is shown, the curves of this one are
+        kept detached from the chart, still connected and buffering their data, until they are evicted to save memory.
+
+        Parameters
+        ----------
+        name : str
+            The name of the workspace
+        filename : str
+            The settings file the workspace is loaded from the first time it is shown, or None
+        """
+        self.name = name
+        self.filename = filename
+
+        # The settings captured when the workspace was last hidden, as returned by load_settings, or None
+        self.settings = None
+
+        # The detached curves by PV name, or None if the workspace has no live curves
+        self.curves = None
+        self.hidden_pv_names = set()
+
+        # The memory the detached curves may take as they keep buffering, in bytes
+        self.nbytes = 0
+
+
+class WorkspaceManager:
+    def __init__(self, main_display, max_bytes=DEFAULT_WORKSPACE_MEMORY_MB * 1048576):
+        """
+        Switch the chart between workspaces. The workspace shown owns the curves of the main display; the others
+        keep their curves detached in a least-recently-used cache bounded by the memory of their buffers. Switching
+        back to a cached workspace only reattaches its curves, with their history; an evicted workspace is rebuilt
+        from its settings, and starts over with empty buffers.
+
+        Parameters
+        ----------
+        main_display : PyDMChartingDisplay
+            The main display window owning the chart
+        max_bytes : int
+            The maximum memory held by the curves of the hidden workspaces, in bytes
+        """
+        self.main_display = main_display
+        self.workspaces = OrderedDict()
+        self.workspaces[SESSION_WORKSPACE_NAME] = Workspace(SESSION_WORKSPACE_NAME)
+        self.active_name = SESSION_WORKSPACE_NAME
+        self.cache = MemoryBoundedLruCache(max_bytes, lambda workspace: workspace.nbytes,
+                                           on_evict=self._release_curves)
+
+    def load_directory(self, directory):
+        """
+        Add a workspace for each settings file in a directory, named after the file. A workspace with the same name
+        is pointed to the new file, but keeps its curves until it is evicted.
+
+        Parameters
+        ----------
+        directory : str
+            The directory holding the settings files
+
+        Returns
+        -------
+        The names of the workspaces found : list
+        """
+        names = list()
+        for filename in sorted(glob.glob(os.path.join(directory, WORKSPACE_FILE_PATTERN))):
+            name = os.path.splitext(os.path.basename(filename))[0]
+            workspace = self.workspaces.get(name)
+            if workspace is None:
+                self.workspaces[name] = Workspace(name, filename)
+            else:
+                workspace.filename = filename
+            names.append(name)
+        return names
+
+    def switch_to(self, name):
+        """
+        Show a workspace instead of the current one. The curves of the current workspace are detached, and the curves
+        and chart settings of the new one applied.
+
+        Parameters
+        ----------
+        name : str
+            The name of the workspace to show
+        """
+        if name == self.active_name or name not in self.workspaces:
+            return
+
+        from data_io.settings_importer import load_settings
+
+        start = default_timer()
+        workspace = self.workspaces[name]
+        if workspace.curves is None and workspace.settings is None and workspace.filename is not None:
+            # Read the file first, so that the current workspace stays shown if the file cannot be read
+            workspace.settings = load_settings(workspace.filename)
+
+        self._detach(self.workspaces[self.active_name])
+        self.active_name = name
+        self._attach(workspace)
+        logger.info("Switched to the workspace '{0}' in {1:.1f} ms.".format(name, (default_timer() - start) * 1000))
+
+    def set_max_bytes(self, max_bytes):
+        self.cache.set_max_bytes(max_bytes)
+
+    def _detach(self, workspace):
+        from data_io.settings_exporter import SettingsExporter
+        from data_io.settings_importer import get_loaded_settings
+        from data_io.settings_schema import upgrade_settings
+
+        main_display = self.main_display
+        workspace.settings = get_loaded_settings(upgrade_settings(SettingsExporter(main_display, True,
+                                                                                   True).build_settings()))
+        workspace.hidden_pv_names = main_display.get_hidden_curve_names()
+        curves = main_display.detach_curves()
+        if not curves:
+            workspace.curves = None
+            return
+
+        workspace.curves = curves
+        workspace.nbytes = get_curves_memory(curves)
+        self._update_cached_sizes()
+        self.cache.put(workspace.name, workspace)
+        if workspace.name not in self.cache:
+            # The curves alone take more than the memory allowed
+            self._release_curves(workspace.name, workspace)
+
+    def _update_cached_sizes(self):
+        """
+        Size the hidden workspaces again, since the buffer size of their curves may have changed since they were
+        detached, keeping their order of use.
+        """
+        for name in self.cache.keys():
+            workspace = self.cache.pop(name)
+            if workspace is None:
+                continue
+            workspace.nbytes = get_curves_memory(workspace.curves)
+            self.cache.put(name, workspace)
+            if name not in self.cache:
+                self._release_curves(name, workspace)
+
+    def _attach(self, workspace):
+        from data_io.settings_importer import SettingsImporter
+
+        self.cache.pop(workspace.name)
+        importer = SettingsImporter(self.main_display)
+        if workspace.curves is not None:
+            self.main_display.attach_curves(workspace.curves, workspace.hidden_pv_names)
+            workspace.curves = None
+            # The curves kept their appearance; only the chart settings are applied
+            importer.apply_settings(dict(workspace.settings, curve_specs=list(), frozen_curves=list()))
+        elif workspace.settings is not None:
+            importer.apply_settings(workspace.settings)
+
+    def _release_curves(self, name, workspace):
+        """
+        Remove the detached curves of an evicted workspace for good. Its settings are kept, to rebuild the curves
+        when the workspace is shown again.
+        """
+        if workspace.curves is None:
+            return
+
+        for pv_name, curve in workspace.curves.items():
+            self.main_display.release_curve(pv_name, curve)
+        logger.info("Released the curves of the workspace '{0}', holding {1:.1f} MB.".format(
+            name, workspace.nbytes / 1048576.0))
+        workspace.curves = None
+        workspace.nbytes = 0
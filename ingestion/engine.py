@@ -0,0 +1,215 @@
+import multiprocessing
+
+from qtpy.QtCore import QObject, QTimer, QCoreApplication
+
+from ingestion.sources import EPICS_SOURCE
+from ingestion.worker import SharedRings, run_worker, SUBSCRIBE_COMMAND, UNSUBSCRIBE_COMMAND, CONFIGURE_COMMAND
+
+from pydmcharting_logging import logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_SLOTS_PER_WORKER = 128
+
+# The number of samples each PV slot holds until the GUI collects them. At 50 ms per poll, this covers PVs updating
+# at up to 160 kHz
+DEFAULT_TRANSFER_CAPACITY = 8192
+
+DEFAULT_POLL_INTERVAL_MS = 50
+
+# How long the engine waits for a worker to exit before terminating it
+WORKER_JOIN_TIMEOUT_S = 2.0
+
+
+class IngestionWorker:
+    def __init__(self, index, num_slots, capacity, source_name):
+        """
+        The engine side of a worker process: its shared memory block, its command queue, and the PVs assigned to its
+        slots.
+        """
+        from multiprocessing import shared_memory
+
+        self.shared_memory_block = shared_memory.SharedMemory(create=True,
+                                                              size=SharedRings.get_size(num_slots, capacity))
+        self.rings = SharedRings(self.shared_memory_block.buf, num_slots, capacity)
+        self.rings.counts[:] = 0
+        self.rings.generations[:] = 0
+
+        self.command_queue = multiprocessing.Queue()
+        self.stop_event = multiprocessing.Event()
+        self.process = multiprocessing.Process(target=run_worker, name="ingestion-worker-{0}".format(index),
+                                               args=(self.shared_memory_block.name, num_slots, capacity, source_name,
+                                                     self.command_queue, self.stop_event))
+        self.process.daemon = True
+
+        self.free_slots = list(reversed(range(num_slots)))
+        # The counter value of each slot at the last read, or None until the worker has handled the subscription
+        self.read_counts = [None] * num_slots
+        # The generation of the latest subscription of each slot
+        self.generations = [0] * num_slots
+
+    @property
+    def pv_count(self):
+        return self.rings.num_slots - len(self.free_slots)
+
+    def close(self):
+        self.stop_event.set()
+        self.process.join(WORKER_JOIN_TIMEOUT_S)
+        if self.process.is_alive():
+            self.process.terminate()
+
+        del self.rings
+        self.shared_memory_block.close()
+        self.shared_memory_block.unlink()
+
+
+class IngestionEngine(QObject):
+    def __init__(self, num_workers, source_name=EPICS_SOURCE, slots_per_worker=DEFAULT_SLOTS_PER_WORKER,
+                 transfer_capacity=DEFAULT_TRANSFER_CAPACITY, poll_interval_ms=DEFAULT_POLL_INTERVAL_MS):
+        """
+        An optional engine receiving the PV values in worker processes instead of the GUI thread. The PVs are sharded
+        across the workers, each of which subscribes to its PVs, samples them, and writes the samples to a shared
+        memory block. The GUI collects the new samples of each PV in a single block copy on a timer, so that the
+        receiving and sampling work scales with the number of cores.
+
+        Parameters
+        ----------
+        num_workers : int
+            The number of worker processes
+        source_name : str
+            The source the workers receive the values from, i.e. EPICS_SOURCE or SYNTHETIC_SOURCE
+        slots_per_worker : int
+            The maximum number of PVs per worker
+        transfer_capacity : int
+            The number of samples each PV slot holds until the GUI collects them
+        poll_interval_ms : int
+            How often the GUI collects the new samples, in milliseconds
+        """
+        super(IngestionEngine, self).__init__()
+        self.workers = [IngestionWorker(i, slots_per_worker, transfer_capacity, source_name)
+                        for i in range(num_workers)]
+
+        # The worker and slot assigned to each PV address, and the curves fed with its samples, e.g. the curves of
+        # several workspaces plotting the same PV
+        self.assignments = dict()
+        self.curves = dict()
+
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(poll_interval_ms)
+        self.poll_timer.timeout.connect(self.poll)
+
+    def start(self):
+        for worker in self.workers:
+            worker.process.start()
+        self.poll_timer.start()
+
+        app = QCoreApplication.instance()
+        if app:
+            app.aboutToQuit.connect(self.stop)
+        logger.info("Started {0} ingestion workers.".format(len(self.workers)))
+
+    def stop(self):
+        self.poll_timer.stop()
+        for worker in self.workers:
+            worker.close()
+        self.workers = list()
+
+    def add_curve(self, address, curve):
+        """
+        Assign a PV to the worker with the fewest PVs, and feed its samples to a curve. A PV already assigned feeds
+        the new curve as well, through the same subscription.
+
+        Parameters
+        ----------
+        address : str
+            The address of the PV
+        curve : FedCurveItem
+            The curve to append the samples to
+
+        Returns
+        -------
+        True if the PV was assigned; False if all the worker slots are taken : bool
+        """
+        if address in self.assignments:
+            if curve not in self.curves[address]:
+                self.curves[address].append(curve)
+            return True
+
+        available_workers = [worker for worker in self.workers if worker.free_slots]
+        if not available_workers:
+            logger.error("Cannot ingest '{0}': all the ingestion worker slots are taken.".format(address))
+            return False
+
+        worker = min(available_workers, key=lambda w: w.pv_count)
+        slot = worker.free_slots.pop()
+        worker.generations[slot] += 1
+        worker.read_counts[slot] = None
+        worker.command_queue.put((SUBSCRIBE_COMMAND, slot, address, worker.generations[slot]))
+
+        self.assignments[address] = (worker, slot)
+        self.curves[address] = [curve]
+        return True
+
+    def remove_curve(self, address, curve):
+        """
+        Stop feeding a curve with the samples of a PV. The PV is unsubscribed once no curve is left to feed.
+
+        Parameters
+        ----------
+        address : str
+            The address of the PV
+        curve : FedCurveItem
+            The curve fed with the samples
+        """
+        curves = self.curves.get(address)
+        if curves is None:
+            return
+        if curve in curves:
+            curves.remove(curve)
+        if curves:
+            return
+
+        del self.curves[address]
+        assignment = self.assignments.pop(address, None)
+        if assignment:
+            worker, slot = assignment
+            worker.command_queue.put((UNSUBSCRIBE_COMMAND, slot))
+            worker.free_slots.append(slot)
+
+    def configure(self, is_async, sampling_rate_hz):
+        """
+        Apply the data sampling mode of the chart to the workers.
+
+        Parameters
+        ----------
+        is_async : bool
+            True to sample the latest value of every PV at the sampling rate; False to keep every value received
+        sampling_rate_hz : float
+            The sampling rate of the asynchronous mode
+        """
+        for worker in self.workers:
+            worker.command_queue.put((CONFIGURE_COMMAND, is_async, sampling_rate_hz))
+
+    def poll(self):
+        """
+        Collect the samples written by the workers since the last poll, and append them to the curves, one block per
+        PV.
+        """
+        for address, (worker, slot) in self.assignments.items():
+            read_count = worker.read_counts[slot]
+            if read_count is None:
+                if worker.rings.generations[slot] != worker.generations[slot]:
+                    # The worker has not handled the subscription yet, and the slot may still receive the samples
+                    # of the PV it was assigned to before
+                    continue
+                read_count = int(worker.rings.start_counts[slot])
+
+            count, lost_count, samples = worker.rings.read(slot, read_count)
+            worker.read_counts[slot] = count
+            if samples is None:
+                continue
+
+            if lost_count:
+                logger.warning("Dropped {0} samples of '{1}': the GUI fell behind the ingestion worker."
+                               .format(lost_count, address))
+            for curve in self.curves.get(address, ()):
+                curve.appendSamples(samples[0], samples[1])
@@ -0,0 +1,148 @@
+import threading
+import time
+import zlib
+
+import numpy as np
+
+EPICS_SOURCE = "epics"
+SYNTHETIC_SOURCE = "synthetic"
+
+# The rate at which the synthetic source generates the values of each PV
+SYNTHETIC_RATE_HZ = 10.0
+
+
+def strip_protocol(address):
+    return address.split("://", 1)[-1]
+
+
+class SyntheticSource:
+    def __init__(self, rate_hz=SYNTHETIC_RATE_HZ):
+        """
+        A source generating a deterministic signal for each PV at a fixed rate, for running the ingestion engine
+        without any IOC.
+
+        Parameters
+        ----------
+        rate_hz : float
+            The number of values generated per second for each PV
+        """
+        self.period = 1.0 / rate_hz
+        self._slots = list()
+        self._amplitudes = list()
+        self._signal_periods = list()
+        self._last_time = time.time()
+
+    def subscribe(self, slot, address):
+        seed = zlib.crc32(strip_protocol(address).encode("utf-8")) & 0xffffffff
+        self._slots.append(slot)
+        self._amplitudes.append(1.0 + seed % 10)
+        self._signal_periods.append(10.0 * (1 + (seed >> 8) % 30))
+
+    def unsubscribe(self, slot):
+        if slot in self._slots:
+            index = self._slots.index(slot)
+            for values in (self._slots, self._amplitudes, self._signal_periods):
+                del values[index]
+
+    def poll(self, timeout_s):
+        """
+        Generate the values due since the last poll.
+
+        Parameters
+        ----------
+        timeout_s : float
+            How long to wait for new values
+
+        Returns
+        -------
+        A list of (slot, timestamps, values) tuples : list
+        """
+        time.sleep(timeout_s)
+
+        now = time.time()
+        tick_count = int((now - self._last_time) / self.period)
+        if not tick_count or not self._slots:
+            return list()
+
+        timestamps = self._last_time + self.period * np.arange(1, tick_count + 1)
+        self._last_time = timestamps[-1]
+
+        # All the PVs of the worker are generated in a single (num_pvs, num_ticks) block
+        amplitudes = np.array(self._amplitudes)[:, np.newaxis]
+        signal_periods = np.array(self._signal_periods)[:, np.newaxis]
+        values = amplitudes * np.sin(2 * np.pi * timestamps / signal_periods)
+        return [(slot, timestamps, values[i]) for i, slot in enumerate(self._slots)]
+
+
+class EpicsSource:
+    def __init__(self):
+        """
+        A source monitoring EPICS PVs through pyepics, which is only imported when the source is created, i.e. in the
+        worker processes.
+        """
+        import epics
+        self._epics = epics
+
+        self._pvs = dict()
+        self._pending = dict()
+        self._lock = threading.Lock()
+
+    def subscribe(self, slot, address):
+        self._pvs[slot] = self._epics.PV(strip_protocol(address), auto_monitor=True,
+                                         callback=lambda value=None, timestamp=None, **kws:
+                                         self._handle_value(slot, value, timestamp))
+
+    def unsubscribe(self, slot):
+        pv = self._pvs.pop(slot, None)
+        if pv is not None:
+            pv.clear_callbacks()
+            pv.disconnect()
+        with self._lock:
+            self._pending.pop(slot, None)
+
+    def _handle_value(self, slot, value, timestamp):
+        # Runs on the Channel Access thread
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return
+
+        with self._lock:
+            self._pending.setdefault(slot, list()).append((timestamp or time.time(), value))
+
+    def poll(self, timeout_s):
+        """
+        Collect the values received since the last poll.
+
+        Parameters
+        ----------
+        timeout_s : float
+            How long to wait for new values
+
+        Returns
+        -------
+        A list of (slot, timestamps, values) tuples : list
+        """
+        self._epics.ca.poll(evt=timeout_s, iot=timeout_s)
+
+        with self._lock:
+            pending, self._pending = self._pending, dict()
+
+        blocks = list()
+        for slot, samples in pending.items():
+            samples = np.array(samples)
+            blocks.append((slot, samples[:, 0], samples[:, 1]))
+        return blocks
+
+
+SOURCES = {
+    EPICS_SOURCE: EpicsSource,
+    SYNTHETIC_SOURCE: SyntheticSource,
+}
+
+
+def create_source(source_name):
+    try:
+        return SOURCES[source_name]()
+    except KeyError:
+        raise ValueError("Unknown ingestion source: '{0}'".format(source_name))
@@ -0,0 +1,186 @@
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+import time
+
+import numpy as np
+
+from ingestion.sources import create_source
+from utilities.sampling import get_due_sample_times
+
+# The commands sent from the engine to the workers
+SUBSCRIBE_COMMAND = "subscribe"
+UNSUBSCRIBE_COMMAND = "unsubscribe"
+CONFIGURE_COMMAND = "configure"
+
+# How long a worker waits for new values in each iteration of its loop
+POLL_TIMEOUT_S = 0.01
+
+COUNT_DTYPE = np.int64
+SAMPLE_DTYPE = np.float64
+
+
+class SharedRings:
+    def __init__(self, buffer, num_slots, capacity):
+        """
+        A view over a shared memory block holding one transfer ring buffer per PV slot. The worker owning the block is
+        the only writer. Each slot has a counter of the samples ever written to it, incremented only after the
+        samples are written, so that the reader knows which samples are complete.
+
+        A slot is reused for another PV once the previous one is unsubscribed. Each subscription has a generation
+        number, which the worker publishes once it has handled the subscription, after the value of the counter at
+        which the samples of the new PV start. The reader waits for the generation of its subscription, so that it
+        never reads the samples the previous PV wrote before the worker handled the unsubscription.
+
+        Parameters
+        ----------
+        buffer : memoryview
+            The shared memory block
+        num_slots : int
+            The number of PV slots
+        capacity : int
+            The number of samples each slot retains until the reader collects them
+        """
+        self.num_slots = num_slots
+        self.capacity = capacity
+        self.counts = np.ndarray((num_slots,), dtype=COUNT_DTYPE, buffer=buffer)
+        self.generations = np.ndarray((num_slots,), dtype=COUNT_DTYPE, buffer=buffer, offset=self.counts.nbytes)
+        self.start_counts = np.ndarray((num_slots,), dtype=COUNT_DTYPE, buffer=buffer,
+                                       offset=self.counts.nbytes + self.generations.nbytes)
+        self.samples = np.ndarray((num_slots, 2, capacity), dtype=SAMPLE_DTYPE, buffer=buffer,
+                                  offset=self.counts.nbytes + self.generations.nbytes + self.start_counts.nbytes)
+
+    @staticmethod
+    def get_size(num_slots, capacity):
+        return 3 * num_slots * np.dtype(COUNT_DTYPE).itemsize + \
+            num_slots * 2 * capacity * np.dtype(SAMPLE_DTYPE).itemsize
+
+    def start_generation(self, slot, generation):
+        """
+        Mark the samples written to a slot from now on as those of a new subscription.
+        """
+        self.start_counts[slot] = self.counts[slot]
+        self.generations[slot] = generation
+
+    def write(self, slot, timestamps, values):
+        count = len(timestamps)
+        if count > self.capacity:
+            timestamps = timestamps[-self.capacity:]
+            values = values[-self.capacity:]
+            self.counts[slot] += count - self.capacity
+            count = self.capacity
+
+        positions = (self.counts[slot] + np.arange(count)) % self.capacity
+        self.samples[slot, 0, positions] = timestamps
+        self.samples[slot, 1, positions] = values
+        self.counts[slot] += count
+
+    def write_column(self, slots, timestamp, values):
+        """
+        Write one sample for each of several slots at once, e.g. the latest values taken at a sampling tick.
+        """
+        positions = self.counts[slots] % self.capacity
+        self.samples[slots, 0, positions] = timestamp
+        self.samples[slots, 1, positions] = values
+        self.counts[slots] += 1
+
+    def read(self, slot, last_count):
+        """
+        Copy the samples written to a slot since a previous read.
+
+        Parameters
+        ----------
+        slot : int
+            The PV slot to read
+        last_count : int
+            The value of the slot's counter at the previous read
+
+        Returns
+        -------
+        The new counter value, the number of samples lost because the reader fell behind, and the (2, n) array of
+        new samples : tuple
+        """
+        count = int(self.counts[slot])
+        new_count = count - last_count
+        if new_count <= 0:
+            return count, 0, None
+
+        lost_count = max(new_count - self.capacity, 0)
+        positions = np.arange(count - new_count + lost_count, count) % self.capacity
+        return count, lost_count, self.samples[slot][:, positions]
+
+
+def run_worker(shared_memory_name, num_slots, capacity, source_name, command_queue, stop_event):
+    """
+    The main loop of a worker process. The worker subscribes to the PVs assigned to it, samples them, and writes the
+    samples to its shared memory block.
+
+    Parameters
+    ----------
+    shared_memory_name : str
+        The name of the shared memory block created by the engine for this worker
+    num_slots : int
+        The number of PV slots of the block
+    capacity : int
+        The number of samples each slot retains
+    source_name : str
+        The name of the source to receive the values from
+    command_queue : multiprocessing.Queue
+        The queue the engine sends the subscription and configuration commands to
+    stop_event : multiprocessing.Event
+        Set by the engine to stop the worker
+    """
+    from multiprocessing import shared_memory
+
+    shared_memory_block = shared_memory.SharedMemory(name=shared_memory_name)
+    rings = SharedRings(shared_memory_block.buf, num_slots, capacity)
+    source = create_source(source_name)
+
+    subscribed = np.zeros(num_slots, dtype=bool)
+    latest_values = np.full(num_slots, np.nan)
+    is_async = True
+    sampling_period = 1.0
+    next_sampling_time = time.time()
+
+    try:
+        while not stop_event.is_set():
+            while True:
+                try:
+                    command = command_queue.get_nowait()
+                except queue.Empty:
+                    break
+
+                if command[0] == SUBSCRIBE_COMMAND:
+                    _, slot, address, generation = command
+                    source.subscribe(slot, address)
+                    subscribed[slot] = True
+                    latest_values[slot] = np.nan
+                    rings.start_generation(slot, generation)
+                elif command[0] == UNSUBSCRIBE_COMMAND:
+                    source.unsubscribe(command[1])
+                    subscribed[command[1]] = False
+                elif command[0] == CONFIGURE_COMMAND:
+                    _, is_async, sampling_rate_hz = command
+                    sampling_period = 1.0 / sampling_rate_hz
+                    next_sampling_time = time.time()
+
+            for slot, timestamps, values in source.poll(POLL_TIMEOUT_S):
+                if not subscribed[slot]:
+                    continue
+                latest_values[slot] = values[-1]
+                if not is_async:
+                    rings.write(slot, timestamps, values)
+
+            if is_async:
+                # Sample the latest values of all the PVs of this worker in one vectorized write per due tick, so
+                # that sampling periods shorter than the loop iterations are kept up with
+                sample_times, next_sampling_time = get_due_sample_times(next_sampling_time, time.time(),
+                                                                        sampling_period)
+                slots = np.flatnonzero(subscribed)
+                if len(slots):
+                    for sample_time in sample_times:
+                        rings.write_column(slots, sample_time, latest_values[slots])
+    finally:
+        del rings
+        shared_memory_block.close()
@@ -1,3 +1,6 @@
+from timeit import default_timer
+STARTUP_TIME = default_timer()
+
 from setup_paths import setup_paths
 setup_paths()
 
@@ -8,23 +11,59 @@ from arg_parser import ArgParser
 from version import VERSION
 import traceback
 
-from pydm import PyDMApplication
-from pydmcharting_logging import logging
-from displays.main_display import PyDMChartingDisplay
+from pydmcharting_logging import logging, setup_file_logging
+from utilities.startup_profiler import StartupProfiler, FirstPaintWatcher
+from ingestion.sources import SOURCES, EPICS_SOURCE
+
+DEFAULT_RECORDING_DIRECTORY = "recordings"
+DEFAULT_SEGMENT_SIZE_MB = 64
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
 def main():
-    _parse_arguments()
+    profiler = StartupProfiler(STARTUP_TIME)
+
+    args = _parse_arguments()
+    profiler.mark("Load the startup modules and parse the arguments")
+
+    setup_file_logging()
+    profiler.mark("Set up the file logging")
+
+    if args.headless:
+        from data_io.headless_recorder import run_headless
+
+        sys.exit(run_headless(args.headless, args.output_dir,
+                              segment_size_bytes=int(args.segment_size_mb * 1024 * 1024),
+                              max_segments=args.max_segments, duration_s=args.duration))
+
+    # The GUI modules are only needed, and only imported, outside the headless mode
+    from pydm import PyDMApplication
+    profiler.mark("Import PyDM")
+    from displays.main_display import PyDMChartingDisplay
+    profiler.mark("Import the main display")
 
     app = PyDMApplication(command_line_args=sys.argv, hide_nav_bar=True, hide_menu_bar=True, hide_status_bar=True,
                           use_main_window=False)
+    profiler.mark("Create the application")
 
     pydm_chartsdipslay = PyDMChartingDisplay()
+    if args.ingestion_workers:
+        from ingestion.engine import IngestionEngine
+        pydm_chartsdipslay.enable_ingestion_engine(IngestionEngine(args.ingestion_workers, args.ingestion_source))
+    profiler.mark("Create the main display")
+
     pydm_chartsdipslay.setMinimumSize(1600, 800)
     pydm_chartsdipslay.show()
+    profiler.mark("Show the main display")
+
+    if args.profile_startup:
+        def report_startup_profile():
+            profiler.mark("Paint the main display")
+            profiler.report()
+
+        FirstPaintWatcher(pydm_chartsdipslay, report_startup_profile)
 
     sys.exit(app.exec_())
 
@@ -41,6 +80,29 @@ def _parse_arguments():
 
     group = parser.add_mutually_exclusive_group()
     group.add_argument("--version", action="version", version=VERSION)
+    group.add_argument("--headless", metavar="SETTINGS_JSON",
+                       help="Record the PVs of a settings file to rolling binary files, without any GUI. The "
+                            "recording can be reviewed in the GUI by importing its manifest.json file.")
+
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Print how long each phase of the startup takes, up to the first paint of the window")
+    parser.add_argument("--ingestion-workers", type=int, default=0,
+                        help="Receive the PV values in this many worker processes instead of the GUI thread, for "
+                             "large multi-PV sessions, or 0 to use PyDM channels (default: %(default)s)")
+    parser.add_argument("--ingestion-source", choices=sorted(SOURCES.keys()), default=EPICS_SOURCE,
+                        help="Where the ingestion workers receive the PV values from (default: %(default)s)")
+
+    headless_group = parser.add_argument_group("headless recording options")
+    headless_group.add_argument("--output-dir", default=DEFAULT_RECORDING_DIRECTORY,
+                                help="The directory to write the recording to (default: %(default)s)")
+    headless_group.add_argument("--segment-size-mb", type=float, default=DEFAULT_SEGMENT_SIZE_MB,
+                                help="The size of each segment file, in MB (default: %(default)s)")
+    headless_group.add_argument("--max-segments", type=int, default=0,
+                                help="The number of segment files to keep, the oldest ones being deleted first, or "
+                                     "0 to keep them all (default: %(default)s)")
+    headless_group.add_argument("--duration", type=float, default=0,
+                                help="How long to record, in seconds, or 0 to record until interrupted "
+                                     "(default: %(default)s)")
 
     args = parser.parse_args()
     return args
@@ -1,4 +1,4 @@
-
+import errno
 import os
 import logging
 
@@ -10,20 +10,38 @@ logger.setLevel(logging.DEBUG)
 log_dir_path = os.path.dirname(os.path.realpath(__file__))
 log_dir_path += "/logs"
 
-try:
-    os.makedirs(log_dir_path)
-except os.error as err:
-    # It's OK if the log directory exists. This is to be compatible with Python 2.7
-    if err.errno != os.errno.EEXIST:
-        raise err
-
 console_handler = logging.StreamHandler()
 console_handler.setLevel(logging.DEBUG)
 console_handler.setFormatter(logging.Formatter("%(message)s"))
 logger.addHandler(console_handler)
 
-from logging.handlers import RotatingFileHandler
-rotating_log_handler = RotatingFileHandler(os.path.join(log_dir_path, "pydmcharting.log"), maxBytes=2000000,
-                                           backupCount=100)
-rotating_log_handler.setFormatter(log_formatter)
-logger.addHandler(rotating_log_handler)
+rotating_log_handler = None
+
+
+def setup_file_logging():
+    """
+    Create the log directory and start writing the log records to rotating files. This is done once the application
+    starts rather than when this module is imported, so that importing any module of the application stays free of
+    side effects.
+
+    Returns
+    -------
+    The rotating file handler : RotatingFileHandler
+    """
+    global rotating_log_handler
+    if rotating_log_handler:
+        return rotating_log_handler
+
+    try:
+        os.makedirs(log_dir_path)
+    except os.error as err:
+        # It's OK if the log directory exists. This is to be compatible with Python 2.7
+        if err.errno != errno.EEXIST:
+            raise err
+
+    from logging.handlers import RotatingFileHandler
+    rotating_log_handler = RotatingFileHandler(os.path.join(log_dir_path, "pydmcharting.log"), maxBytes=2000000,
+                                               backupCount=100)
+    rotating_log_handler.setFormatter(log_formatter)
+    logger.addHandler(rotating_log_handler)
+    return rotating_log_handler
@@ -0,0 +1,78 @@
+import os
+# The tests run without any window on the screen
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+pytest.importorskip("pydm")
+
+import numpy as np
+from qtpy.QtWidgets import QApplication
+
+from widgets.charting_time_plot import ChartingTimePlot
+from displays.main_display import PyDMChartingDisplay
+
+PV_NAME = "ca://TEST:PV"
+
+
+class FocusTarget:
+    """
+    The parts of the main display focus_curve works with.
+    """
+    def __init__(self, chart, channel_map):
+        self.chart = chart
+        self.channel_map = channel_map
+
+
+@pytest.fixture
+def chart():
+    app = QApplication.instance() or QApplication([])
+    chart = ChartingTimePlot(plot_by_timestamps=True)
+    yield chart
+    chart.deleteLater()
+    app.processEvents()
+
+
+def test_live_curve_tracks_y_range(chart):
+    curve = chart.addFedCurve(PV_NAME, name=PV_NAME, color="white")
+    assert np.isnan(curve.minY) and np.isnan(curve.maxY)
+
+    curve.appendSamples(np.arange(100.0), np.linspace(-3.0, 5.0, 100))
+    assert curve.minY == -3.0
+    assert curve.maxY == 5.0
+
+    curve.appendSample(100.0, 7.5)
+    assert curve.maxY == 7.5
+
+
+def test_focus_curve_on_live_curve(chart):
+    curve = chart.addFedCurve(PV_NAME, name=PV_NAME, color="white")
+    curve.appendSamples(np.arange(100.0), np.linspace(-3.0, 5.0, 100))
+
+    PyDMChartingDisplay.focus_curve(FocusTarget(chart, {PV_NAME: curve}), PV_NAME)
+    y_min, y_max = chart.getViewBox().viewRange()[1]
+    assert y_min == pytest.approx(-3.0)
+    assert y_max == pytest.approx(5.0)
+
+
+def test_focus_curve_without_data(chart):
+    curve = chart.addFedCurve(PV_NAME, name=PV_NAME, color="white")
+    y_range = chart.getViewBox().viewRange()[1]
+
+    # An empty curve has no range to focus on, and leaves the view as it is
+    PyDMChartingDisplay.focus_curve(FocusTarget(chart, {PV_NAME: curve}), PV_NAME)
+    assert chart.getViewBox().viewRange()[1] == y_range
+
+
+def test_sampling_above_one_khz(chart):
+    chart.setUpdatesAsynchronously(True)
+    chart.setTimeSpan(5.0)
+    chart.setUpdateInterval(1.0 / 2000)
+    assert chart.getUpdateInterval() == pytest.approx(0.0005)
+    assert chart.getBufferSize() == 10000
+
+    chart.setTimeSpan(2.0)
+    assert chart.getBufferSize() == 4000
+
+    # Between 500 Hz and 1 kHz, the whole milliseconds of the base class would give twice the buffer
+    chart.setUpdateInterval(1.0 / 800)
+    assert chart.getBufferSize() == 1600
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from utilities.decimation import minmax_decimate
+
+
+def column_extremes(x, y, num_columns):
+    """
+    The minimum and maximum values of each pixel column, found one column at a time.
+    """
+    columns = np.clip(((x - x[0]) * (num_columns / (x[-1] - x[0]))).astype(int), 0, num_columns - 1)
+    return [(np.nanmin(y[columns == column]), np.nanmax(y[columns == column])) for column in np.unique(columns)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_extremes_are_kept(seed):
+    random = np.random.RandomState(seed)
+    x = np.sort(random.uniform(0.0, 100.0, size=5000))
+    y = random.normal(size=5000)
+    y[random.randint(5000, size=20)] = random.normal(scale=50.0, size=20)
+
+    decimated_x, decimated_y = minmax_decimate(x, y, 300)
+    assert len(decimated_x) <= 2 * 300 + 2
+    assert np.all(np.diff(decimated_x) >= 0)
+    assert decimated_x[0] == x[0] and decimated_x[-1] == x[-1]
+
+    # Every point kept is a point of the curve
+    indices = np.searchsorted(x, decimated_x)
+    np.testing.assert_array_equal(y[indices], decimated_y)
+
+    assert column_extremes(decimated_x, decimated_y, 300) == column_extremes(x, y, 300)
+
+
+def test_nan_columns_keep_a_gap():
+    x = np.arange(1000.0)
+    y = np.ones(1000)
+    y[400:600] = np.nan
+
+    decimated_x, decimated_y = minmax_decimate(x, y, 100)
+    assert np.any(np.isnan(decimated_y))
+    assert np.nanmax(decimated_y) == 1.0
+
+
+def test_short_curves_are_unchanged():
+    x = np.arange(10.0)
+    y = np.arange(10.0)
+    decimated_x, decimated_y = minmax_decimate(x, y, 100)
+    assert decimated_x is x and decimated_y is y
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from utilities.lod_pyramid import (LodPyramid, T_START, T_MIN, Y_MIN, T_MAX, Y_MAX, VALID_COUNT,
+                                   aggregate_means)
+from utilities.ring_buffer import ChunkedRingBuffer
+
+TIMESTAMP_FIELD = 0
+VALUE_FIELD = 1
+
+
+def fill(capacity, timestamps, values):
+    ring_buffer = ChunkedRingBuffer(capacity)
+    pyramid = LodPyramid(capacity)
+    ring_buffer.extend(np.vstack((timestamps, values)))
+    pyramid.extend(timestamps, values)
+    return ring_buffer, pyramid
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_aggregates_match_brute_force(seed):
+    random = np.random.RandomState(seed)
+    timestamps = np.arange(23456.0)
+    values = random.normal(size=len(timestamps))
+    values[random.randint(len(values), size=500)] = np.nan
+
+    # Feed the samples in blocks of random sizes, as the curves do
+    pyramid = LodPyramid(len(timestamps))
+    split_points = np.sort(random.randint(len(timestamps), size=50))
+    for block_timestamps, block_values in zip(np.split(timestamps, split_points), np.split(values, split_points)):
+        pyramid.extend(block_timestamps, block_values)
+
+    for factor, level in zip(pyramid.factors, pyramid.levels):
+        aggregates = level.to_array()
+        groups = values[:aggregates.shape[1] * factor].reshape(-1, factor)
+        assert aggregates.shape[1] == len(values) // factor
+        np.testing.assert_array_equal(aggregates[T_START], timestamps[::factor][:aggregates.shape[1]])
+        np.testing.assert_array_equal(aggregates[Y_MIN], np.nanmin(groups, axis=1))
+        np.testing.assert_array_equal(aggregates[Y_MAX], np.nanmax(groups, axis=1))
+        np.testing.assert_array_equal(aggregates[VALID_COUNT], np.sum(~np.isnan(groups), axis=1))
+        np.testing.assert_allclose(aggregate_means(aggregates), np.nanmean(groups, axis=1))
+        np.testing.assert_array_equal(values[aggregates[T_MIN].astype(int)], aggregates[Y_MIN])
+        np.testing.assert_array_equal(values[aggregates[T_MAX].astype(int)], aggregates[Y_MAX])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_value_range_matches_retained_samples(seed):
+    random = np.random.RandomState(seed)
+    capacity = random.randint(100, 20000)
+    count = random.randint(1, 50000)
+    values = random.normal(size=count)
+    values[random.randint(count, size=10)] = random.normal(scale=100.0, size=10)
+    ring_buffer, pyramid = fill(capacity, np.arange(float(count)), values)
+
+    retained = ring_buffer.to_array()[VALUE_FIELD]
+    assert pyramid.value_range(ring_buffer, TIMESTAMP_FIELD, VALUE_FIELD) == (retained.min(), retained.max())
+
+
+def test_value_range_leaves_out_expired_extremes():
+    timestamps = np.arange(12000.0)
+    values = np.zeros(12000)
+    values[4000] = 100.0
+    ring_buffer, pyramid = fill(7200, timestamps, values)
+
+    assert ring_buffer.oldest(TIMESTAMP_FIELD) == 4800.0
+    assert pyramid.value_range(ring_buffer, TIMESTAMP_FIELD, VALUE_FIELD) == (0.0, 0.0)
+
+
+def test_first_retained_aggregates_are_within_retention():
+    ring_buffer, pyramid = fill(7200, np.arange(12345.0), np.random.RandomState(0).normal(size=12345))
+
+    oldest = ring_buffer.oldest(TIMESTAMP_FIELD)
+    for i, level in enumerate(pyramid.levels):
+        first_index = pyramid.first_retained(i, ring_buffer, TIMESTAMP_FIELD)
+        starts = level.to_array()[T_START]
+        assert np.all(starts[first_index:] > oldest)
+        assert np.all(starts[:first_index] <= oldest)
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from utilities.ring_buffer import ChunkedRingBuffer, MIN_CHUNK_SIZE
+
+
+class NaiveRingBuffer:
+    """
+    The samples a ring buffer should retain, kept in a plain list.
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.samples = list()
+
+    def extend(self, samples):
+        self.samples.extend(zip(*samples))
+        del self.samples[:max(len(self.samples) - self.capacity, 0)]
+
+    def set_capacity(self, capacity):
+        self.capacity = max(capacity, 1)
+        self.extend(np.zeros((2, 0)))
+
+    def to_array(self):
+        return np.array(self.samples, dtype=float).reshape(-1, 2).T
+
+
+def check_equal(ring_buffer, naive):
+    expected = naive.to_array()
+    assert len(ring_buffer) == expected.shape[1]
+    np.testing.assert_array_equal(ring_buffer.to_array(), expected)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_operations_match_naive_buffer(seed):
+    random = np.random.RandomState(seed)
+    capacity = 3 * MIN_CHUNK_SIZE + 17
+    ring_buffer = ChunkedRingBuffer(capacity)
+    naive = NaiveRingBuffer(capacity)
+    next_timestamp = 0.0
+
+    for _ in range(200):
+        operation = random.randint(4)
+        if operation == 0:
+            ring_buffer.append(next_timestamp, random.normal())
+            naive.extend(ring_buffer.to_array(last_n=1))
+            next_timestamp += 1.0
+        elif operation == 1:
+            count = random.randint(0, 2 * capacity)
+            samples = np.vstack((next_timestamp + np.arange(count), random.normal(size=count)))
+            ring_buffer.extend(samples)
+            naive.extend(samples)
+            next_timestamp += count
+        elif operation == 2:
+            new_capacity = random.randint(1, 2 * capacity)
+            ring_buffer.set_capacity(new_capacity)
+            naive.set_capacity(new_capacity)
+        else:
+            expected = naive.to_array()
+            start, stop = sorted(random.randint(-10, expected.shape[1] + 10, size=2))
+            np.testing.assert_array_equal(ring_buffer.slice(start, stop), expected[:, max(start, 0):max(stop, 0)])
+        check_equal(ring_buffer, naive)
+
+
+def test_searchsorted_matches_numpy():
+    ring_buffer = ChunkedRingBuffer(5000)
+    timestamps = np.repeat(np.arange(4000.0), 2)
+    ring_buffer.extend(np.vstack((timestamps, np.zeros(len(timestamps)))))
+    retained = ring_buffer.to_array()[0]
+
+    for value in (-1.0, 1999.0, 2500.0, 2500.5, 3999.0, 4000.0):
+        for side in ("left", "right"):
+            assert ring_buffer.searchsorted(0, value, side=side) == np.searchsorted(retained, value, side=side)
+
+
+def test_oldest_and_latest():
+    ring_buffer = ChunkedRingBuffer(3)
+    assert np.isnan(ring_buffer.oldest(0)) and np.isnan(ring_buffer.latest(0))
+
+    for i in range(5):
+        ring_buffer.append(float(i), 10.0 * i)
+    assert ring_buffer.oldest(0) == 2.0
+    assert ring_buffer.latest(1) == 40.0
@@ -0,0 +1,45 @@
+from unittest import mock
+
+import pytest
+pytest.importorskip("qtpy.QtGui")
+
+from data_io.settings_importer import SettingsImporter, get_chart_keys_to_apply
+from data_io.settings_schema import validate_section, CHART_SETTINGS_FIELDS
+
+
+def chart_settings(**values):
+    return validate_section(values, CHART_SETTINGS_FIELDS, "chart settings")
+
+
+def test_buffer_size_is_reapplied_after_the_sampling_rate():
+    # The file keeps the buffer size, but applying its sampling rate resizes the buffer
+    current_settings = chart_settings(update_interval_hz=10.0, buffer_size=7200)
+    new_settings = chart_settings(update_interval_hz=100.0, buffer_size=7200)
+
+    changed_keys = get_chart_keys_to_apply(current_settings, new_settings)
+    assert changed_keys == {"update_interval_hz", "buffer_size"}
+
+    main_display = mock.MagicMock()
+    SettingsImporter(main_display)._apply_chart_settings(new_settings, changed_keys)
+    handler_names = [name for name, _, _ in main_display.method_calls if name.startswith("handle_")]
+    assert handler_names == ["handle_data_sampling_rate_changed", "handle_buffer_size_changed"]
+    main_display.handle_buffer_size_changed.assert_called_once_with("7200")
+
+
+def test_time_span_changes_reapply_the_buffer_size():
+    current_settings = chart_settings(buffer_size=7200)
+    new_settings = chart_settings(limit_time_span=True, time_span_limit_minutes=5, buffer_size=7200)
+
+    changed_keys = get_chart_keys_to_apply(current_settings, new_settings)
+    assert "buffer_size" in changed_keys
+
+    main_display = mock.MagicMock()
+    SettingsImporter(main_display)._apply_chart_settings(new_settings, changed_keys)
+    handler_names = [name for name, _, _ in main_display.method_calls if name.startswith("handle_")]
+    assert handler_names[-1] == "handle_buffer_size_changed"
+    assert "handle_chart_limit_time_span_activate_btn_clicked" in handler_names
+
+
+def test_unchanged_settings_apply_nothing():
+    assert get_chart_keys_to_apply(chart_settings(background_color="#000000"),
+                                   chart_settings(background_color="black")) == set()
@@ -0,0 +1,47 @@
+import pytest
+
+from data_io.settings_schema import (upgrade_settings, get_changed_keys, CHART_SETTINGS_FIELDS, FORMAT_VERSION_KEY,
+                                     SETTINGS_FORMAT_VERSION)
+
+
+def test_version_1_settings_are_migrated():
+    settings = upgrade_settings({
+        "pvs": {"ca://TEST:PV": {"y_channel": "ca://TEST:PV", "line_width": "3"}},
+        "chart_settings": {"time_span_limit_hours": "2", "grid_alpha": 0.5, "buffer_size": 100},
+    })
+
+    assert settings[FORMAT_VERSION_KEY] == SETTINGS_FORMAT_VERSION
+    assert settings["pvs"]["ca://TEST:PV"]["line_width"] == 3
+    assert settings["pvs"]["ca://TEST:PV"]["color"] == "white"
+
+    chart_settings = settings["chart_settings"]
+    assert chart_settings["time_span_limit_hours"] == 2
+    assert chart_settings["adaptive_redraw"] is False
+    assert chart_settings["buffer_size"] == 100
+    assert chart_settings["redraw_rate"] == CHART_SETTINGS_FIELDS["redraw_rate"][1]
+
+
+@pytest.mark.parametrize("value", [float("inf"), float("nan"), 1e400])
+def test_non_finite_numbers_fall_back_to_defaults(value):
+    settings = upgrade_settings({
+        FORMAT_VERSION_KEY: SETTINGS_FORMAT_VERSION,
+        "chart_settings": {"update_interval_hz": value, "buffer_size": value},
+    })
+    assert settings["chart_settings"]["update_interval_hz"] == CHART_SETTINGS_FIELDS["update_interval_hz"][1]
+    assert settings["chart_settings"]["buffer_size"] == CHART_SETTINGS_FIELDS["buffer_size"][1]
+
+
+@pytest.mark.parametrize("settings", [
+    [],
+    {"pvs": {}},
+    {FORMAT_VERSION_KEY: SETTINGS_FORMAT_VERSION + 1, "chart_settings": {}},
+    {"pvs": {"ca://TEST:PV": {"color": "red"}}, "chart_settings": {}},
+    {FORMAT_VERSION_KEY: SETTINGS_FORMAT_VERSION, "chart_settings": {"show_legend": "yes"}},
+])
+def test_invalid_settings_are_rejected(settings):
+    with pytest.raises(ValueError):
+        upgrade_settings(settings)
+
+
+def test_changed_keys():
+    assert get_changed_keys({"a": 1, "b": 2}, {"a": 1, "b": 3, "c": 4}) == {"b", "c"}
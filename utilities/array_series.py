@@ -0,0 +1,69 @@
+import numpy as np
+
+
+class ArraySeries:
+    def __init__(self, fields):
+        """
+        A read-only series of samples stored as one array per field, e.g. memory-mapped arrays loaded from a
+        snapshot. It offers the same read interface as ChunkedRingBuffer, so the curves can draw from either.
+
+        Parameters
+        ----------
+        fields : list
+            One 1-D array per field, all of the same length
+        """
+        self.fields = list(fields)
+        self.num_fields = len(self.fields)
+
+    def __len__(self):
+        return len(self.fields[0]) if self.fields else 0
+
+    @property
+    def nbytes(self):
+        return sum(field.nbytes for field in self.fields)
+
+    @property
+    def max_nbytes(self):
+        # The series never grows
+        return self.nbytes
+
+    def latest(self, field):
+        if not len(self):
+            return np.nan
+        return self.fields[field][-1]
+
+    def oldest(self, field):
+        if not len(self):
+            return np.nan
+        return self.fields[field][0]
+
+    def to_array(self, last_n=None):
+        if last_n is None:
+            return self.slice(0, len(self))
+        return self.slice(len(self) - last_n, len(self))
+
+    def slice(self, start, stop):
+        """
+        Copy a range of samples into a single contiguous array. Only this range is read from memory-mapped fields.
+
+        Parameters
+        ----------
+        start : int
+            The index of the first sample to copy
+        stop : int
+            The index after the last sample to copy
+
+        Returns
+        -------
+        A (num_fields, n) array of samples : numpy.ndarray
+        """
+        start = max(start, 0)
+        stop = max(min(stop, len(self)), start)
+        return np.vstack([np.asarray(field[start:stop], dtype=float) for field in self.fields])
+
+    def searchsorted(self, field, value, side="left"):
+        """
+        Find where a value would be inserted into a sorted field. A binary search only touches a few pages of a
+        memory-mapped field.
+        """
+        return int(np.searchsorted(self.fields[field], value, side=side))
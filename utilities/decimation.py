@@ -0,0 +1,75 @@
+import numpy as np
+
+
+def minmax_decimate(x, y, num_columns):
+    """
+    Downsample a curve to at most two points per pixel column, keeping the minimum and the maximum of each column at
+    their original positions. Spikes are preserved exactly, since the extreme values are never averaged out.
+
+    The x values must be sorted in ascending order, which is always the case for time series. NaN values are ignored
+    when looking for the extremes, but a column made of NaN values only keeps one NaN to preserve the gap in the curve.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        The x values of the curve
+    y : numpy.ndarray
+        The y values of the curve
+    num_columns : int
+        The number of pixel columns the x span of the curve is drawn over
+
+    Returns
+    -------
+    The decimated x and y values : tuple
+    """
+    num_points = len(x)
+    num_columns = int(num_columns)
+    if num_columns < 1 or num_points <= 2 * num_columns:
+        return x, y
+
+    x_start = x[0]
+    x_span = x[-1] - x_start
+    if not x_span > 0:
+        return x, y
+
+    columns = ((x - x_start) * (num_columns / float(x_span))).astype(np.intp)
+    np.clip(columns, 0, num_columns - 1, out=columns)
+
+    # Since x is sorted, each column is a contiguous run of points
+    starts = np.flatnonzero(np.concatenate(([True], columns[1:] != columns[:-1])))
+    counts = np.diff(np.append(starts, num_points))
+
+    column_min = np.fmin.reduceat(y, starts)
+    column_max = np.fmax.reduceat(y, starts)
+
+    min_indices = _first_match_in_runs(y == np.repeat(column_min, counts), starts)
+    max_indices = _first_match_in_runs(y == np.repeat(column_max, counts), starts)
+
+    indices = np.unique(np.concatenate((min_indices, max_indices, [0, num_points - 1])))
+    return x[indices], y[indices]
+
+
+def _first_match_in_runs(matches, starts):
+    """
+    Find the index of the first True value of each run of a boolean array. A run without any True value, e.g. a run
+    of NaN values, falls back to the start of the run.
+
+    Parameters
+    ----------
+    matches : numpy.ndarray
+        The boolean array to search
+    starts : numpy.ndarray
+        The start indices of the runs, in ascending order
+
+    Returns
+    -------
+    The index of the first match of each run : numpy.ndarray
+    """
+    first_indices = starts.copy()
+
+    match_indices = np.flatnonzero(matches)
+    if len(match_indices):
+        runs = np.searchsorted(starts, match_indices, side="right") - 1
+        is_first = np.concatenate(([True], runs[1:] != runs[:-1]))
+        first_indices[runs[is_first]] = match_indices[is_first]
+    return first_indices
@@ -0,0 +1,335 @@
+import numpy as np
+
+from utilities.ring_buffer import ChunkedRingBuffer
+from utilities.array_series import ArraySeries
+
+# How many raw samples each level of detail aggregates. Each level must be a multiple of the previous one
+LOD_FACTORS = (10, 100, 1000)
+
+# The fields of an aggregate: the time of its first sample, the times and values of its extremes, the sum of its
+# valid values, and the number of its valid (non-NaN) values
+T_START, T_MIN, Y_MIN, T_MAX, Y_MAX, Y_SUM, VALID_COUNT = range(7)
+NUM_AGGREGATE_FIELDS = 7
+
+
+def samples_to_aggregates(timestamps, values):
+    """
+    Turn raw samples into aggregates of a single sample each, so that they can be merged like any other aggregates.
+
+    Parameters
+    ----------
+    timestamps : numpy.ndarray
+        The timestamps of the samples
+    values : numpy.ndarray
+        The values of the samples
+
+    Returns
+    -------
+    A (NUM_AGGREGATE_FIELDS, n) array of aggregates : numpy.ndarray
+    """
+    is_valid = ~np.isnan(values)
+    return np.vstack((timestamps, timestamps, values, timestamps, values, np.where(is_valid, values, 0.0),
+                      is_valid))
+
+
+def merge_aggregates(groups):
+    """
+    Merge groups of aggregates into one aggregate per group.
+
+    Parameters
+    ----------
+    groups : numpy.ndarray
+        A (NUM_AGGREGATE_FIELDS, num_groups, group_size) array of aggregates
+
+    Returns
+    -------
+    A (NUM_AGGREGATE_FIELDS, num_groups) array of aggregates : numpy.ndarray
+    """
+    merged = np.empty(groups.shape[:2])
+    merged[T_START] = groups[T_START, :, 0]
+
+    # Groups made of NaN values only fall back to their first aggregate, whose extremes are NaN too
+    rows = np.arange(groups.shape[1])
+    min_positions = np.argmin(np.where(np.isnan(groups[Y_MIN]), np.inf, groups[Y_MIN]), axis=1)
+    max_positions = np.argmax(np.where(np.isnan(groups[Y_MAX]), -np.inf, groups[Y_MAX]), axis=1)
+    merged[T_MIN] = groups[T_MIN][rows, min_positions]
+    merged[Y_MIN] = groups[Y_MIN][rows, min_positions]
+    merged[T_MAX] = groups[T_MAX][rows, max_positions]
+    merged[Y_MAX] = groups[Y_MAX][rows, max_positions]
+
+    merged[Y_SUM] = groups[Y_SUM].sum(axis=1)
+    merged[VALID_COUNT] = groups[VALID_COUNT].sum(axis=1)
+    return merged
+
+
+def aggregate_means(aggregates):
+    """
+    Get the mean value of each aggregate, NaN for the aggregates without any valid value.
+
+    Parameters
+    ----------
+    aggregates : numpy.ndarray
+        A (NUM_AGGREGATE_FIELDS, n) array of aggregates
+
+    Returns
+    -------
+    The mean values : numpy.ndarray
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(aggregates[VALID_COUNT] > 0, aggregates[Y_SUM] / aggregates[VALID_COUNT], np.nan)
+
+
+def aggregates_to_points(aggregates):
+    """
+    Turn aggregates into the points to draw, i.e. the minimum and the maximum of each aggregate, in time order.
+
+    Parameters
+    ----------
+    aggregates : numpy.ndarray
+        A (NUM_AGGREGATE_FIELDS, n) array of aggregates
+
+    Returns
+    -------
+    The x and y values of the points : tuple
+    """
+    min_first = aggregates[T_MIN] <= aggregates[T_MAX]
+    x = np.empty(2 * aggregates.shape[1])
+    y = np.empty(2 * aggregates.shape[1])
+
+    x[0::2] = np.where(min_first, aggregates[T_MIN], aggregates[T_MAX])
+    y[0::2] = np.where(min_first, aggregates[Y_MIN], aggregates[Y_MAX])
+    x[1::2] = np.where(min_first, aggregates[T_MAX], aggregates[T_MIN])
+    y[1::2] = np.where(min_first, aggregates[Y_MAX], aggregates[Y_MIN])
+    return x, y
+
+
+class LodPyramid:
+    def __init__(self, capacity, factors=LOD_FACTORS):
+        """
+        A multi-resolution history of a curve. Each level keeps min/max/mean aggregates of a fixed number of raw
+        samples, and is updated incrementally as new samples are fed in.
+
+        Parameters
+        ----------
+        capacity : int
+            The number of raw samples retained by the curve
+        factors : tuple
+            How many raw samples each level aggregates, from the finest to the coarsest level
+        """
+        self.factors = factors
+        self.levels = [ChunkedRingBuffer(1, num_fields=NUM_AGGREGATE_FIELDS) for _ in factors]
+        self._pending = [np.zeros((NUM_AGGREGATE_FIELDS, 0)) for _ in factors]
+        self.samples_added = 0
+        self.set_capacity(capacity)
+
+    def set_capacity(self, capacity):
+        """
+        Size each level to cover the same time span as the raw samples retained by the curve. The levels keep one more
+        aggregate than that span needs, so their oldest aggregates may cover samples the curve no longer retains, and
+        are left out by first_retained.
+
+        Parameters
+        ----------
+        capacity : int
+            The number of raw samples retained by the curve
+        """
+        for factor, level in zip(self.factors, self.levels):
+            level.set_capacity(-(-int(capacity) // factor) + 1)
+
+    @classmethod
+    def from_arrays(cls, levels, pending, samples_added, factors=LOD_FACTORS):
+        """
+        Rebuild a pyramid from the arrays returned by to_arrays, e.g. memory-mapped from a snapshot. The levels are
+        read through ArraySeries, so that nothing is loaded until a level is drawn. The rebuilt pyramid is read-only.
+
+        Parameters
+        ----------
+        levels : list
+            One (NUM_AGGREGATE_FIELDS, n) array of aggregates per level
+        pending : list
+            One (NUM_AGGREGATE_FIELDS, n) array of pending aggregates per level
+        samples_added : int
+            The number of raw samples fed into the pyramid
+        factors : tuple
+            How many raw samples each level aggregates
+
+        Returns
+        -------
+        The rebuilt pyramid : LodPyramid
+        """
+        pyramid = cls(1, factors=tuple(factors))
+        pyramid.levels = [ArraySeries([level[i] for i in range(NUM_AGGREGATE_FIELDS)]) for level in levels]
+        pyramid._pending = [np.asarray(p, dtype=float).reshape(NUM_AGGREGATE_FIELDS, -1) for p in pending]
+        pyramid.samples_added = int(samples_added)
+        return pyramid
+
+    def to_arrays(self):
+        """
+        Copy the levels and the pending aggregates, e.g. to save them to a snapshot.
+
+        Returns
+        -------
+        The list of level arrays and the list of pending arrays : tuple
+        """
+        return [level.to_array() for level in self.levels], [p.copy() for p in self._pending]
+
+    def clear(self):
+        for level in self.levels:
+            level.clear()
+        self._pending = [np.zeros((NUM_AGGREGATE_FIELDS, 0)) for _ in self.factors]
+        self.samples_added = 0
+
+    def extend(self, timestamps, values):
+        """
+        Feed new raw samples into the pyramid. Only the aggregates completed by these samples are computed.
+
+        Parameters
+        ----------
+        timestamps : numpy.ndarray
+            The timestamps of the new samples, in ascending order
+        values : numpy.ndarray
+            The values of the new samples
+        """
+        aggregates = samples_to_aggregates(timestamps, values)
+        self.samples_added += len(timestamps)
+
+        previous_factor = 1
+        for i, factor in enumerate(self.factors):
+            group_size = factor // previous_factor
+            previous_factor = factor
+
+            block = np.concatenate((self._pending[i], aggregates), axis=1)
+            complete_count = block.shape[1] - block.shape[1] % group_size
+            self._pending[i] = block[:, complete_count:]
+            if not complete_count:
+                break
+
+            aggregates = merge_aggregates(block[:, :complete_count].reshape(NUM_AGGREGATE_FIELDS, -1, group_size))
+            self.levels[i].extend(aggregates)
+
+    def pending_samples(self, level_index):
+        """
+        Get the number of the most recent raw samples not yet covered by a complete aggregate of a level.
+
+        Parameters
+        ----------
+        level_index : int
+            The index of the level, 0 being the finest
+
+        Returns
+        -------
+        The number of raw samples : int
+        """
+        count = 0
+        previous_factor = 1
+        for i in range(level_index + 1):
+            count += self._pending[i].shape[1] * previous_factor
+            previous_factor = self.factors[i]
+        return count
+
+    def first_retained(self, level_index, ring_buffer, timestamp_field):
+        """
+        Get the index of the first aggregate of a level whose samples are all still retained by the curve. The older
+        aggregates reach back further than the raw samples, and would report extremes that have already expired.
+
+        Parameters
+        ----------
+        level_index : int
+            The index of the level, 0 being the finest
+        ring_buffer : ChunkedRingBuffer
+            The raw samples of the curve
+        timestamp_field : int
+            The index of the timestamp field of the raw samples
+
+        Returns
+        -------
+        The index of the aggregate in the level : int
+        """
+        if not len(ring_buffer):
+            return len(self.levels[level_index])
+
+        # An aggregate starting at the oldest timestamp may still include expired samples sharing that timestamp
+        return self.levels[level_index].searchsorted(T_START, ring_buffer.oldest(timestamp_field), side="right")
+
+    def head_samples(self, level_index, first_index, ring_buffer, timestamp_field):
+        """
+        Get the number of the oldest raw samples retained by the curve, but left out of the retained aggregates of a
+        level.
+
+        Parameters
+        ----------
+        level_index : int
+            The index of the level, 0 being the finest
+        first_index : int
+            The index of the first retained aggregate, as returned by first_retained, which must exist
+        ring_buffer : ChunkedRingBuffer
+            The raw samples of the curve
+        timestamp_field : int
+            The index of the timestamp field of the raw samples
+
+        Returns
+        -------
+        The number of raw samples : int
+        """
+        first_start = self.levels[level_index].slice(first_index, first_index + 1)[T_START, 0]
+        return ring_buffer.searchsorted(timestamp_field, first_start)
+
+    def select_level(self, samples_per_column):
+        """
+        Pick the coarsest level that still provides at least two aggregates per pixel column, so that the min/max
+        decimation of the level is as exact as the decimation of the raw samples.
+
+        Parameters
+        ----------
+        samples_per_column : float
+            The number of raw samples falling into each pixel column
+
+        Returns
+        -------
+        The index of the level, or None if the raw samples should be used : int
+        """
+        selected_index = None
+        for i, factor in enumerate(self.factors):
+            if 2 * factor <= samples_per_column and len(self.levels[i]):
+                selected_index = i
+        return selected_index
+
+    def value_range(self, ring_buffer, timestamp_field, value_field):
+        """
+        Get the minimum and maximum values of the retained history, reading the retained aggregates of the coarsest
+        level available, and the raw samples before and after them.
+
+        Parameters
+        ----------
+        ring_buffer : ChunkedRingBuffer
+            The raw samples of the curve
+        timestamp_field : int
+            The index of the timestamp field of the raw samples
+        value_field : int
+            The index of the value field of the raw samples
+
+        Returns
+        -------
+        The minimum and maximum values, NaN if there are no valid values : tuple
+        """
+        extremes = list()
+        for i in reversed(range(len(self.levels))):
+            level = self.levels[i]
+            first_index = self.first_retained(i, ring_buffer, timestamp_field)
+            if first_index < len(level):
+                aggregates = level.slice(first_index, len(level))
+                extremes.append(aggregates[Y_MIN])
+                extremes.append(aggregates[Y_MAX])
+                head_count = self.head_samples(i, first_index, ring_buffer, timestamp_field)
+                extremes.append(ring_buffer.slice(0, head_count)[value_field])
+                extremes.append(ring_buffer.to_array(last_n=self.pending_samples(i))[value_field])
+                break
+        else:
+            extremes.append(ring_buffer.to_array()[value_field])
+        if not extremes:
+            return np.nan, np.nan
+
+        extremes = np.concatenate(extremes)
+        if np.all(np.isnan(extremes)):
+            return np.nan, np.nan
+        return np.nanmin(extremes), np.nanmax(extremes)
@@ -0,0 +1,81 @@
+from collections import OrderedDict
+
+
+class MemoryBoundedLruCache:
+    def __init__(self, max_bytes, size_of, on_evict=None):
+        """
+        A least-recently-used cache bounded by the memory its values hold rather than by their number. Adding a value
+        evicts the least recently used values until the total size fits again.
+
+        Parameters
+        ----------
+        max_bytes : int
+            The maximum total size of the cached values, in bytes
+        size_of : callable
+            A function returning the size of a value, in bytes
+        on_evict : callable
+            An optional function called with the key and the value of each evicted entry, e.g. to release what the
+            value holds
+        """
+        self.max_bytes = max_bytes
+        self.size_of = size_of
+        self.on_evict = on_evict
+        self.nbytes = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def keys(self):
+        """
+        Get the keys of the cached values, from the least to the most recently used.
+        """
+        return list(self._entries.keys())
+
+    def get(self, key, default=None):
+        """
+        Get a cached value, and mark it as the most recently used.
+        """
+        if key not in self._entries:
+            return default
+        value = self._entries.pop(key)
+        self._entries[key] = value
+        return value
+
+    def put(self, key, value):
+        """
+        Add or replace a cached value. A value larger than the whole cache is not kept.
+        """
+        self.pop(key)
+
+        size = self.size_of(value)
+        if size > self.max_bytes:
+            return
+
+        self._entries[key] = value
+        self.nbytes += size
+        self._evict()
+
+    def pop(self, key):
+        value = self._entries.pop(key, None)
+        if value is not None:
+            self.nbytes -= self.size_of(value)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
+
+    def set_max_bytes(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def _evict(self):
+        while self.nbytes > self.max_bytes and self._entries:
+            key, value = self._entries.popitem(last=False)
+            self.nbytes -= self.size_of(value)
+            if self.on_evict:
+                self.on_evict(key, value)
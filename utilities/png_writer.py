@@ -0,0 +1,80 @@
+import struct
+import zlib
+
+import numpy as np
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# 8 bits per channel, truecolor (RGB)
+PNG_BIT_DEPTH = 8
+PNG_COLOR_TYPE_RGB = 2
+
+# The type byte starting each scanline, i.e. no filtering
+PNG_FILTER_NONE = 0
+
+PNG_COMPRESSION_LEVEL = 6
+
+
+class PngStripWriter:
+    def __init__(self, png_file, width, height):
+        """
+        Write an RGB PNG image strip by strip, from the top row down, so that an image far larger than the memory
+        available for a single bitmap can be written from a few rows at a time.
+
+        Parameters
+        ----------
+        png_file : file
+            The binary file to write the image to
+        width : int
+            The width of the image, in pixels
+        height : int
+            The height of the image, in pixels
+        """
+        self.png_file = png_file
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self._compressor = zlib.compressobj(PNG_COMPRESSION_LEVEL)
+
+        self.png_file.write(PNG_SIGNATURE)
+        self._write_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, PNG_BIT_DEPTH, PNG_COLOR_TYPE_RGB, 0, 0, 0))
+
+    def write_rows(self, rows):
+        """
+        Append the next rows of the image.
+
+        Parameters
+        ----------
+        rows : numpy.ndarray
+            A (row count, width * 3) array of uint8 RGB values
+        """
+        if rows.shape[1] != self.width * 3:
+            raise ValueError("Expected rows of {0} RGB pixels, got {1} bytes.".format(self.width, rows.shape[1]))
+        if self.rows_written + len(rows) > self.height:
+            raise ValueError("The image only has {0} rows.".format(self.height))
+
+        scanlines = np.empty((len(rows), rows.shape[1] + 1), dtype=np.uint8)
+        scanlines[:, 0] = PNG_FILTER_NONE
+        scanlines[:, 1:] = rows
+        self._write_data(self._compressor.compress(scanlines.tobytes()))
+        self.rows_written += len(rows)
+
+    def close(self):
+        """
+        Complete the image. All its rows must have been written.
+        """
+        if self.rows_written != self.height:
+            raise ValueError("Only {0} of the {1} rows of the image were written.".format(self.rows_written,
+                                                                                         self.height))
+        self._write_data(self._compressor.flush())
+        self._write_chunk(b"IEND", b"")
+
+    def _write_data(self, data):
+        if data:
+            self._write_chunk(b"IDAT", data)
+
+    def _write_chunk(self, chunk_type, data):
+        self.png_file.write(struct.pack(">I", len(data)))
+        self.png_file.write(chunk_type)
+        self.png_file.write(data)
+        self.png_file.write(struct.pack(">I", zlib.crc32(chunk_type + data) & 0xffffffff))
@@ -0,0 +1,288 @@
+from collections import deque
+
+import numpy as np
+
+MIN_CHUNK_SIZE = 1024
+MAX_CHUNK_SIZE = 65536
+
+# The number of chunks a full buffer is split into. More chunks mean less memory held by the chunk being filled
+CHUNKS_PER_BUFFER = 8
+
+
+class ChunkedRingBuffer:
+    def __init__(self, capacity, num_fields=2, dtype=float):
+        """
+        A ring buffer made of preallocated chunks. Appending a sample writes into the newest chunk, and the oldest
+        chunk is recycled once all its samples have expired, so that appends are amortized O(1) and the existing
+        samples are never copied, including when the capacity changes.
+
+        Parameters
+        ----------
+        capacity : int
+            The maximum number of samples to retain
+        num_fields : int
+            The number of values per sample, e.g. 2 for (timestamp, value)
+        dtype : numpy.dtype
+            The data type of the values
+        """
+        self.num_fields = num_fields
+        self.dtype = dtype
+
+        self._chunks = deque()
+        self._spare_chunk = None
+        self._head = 0   # The position of the oldest sample in the first chunk
+        self._tail = 0   # The number of samples written into the last chunk
+        self._length = 0
+
+        self._capacity = 0
+        self._chunk_size = MIN_CHUNK_SIZE
+        self.set_capacity(capacity)
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def nbytes(self):
+        """
+        The memory allocated for the samples, in bytes.
+        """
+        chunk_bytes = sum(chunk.nbytes for chunk in self._chunks)
+        if self._spare_chunk is not None:
+            chunk_bytes += self._spare_chunk.nbytes
+        return chunk_bytes
+
+    @property
+    def max_nbytes(self):
+        """
+        The memory the samples may take once the buffer is full, in bytes, i.e. the chunks spanning the capacity,
+        along with the partly expired oldest chunk and the spare chunk.
+        """
+        num_chunks = -(-self._capacity // self._chunk_size) + 2
+        return num_chunks * self._chunk_size * self.num_fields * np.dtype(self.dtype).itemsize
+
+    def set_capacity(self, capacity):
+        """
+        Change the maximum number of samples to retain. Growing the buffer allocates nothing until new samples
+        arrive. Shrinking the buffer drops the oldest samples, and releases the chunks that no longer hold any.
+
+        Parameters
+        ----------
+        capacity : int
+            The new maximum number of samples to retain
+        """
+        self._capacity = max(int(capacity), 1)
+        self._chunk_size = min(MAX_CHUNK_SIZE, max(MIN_CHUNK_SIZE, self._capacity // CHUNKS_PER_BUFFER))
+
+        if self._spare_chunk is not None and self._spare_chunk.shape[1] != self._chunk_size:
+            self._spare_chunk = None
+        if self._length > self._capacity:
+            self._drop_oldest(self._length - self._capacity)
+
+    def clear(self):
+        self._chunks.clear()
+        self._spare_chunk = None
+        self._head = 0
+        self._tail = 0
+        self._length = 0
+
+    def append(self, *values):
+        """
+        Append one sample.
+
+        Parameters
+        ----------
+        values : float
+            One value per field, e.g. the timestamp and the value
+        """
+        if not self._chunks or self._tail == self._chunks[-1].shape[1]:
+            self._chunks.append(self._new_chunk())
+            self._tail = 0
+
+        self._chunks[-1][:, self._tail] = values
+        self._tail += 1
+        self._length += 1
+
+        if self._length > self._capacity:
+            self._drop_oldest(self._length - self._capacity)
+
+    def extend(self, samples):
+        """
+        Append a block of samples at once.
+
+        Parameters
+        ----------
+        samples : numpy.ndarray
+            A (num_fields, n) array of samples, oldest first
+        """
+        num_samples = samples.shape[1]
+        if num_samples > self._capacity:
+            samples = samples[:, -self._capacity:]
+            num_samples = self._capacity
+
+        written = 0
+        while written < num_samples:
+            if not self._chunks or self._tail == self._chunks[-1].shape[1]:
+                self._chunks.append(self._new_chunk())
+                self._tail = 0
+
+            chunk = self._chunks[-1]
+            count = min(chunk.shape[1] - self._tail, num_samples - written)
+            chunk[:, self._tail:self._tail + count] = samples[:, written:written + count]
+            self._tail += count
+            written += count
+
+        self._length += num_samples
+        if self._length > self._capacity:
+            self._drop_oldest(self._length - self._capacity)
+
+    def latest(self, field):
+        """
+        Get the most recent value of a field.
+
+        Parameters
+        ----------
+        field : int
+            The index of the field
+
+        Returns
+        -------
+        The most recent value, or NaN if the buffer is empty : float
+        """
+        if not self._length:
+            return np.nan
+        return self._chunks[-1][field, self._tail - 1]
+
+    def oldest(self, field):
+        """
+        Get the oldest retained value of a field.
+
+        Parameters
+        ----------
+        field : int
+            The index of the field
+
+        Returns
+        -------
+        The oldest value, or NaN if the buffer is empty : float
+        """
+        if not self._length:
+            return np.nan
+        return self._chunks[0][field, self._head]
+
+    def chunk_views(self):
+        """
+        Get the samples as a list of array views, one per chunk, oldest first. Nothing is copied, so the views are
+        only valid until the next append.
+
+        Returns
+        -------
+        A list of (num_fields, n) arrays : list
+        """
+        views = list()
+        last_index = len(self._chunks) - 1
+        for i, chunk in enumerate(self._chunks):
+            start = self._head if i == 0 else 0
+            stop = self._tail if i == last_index else chunk.shape[1]
+            if stop > start:
+                views.append(chunk[:, start:stop])
+        return views
+
+    def to_array(self, last_n=None):
+        """
+        Copy the samples into a single contiguous array.
+
+        Parameters
+        ----------
+        last_n : int
+            If provided, copy only the most recent last_n samples
+
+        Returns
+        -------
+        A (num_fields, n) array of samples, oldest first : numpy.ndarray
+        """
+        if last_n is None:
+            return self.slice(0, self._length)
+        return self.slice(max(self._length - last_n, 0), self._length)
+
+    def slice(self, start, stop):
+        """
+        Copy a range of samples into a single contiguous array. Only the chunks overlapping the range are read.
+
+        Parameters
+        ----------
+        start : int
+            The index of the first sample to copy, 0 being the oldest retained sample
+        stop : int
+            The index after the last sample to copy
+
+        Returns
+        -------
+        A (num_fields, n) array of samples, oldest first : numpy.ndarray
+        """
+        start = max(start, 0)
+        stop = min(stop, self._length)
+
+        kept_views = list()
+        offset = 0
+        for view in self.chunk_views():
+            view_length = view.shape[1]
+            if offset >= stop:
+                break
+            if offset + view_length > start:
+                kept_views.append(view[:, max(start - offset, 0):stop - offset])
+            offset += view_length
+
+        if not kept_views:
+            return np.zeros((self.num_fields, 0), dtype=self.dtype)
+        return np.concatenate(kept_views, axis=1)
+
+    def searchsorted(self, field, value, side="left"):
+        """
+        Find where a value would be inserted into a field whose values are sorted in ascending order, e.g. the
+        timestamps. Only the chunk containing the value is searched.
+
+        Parameters
+        ----------
+        field : int
+            The index of the sorted field
+        value : float
+            The value to look for
+        side : str
+            "left" or "right", as in numpy.searchsorted
+
+        Returns
+        -------
+        The insertion index, 0 being the oldest retained sample : int
+        """
+        offset = 0
+        for view in self.chunk_views():
+            last_value = view[field, -1]
+            if last_value < value or (side == "right" and last_value == value):
+                offset += view.shape[1]
+                continue
+            return offset + int(np.searchsorted(view[field], value, side=side))
+        return offset
+
+    def _new_chunk(self):
+        if self._spare_chunk is not None:
+            chunk, self._spare_chunk = self._spare_chunk, None
+            return chunk
+        return np.empty((self.num_fields, self._chunk_size), dtype=self.dtype)
+
+    def _drop_oldest(self, count):
+        self._head += count
+        self._length -= count
+
+        while self._chunks and self._head >= self._chunks[0].shape[1]:
+            self._head -= self._chunks[0].shape[1]
+            expired_chunk = self._chunks.popleft()
+            if expired_chunk.shape[1] == self._chunk_size:
+                self._spare_chunk = expired_chunk
+
+        if not self._chunks:
+            self._head = 0
+            self._tail = 0
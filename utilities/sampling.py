@@ -0,0 +1,54 @@
+import numpy as np
+
+# When the sampling period is shorter than this, each timer tick takes the samples of several sampling ticks at once,
+# so that the sampling timer never fires faster than the event loop can keep up with
+SAMPLING_BATCH_INTERVAL_MS = 20
+
+# After a stall longer than this, the samples missed before it are dropped instead of being filled in with a stale
+# value
+MAX_CATCH_UP_S = 5.0
+
+
+def get_due_sample_times(next_sample_time, now, sampling_period, max_catch_up_s=MAX_CATCH_UP_S):
+    """
+    Compute the sampling ticks due by now on a regular time grid, so that a timer firing less often than the sampling
+    rate, or late, still produces one sample per tick.
+
+    Parameters
+    ----------
+    next_sample_time : float
+        The time of the next tick on the grid
+    now : float
+        The current time
+    sampling_period : float
+        The time between two ticks, in seconds
+    max_catch_up_s : float
+        How far back the due ticks are produced, in seconds
+
+    Returns
+    -------
+    The times of the due ticks, and the time of the next tick after them : tuple
+    """
+    if now < next_sample_time:
+        return np.zeros(0), next_sample_time
+
+    tick_count = int((now - next_sample_time) / sampling_period) + 1
+    kept_count = min(tick_count, max(int(max_catch_up_s / sampling_period), 1))
+    sample_times = next_sample_time + sampling_period * np.arange(tick_count - kept_count, tick_count)
+    return sample_times, next_sample_time + tick_count * sampling_period
+
+
+def get_sampling_timer_interval(sampling_period):
+    """
+    The interval of a timer taking the samples due at each of its ticks with get_due_sample_times.
+
+    Parameters
+    ----------
+    sampling_period : float
+        The time between two samples, in seconds
+
+    Returns
+    -------
+    The timer interval, in milliseconds : int
+    """
+    return max(int(sampling_period * 1000), SAMPLING_BATCH_INTERVAL_MS)
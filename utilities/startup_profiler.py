@@ -0,0 +1,92 @@
+import sys
+from timeit import default_timer
+
+from qtpy.QtCore import QObject, QEvent
+
+# The time to first paint the application aims to stay under, in seconds
+FIRST_PAINT_TARGET_S = 1.0
+
+
+class StartupProfiler:
+    def __init__(self, start_time):
+        """
+        Record how long each phase of the application startup takes, and how many modules each phase imports.
+
+        Parameters
+        ----------
+        start_time : float
+            The default_timer value taken when the application started loading
+        """
+        self.start_time = start_time
+        self.phases = list()
+        self._last_time = start_time
+        self._last_module_count = 0
+
+    def mark(self, phase):
+        """
+        Record the end of a startup phase, which began at the end of the previous one.
+
+        Parameters
+        ----------
+        phase : str
+            The description of the phase
+        """
+        now = default_timer()
+        module_count = len(sys.modules)
+        self.phases.append((phase, now - self._last_time, module_count - self._last_module_count))
+        self._last_time = now
+        self._last_module_count = module_count
+
+    @property
+    def elapsed(self):
+        return self._last_time - self.start_time
+
+    def report(self, stream=sys.stderr):
+        """
+        Print the duration of each phase, and the total time against the first paint target.
+
+        Parameters
+        ----------
+        stream : file
+            The stream to print the breakdown to
+        """
+        phase_width = max([len(phase) for phase, _, _ in self.phases] + [len("Phase")])
+        row_format = "{0:<" + str(phase_width) + "}  {1:>10}  {2:>10}  {3:>8}\n"
+
+        stream.write("Startup time breakdown:\n")
+        stream.write(row_format.format("Phase", "Time (ms)", "Total (ms)", "Modules"))
+        total = 0.0
+        for phase, duration, module_count in self.phases:
+            total += duration
+            stream.write(row_format.format(phase, "{0:.1f}".format(duration * 1000), "{0:.1f}".format(total * 1000),
+                                           module_count))
+        stream.write("Time to first paint: {0:.3f} s (target: {1:.1f} s{2})\n".format(
+            self.elapsed, FIRST_PAINT_TARGET_S, "" if self.elapsed <= FIRST_PAINT_TARGET_S else ", exceeded"))
+        stream.flush()
+
+
+class FirstPaintWatcher(QObject):
+    def __init__(self, widget, callback):
+        """
+        Call a function once, right after a widget is painted for the first time.
+
+        Parameters
+        ----------
+        widget : QWidget
+            The widget to watch
+        callback : callable
+            The function to call after the first paint
+        """
+        super(FirstPaintWatcher, self).__init__(widget)
+        self.widget = widget
+        self.callback = callback
+        widget.installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if watched is self.widget and event.type() == QEvent.Paint:
+            self.widget.removeEventFilter(self)
+            # Let the widget paint before the callback runs
+            result = watched.event(event)
+            self.callback()
+            return result
+        return super(FirstPaintWatcher, self).eventFilter(watched, event)
@@ -0,0 +1,151 @@
+import time
+
+import numpy as np
+
+from qtpy.QtCore import Qt, QObject, QTimer
+
+from utilities.sampling import get_due_sample_times, get_sampling_timer_interval
+
+INITIAL_CAPACITY = 16
+
+
+class AsyncSampler(QObject):
+    def __init__(self, parent=None, sampling_period=1.0):
+        """
+        Sample the latest values of all the curves of a chart at a fixed rate. The latest values are kept in one array,
+        and the samples due at each timer tick are computed as one (curves, ticks) block, so that the sampling rate is
+        not bound by the timer resolution, nor by one Python call per curve and per sampling tick.
+
+        A sample keeps the value the curve had at the start of the batch until the time the first new value of the
+        batch was received, so that batching the ticks does not shift the values in time.
+
+        Parameters
+        ----------
+        parent : QObject
+            The parent of the sampler, i.e. the chart
+        sampling_period : float
+            The time between two samples, in seconds
+        """
+        super(AsyncSampler, self).__init__(parent)
+        self.curves = list()
+        self.latest_values = np.full(INITIAL_CAPACITY, np.nan)
+        self.batch_start_values = np.full(INITIAL_CAPACITY, np.nan)
+        self.change_times = np.full(INITIAL_CAPACITY, np.inf)
+
+        self.sampling_period = sampling_period
+        self.next_sample_time = time.time()
+        self.enabled = False
+        self.paused = False
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.sample)
+        self._update_timer_interval()
+
+    def add_curve(self, curve):
+        """
+        Sample a curve from now on. The curve forwards its new values to set_latest_value, using the slot assigned to
+        it here.
+
+        Parameters
+        ----------
+        curve : ChartingCurveItem
+            The curve to sample
+        """
+        slot = len(self.curves)
+        if slot == len(self.latest_values):
+            # Double the capacity of the arrays, like a list does
+            self.latest_values = _grow(self.latest_values, np.nan)
+            self.batch_start_values = _grow(self.batch_start_values, np.nan)
+            self.change_times = _grow(self.change_times, np.inf)
+
+        self.curves.append(curve)
+        self.latest_values[slot] = np.nan
+        self.batch_start_values[slot] = np.nan
+        self.change_times[slot] = np.inf
+        curve.async_sampler = self
+        curve.sampler_slot = slot
+
+    def remove_curve(self, curve):
+        """
+        Stop sampling a curve. The last curve takes over its slot, so that the slots stay contiguous.
+        """
+        if getattr(curve, "async_sampler", None) is not self:
+            return
+
+        slot = curve.sampler_slot
+        last_slot = len(self.curves) - 1
+        if slot != last_slot:
+            last_curve = self.curves[last_slot]
+            self.curves[slot] = last_curve
+            last_curve.sampler_slot = slot
+            for values in (self.latest_values, self.batch_start_values, self.change_times):
+                values[slot] = values[last_slot]
+        self.curves.pop()
+
+        curve.async_sampler = None
+        curve.sampler_slot = -1
+
+    def set_latest_value(self, slot, value):
+        if self.change_times[slot] == np.inf:
+            self.change_times[slot] = time.time()
+        self.latest_values[slot] = np.nan if value is None else value
+
+    def set_sampling_period(self, sampling_period):
+        self.sampling_period = sampling_period
+        self._update_timer_interval()
+
+    def set_enabled(self, enabled):
+        """
+        Start or stop sampling, e.g. when the chart switches between the asynchronous and synchronous modes.
+        """
+        self.enabled = enabled
+        self._update_timer_state()
+
+    def toggle_paused(self):
+        """
+        Pause the sampling if it is running, or resume it.
+
+        Returns
+        -------
+        True if the sampling is running after the toggle; False if it is paused : bool
+        """
+        self.paused = not self.paused
+        self._update_timer_state()
+        return not self.paused
+
+    def sample(self):
+        """
+        Append the samples due since the last tick to every curve. The samples of all the curves are computed in a
+        single array operation, then appended to each curve buffer as one block.
+        """
+        now = time.time()
+        sample_times, self.next_sample_time = get_due_sample_times(self.next_sample_time, now, self.sampling_period)
+        curve_count = len(self.curves)
+        if not len(sample_times) or not curve_count:
+            return
+
+        values = np.where(sample_times[np.newaxis, :] < self.change_times[:curve_count, np.newaxis],
+                          self.batch_start_values[:curve_count, np.newaxis],
+                          self.latest_values[:curve_count, np.newaxis])
+        for curve, curve_values in zip(self.curves, values):
+            curve.appendSamples(sample_times, curve_values)
+
+        self.batch_start_values[:curve_count] = self.latest_values[:curve_count]
+        self.change_times[:curve_count] = np.inf
+
+    def _update_timer_interval(self):
+        self.timer.setInterval(get_sampling_timer_interval(self.sampling_period))
+
+    def _update_timer_state(self):
+        if self.enabled and not self.paused:
+            if not self.timer.isActive():
+                # Sampling resumes from now on, leaving a gap over the time it was stopped
+                self.next_sample_time = time.time()
+                self.timer.start()
+        else:
+            self.timer.stop()
+
+
+def _grow(values, fill_value):
+    return np.concatenate((values, np.full(len(values), fill_value)))
@@ -0,0 +1,1073 @@
+# The Time Plot and Curve Items Used by the Charting Tool
+from setup_paths import setup_paths
+setup_paths()
+
+import time
+from timeit import default_timer
+
+import numpy as np
+
+from pydm.widgets.baseplot import BasePlotCurveItem
+from pydm.widgets.timeplot import PyDMTimePlot, TimePlotCurveItem, DEFAULT_TIME_SPAN, DEFAULT_UPDATE_INTERVAL
+from qtpy.QtCore import Qt, Slot
+from qtpy.QtWidgets import QGraphicsItem
+
+from utilities.decimation import minmax_decimate
+from utilities.ring_buffer import ChunkedRingBuffer
+from utilities.lod_pyramid import LodPyramid, T_START, aggregates_to_points
+from utilities.array_series import ArraySeries
+from data_io.archive_data_source import ArchiveDataSource, ARCHIVE_PROTOCOL
+from widgets.async_sampler import AsyncSampler
+from widgets.clock_item import ClockItem
+from widgets.performance_overlay_item import PerformanceOverlayItem
+
+TIMESTAMP_FIELD = 0
+VALUE_FIELD = 1
+
+
+class DecimatedCurveMixin(object):
+    """
+    The drawing logic shared by the live and the frozen curves. The class using this mixin provides a ring_buffer
+    holding the (timestamp, value) samples and a lod_pyramid holding their multi-resolution history.
+    """
+    # The number of pixel columns each min/max bin spans, raised by the redraw governor to draw fewer points
+    decimation_factor = 1
+
+    # True while the points drawn are out of date, because the curve was hidden or out of the view when its data
+    # changed
+    needs_data_update = False
+
+    def syncLodPyramid(self):
+        """
+        Bring the multi-resolution history up to date with the samples. Curves whose history never changes do nothing.
+        """
+        pass
+
+    def getBufferMemory(self):
+        """
+        Get the memory held by the data buffer of this curve, in bytes.
+        """
+        return self.ring_buffer.nbytes + sum(level.nbytes for level in self.lod_pyramid.levels)
+
+    def getMaxBufferMemory(self):
+        """
+        Get the memory the data buffer of this curve may take once full, in bytes. The buffers only allocate their
+        chunks as the samples arrive, so a curve still buffering grows up to this size.
+        """
+        return self.ring_buffer.max_nbytes + sum(level.max_nbytes for level in self.lod_pyramid.levels)
+
+    def getLatestY(self):
+        """
+        Get the most recent y value, or NaN if no data has been accumulated yet.
+        """
+        return self.ring_buffer.latest(VALUE_FIELD)
+
+    def getValueRange(self):
+        """
+        Get the minimum and maximum values of the whole history, read from the multi-resolution history and the
+        samples not aggregated yet, rather than tracked on every sample.
+
+        Returns
+        -------
+        The minimum and maximum values, NaN if there are no valid values : tuple
+        """
+        self.syncLodPyramid()
+        return self.lod_pyramid.value_range(self.ring_buffer, TIMESTAMP_FIELD, VALUE_FIELD)
+
+    @property
+    def minY(self):
+        return self.getValueRange()[0]
+
+    @minY.setter
+    def minY(self, value):
+        # PyDM tracks the extremes as the samples arrive, which the buffers make unnecessary
+        pass
+
+    @property
+    def maxY(self):
+        return self.getValueRange()[1]
+
+    @maxY.setter
+    def maxY(self, value):
+        pass
+
+    def max_x(self):
+        return self.ring_buffer.latest(TIMESTAMP_FIELD)
+
+    def min_x(self):
+        return self.ring_buffer.oldest(TIMESTAMP_FIELD)
+
+    def getTimeOffset(self):
+        """
+        Get the offset between the timestamps and the x values displayed, i.e. the current time if the x-axis shows
+        the relative time from now, or 0 if it shows the timestamps.
+        """
+        return 0.0 if self.plot_by_timestamps else time.time()
+
+    def getPlotData(self):
+        """
+        Get the data to draw, with the x values already converted to what the x-axis displays.
+
+        Without decimation, this is the whole buffer. With decimation, this is only the part of the history within
+        the current x range, read from the level of detail matching the number of samples per pixel column, so that
+        the cost of a redraw depends on the width of the view rather than on the length of the history.
+
+        Returns
+        -------
+        The x and y values of the curve : tuple
+        """
+        view_box = self.getViewBox()
+        if not self.decimation_enabled or view_box is None:
+            offset = self.getTimeOffset()
+            data = self.ring_buffer.to_array()
+            return data[TIMESTAMP_FIELD] - offset, data[VALUE_FIELD]
+
+        view_x_min, view_x_max = view_box.viewRange()[0]
+        return self.getDataInRange(view_x_min, view_x_max, view_box.width() / self.decimation_factor)
+
+    def getDataInRange(self, x_min, x_max, bin_count):
+        """
+        Get the part of the history within an x range, read from the level of detail matching the number of samples
+        per bin. The arrays returned are new, and can be handed over to another thread.
+
+        Parameters
+        ----------
+        x_min : float
+            The start of the range, as displayed on the x-axis
+        x_max : float
+            The end of the range, as displayed on the x-axis
+        bin_count : float
+            The number of min/max bins the range will be drawn with, e.g. its width in pixels
+
+        Returns
+        -------
+        The x and y values of the curve, with the x values as displayed on the x-axis : tuple
+        """
+        self.syncLodPyramid()
+        offset = self.getTimeOffset()
+        t_min = x_min + offset
+        t_max = x_max + offset
+
+        start = self.ring_buffer.searchsorted(TIMESTAMP_FIELD, t_min)
+        stop = self.ring_buffer.searchsorted(TIMESTAMP_FIELD, t_max, side="right")
+        bin_count = max(bin_count, 1.0)
+        level_index = self.lod_pyramid.select_level((stop - start) / bin_count)
+        if level_index is not None:
+            first_index = self.lod_pyramid.first_retained(level_index, self.ring_buffer, TIMESTAMP_FIELD)
+            if first_index >= len(self.lod_pyramid.levels[level_index]):
+                level_index = None
+
+        if level_index is None:
+            # Keep one sample beyond each edge of the view, so that the line runs through the edges
+            data = self.ring_buffer.slice(start - 1, stop + 1)
+            return data[TIMESTAMP_FIELD] - offset, data[VALUE_FIELD]
+
+        level = self.lod_pyramid.levels[level_index]
+        level_start = max(level.searchsorted(T_START, t_min, side="right") - 1, first_index)
+        level_stop = level.searchsorted(T_START, t_max, side="right") + 1
+        x, y = aggregates_to_points(level.slice(level_start, level_stop))
+
+        if level_start == first_index:
+            # The aggregates reaching back before the oldest retained sample are left out, so the retained samples
+            # before the first aggregate are drawn as they are
+            head_count = self.lod_pyramid.head_samples(level_index, first_index, self.ring_buffer, TIMESTAMP_FIELD)
+            head = self.ring_buffer.slice(start - 1, head_count)
+            x = np.concatenate((head[TIMESTAMP_FIELD], x))
+            y = np.concatenate((head[VALUE_FIELD], y))
+
+        if level_stop >= len(level):
+            # Add the most recent samples, which are not part of a complete aggregate yet
+            tail = self.ring_buffer.to_array(last_n=self.lod_pyramid.pending_samples(level_index))
+            x = np.concatenate((x, tail[TIMESTAMP_FIELD]))
+            y = np.concatenate((y, tail[VALUE_FIELD]))
+        return x - offset, y
+
+    def dataBounds(self, ax, frac=1.0, orthoRange=None):
+        """
+        Get the bounds of the whole history along an axis. With decimation, only the visible part of the history is
+        handed over to pyqtgraph, so the bounds are read from the buffers instead, keeping View All and auto range
+        working over the whole history.
+
+        Parameters
+        ----------
+        ax : int
+            0 for the x-axis, 1 for the y-axis
+        frac : float
+            The fraction of the data to include, as in pyqtgraph
+        orthoRange : tuple
+            If provided, only the data within this range of the other axis is considered
+
+        Returns
+        -------
+        The minimum and maximum values along the axis : list
+        """
+        if not self.decimation_enabled or not len(self.ring_buffer) or (ax == 1 and orthoRange is not None):
+            # The points drawn include the exact extremes of the visible range
+            return super(DecimatedCurveMixin, self).dataBounds(ax, frac=frac, orthoRange=orthoRange)
+
+        if ax == 0:
+            offset = self.getTimeOffset()
+            return [self.min_x() - offset, self.max_x() - offset]
+
+        y_min, y_max = self.getValueRange()
+        if np.isnan(y_min):
+            return [None, None]
+        return [y_min, y_max]
+
+    def getPixelColumns(self, x):
+        """
+        Get the number of min/max bins the whole curve would span at the current zoom level of the view box, i.e. its
+        number of pixel columns divided by the decimation factor.
+
+        Parameters
+        ----------
+        x : numpy.ndarray
+            The x values of the curve, in ascending order
+
+        Returns
+        -------
+        The number of pixel columns, or 0 if the curve is not on a view box yet : int
+        """
+        view_box = self.getViewBox()
+        if view_box is None or len(x) < 2:
+            return 0
+
+        view_x_min, view_x_max = view_box.viewRange()[0]
+        view_x_span = view_x_max - view_x_min
+        if not view_x_span > 0:
+            return 0
+        return int(view_box.width() * (x[-1] - x[0]) / view_x_span / self.decimation_factor) + 1
+
+    def isOutsideYView(self, y):
+        """
+        Check whether all the values to draw lie on the same side of the y range of the view, so that no part of the
+        curve would be visible. While the y-axis auto-ranges, the view follows the curves, which are never outside.
+        Without decimation, pyqtgraph reads the bounds of the curve from the points drawn, which must then be kept.
+
+        Parameters
+        ----------
+        y : numpy.ndarray
+            The y values about to be drawn
+
+        Returns
+        -------
+        True if the curve would be drawn entirely above or below the view; False otherwise : bool
+        """
+        view_box = self.getViewBox()
+        if not self.decimation_enabled or view_box is None or view_box.autoRangeEnabled()[1]:
+            return False
+
+        y = y[~np.isnan(y)]
+        if not len(y):
+            return False
+        view_y_min, view_y_max = view_box.viewRange()[1]
+        return y.max() < view_y_min or y.min() > view_y_max
+
+    @Slot()
+    def redrawCurve(self):
+        """
+        Redraw the curve with the new data. If decimation is enabled, keep only the minimum and maximum points of each
+        pixel column, so that the number of vertices drawn does not depend on the buffer size or the zoom level.
+
+        A hidden curve keeps its buffers up to date, but is only handed its new points once it is shown again. A curve
+        entirely above or below the view is emptied rather than given points that would all be clipped.
+        """
+        if not self.isVisible():
+            self.needs_data_update = True
+            return
+
+        try:
+            x, y = self.getPlotData()
+            if self.isOutsideYView(y):
+                if not self.needs_data_update:
+                    self.setData(x=np.zeros(0), y=np.zeros(0))
+                    self.needs_data_update = True
+                return
+
+            if self.decimation_enabled:
+                x, y = minmax_decimate(x, y, self.getPixelColumns(x))
+            self.setData(x=x, y=y)
+            self.needs_data_update = False
+        except (ZeroDivisionError, OverflowError):
+            pass
+
+    def itemChange(self, change, value):
+        result = super(DecimatedCurveMixin, self).itemChange(change, value)
+        if change == QGraphicsItem.ItemVisibleHasChanged and self.isVisible() and self.needs_data_update:
+            # Catch up with the data received while the curve was hidden
+            self.redrawCurve()
+        return result
+
+
+class ChartingCurveItem(DecimatedCurveMixin, TimePlotCurveItem):
+    def __init__(self, channel_address=None, plot_by_timestamps=True, **kws):
+        """
+        A time plot curve keeping its data in a chunked ring buffer, along with a multi-resolution history of the
+        same data. The curve can downsample the data before handing it over to pyqtgraph.
+
+        Parameters
+        ----------
+        channel_address : str
+            The address of the PV to plot
+        plot_by_timestamps : bool
+            True to plot the x-axis with the timestamps; False to plot the x-axis as the relative time from now
+        """
+        self.decimation_enabled = True
+        # While the chart is paused, no new sample is appended
+        self.paused = False
+        # Set by the chart's sampler, which samples the curve in asynchronous mode
+        self.async_sampler = None
+        self.sampler_slot = -1
+        # PyDM assigns the data buffer while initializing the curve, so the buffers must exist beforehand
+        self.ring_buffer = ChunkedRingBuffer(2)
+        self.lod_pyramid = LodPyramid(2)
+        self.samples_appended = 0
+        super(ChartingCurveItem, self).__init__(channel_address=channel_address,
+                                                plot_by_timestamps=plot_by_timestamps, **kws)
+        self.ring_buffer.set_capacity(self.getBufferSize())
+        self.lod_pyramid.set_capacity(self.getBufferSize())
+
+    @property
+    def data_buffer(self):
+        """
+        A (2, n) copy of the accumulated timestamps and values, in the PyDM buffer layout. PyDM assigns the buffer
+        while initializing the curve, so the property must exist, but the charting tool never reads it: each access
+        copies the whole history, in O(n) time and memory. Read ring_buffer instead.
+        """
+        return self.ring_buffer.to_array()
+
+    @data_buffer.setter
+    def data_buffer(self, new_buffer):
+        """
+        Replace the samples with those of a PyDM buffer, whose last points_accumulated columns hold the samples, in
+        ascending order. The zero-filled buffer PyDM assigns on initialization holds none.
+        """
+        count = min(getattr(self, "points_accumulated", 0), np.shape(new_buffer)[1])
+        self.initialize_buffer()
+        if not count:
+            return
+
+        self.ring_buffer.extend(np.asarray(new_buffer, dtype=float)[:, -count:])
+        self.samples_appended = count
+        self.points_accumulated = len(self.ring_buffer)
+        self.data_changed.emit()
+
+    @Slot(float)
+    @Slot(int)
+    def receiveNewValue(self, new_value):
+        """
+        Append the new value to the buffer right away in synchronous mode, or hand it over to the chart's sampler in
+        asynchronous mode.
+
+        Parameters
+        ----------
+        new_value : float
+            The new value received from the PV
+        """
+        if self._update_mode == PyDMTimePlot.SynchronousMode:
+            self.appendSample(time.time(), new_value)
+        elif self._update_mode == PyDMTimePlot.AsynchronousMode:
+            self.latest_value = new_value
+            if self.async_sampler is not None:
+                self.async_sampler.set_latest_value(self.sampler_slot, new_value)
+
+    @Slot()
+    def asyncUpdate(self):
+        if self._update_mode != PyDMTimePlot.AsynchronousMode or self.async_sampler is not None:
+            # The chart's sampler appends the samples of all its curves at once
+            return
+        self.appendSample(time.time(), self.latest_value)
+
+    def appendSample(self, timestamp, value):
+        """
+        Append a sample to the ring buffer, in amortized constant time.
+
+        Parameters
+        ----------
+        timestamp : float
+            The time the sample was taken
+        value : float
+            The value of the sample, or None if the PV has not sent any value yet
+        """
+        if self.paused:
+            return
+        self.ring_buffer.append(timestamp, np.nan if value is None else value)
+        self.samples_appended += 1
+        self.points_accumulated = len(self.ring_buffer)
+        self.data_changed.emit()
+
+    def appendSamples(self, timestamps, values):
+        """
+        Append a block of samples to the ring buffer at once.
+
+        Parameters
+        ----------
+        timestamps : numpy.ndarray
+            The times the samples were taken, in ascending order
+        values : numpy.ndarray
+            The values of the samples
+        """
+        if self.paused:
+            return
+        self.ring_buffer.extend(np.vstack((timestamps, values)))
+        self.samples_appended += len(timestamps)
+        self.points_accumulated = len(self.ring_buffer)
+        self.data_changed.emit()
+
+    def initialize_buffer(self):
+        self.ring_buffer.clear()
+        self.lod_pyramid.clear()
+        self.samples_appended = 0
+        self.points_accumulated = 0
+
+    def syncLodPyramid(self):
+        """
+        Feed the samples appended since the last sync into the multi-resolution history. Only the aggregates these
+        samples complete are computed.
+        """
+        new_count = self.samples_appended - self.lod_pyramid.samples_added
+        if new_count <= 0:
+            return
+
+        data = self.ring_buffer.to_array(last_n=new_count)
+        self.lod_pyramid.extend(data[TIMESTAMP_FIELD], data[VALUE_FIELD])
+
+        # The samples that expired from the ring buffer before being fed in are skipped
+        self.lod_pyramid.samples_added = self.samples_appended
+
+    def setBufferSize(self, value):
+        """
+        Change the number of samples to retain, without copying the samples already accumulated.
+
+        Parameters
+        ----------
+        value : int
+            The new number of samples to retain
+        """
+        self._bufferSize = max(int(value), 2)
+        self.ring_buffer.set_capacity(self._bufferSize)
+        self.lod_pyramid.set_capacity(self._bufferSize)
+        self.points_accumulated = len(self.ring_buffer)
+
+
+class FedCurveItem(ChartingCurveItem):
+    """
+    A live curve without a channel, fed with blocks of samples by the ingestion engine. The address of the PV is kept,
+    so that the curve is exported like any other live curve.
+    """
+    @property
+    def address(self):
+        return self._source_address
+
+    @address.setter
+    def address(self, new_address):
+        self._source_address = new_address
+        self.channel = None
+
+    @Slot(float)
+    @Slot(int)
+    def receiveNewValue(self, new_value):
+        pass
+
+    @Slot()
+    def asyncUpdate(self):
+        # The samples are taken by the ingestion workers
+        pass
+
+
+class FrozenCurveItem(DecimatedCurveMixin, BasePlotCurveItem):
+    def __init__(self, timestamps, values, lod_pyramid, source_address=None, plot_by_timestamps=True, **kws):
+        """
+        A curve displaying recorded data that no longer changes, e.g. the history reloaded from a snapshot. The
+        curve has no channel, and reads its data, which may be memory-mapped, only as far as the view requires.
+
+        Parameters
+        ----------
+        timestamps : numpy.ndarray
+            The timestamps of the samples, in ascending order
+        values : numpy.ndarray
+            The values of the samples
+        lod_pyramid : LodPyramid
+            The multi-resolution history of the samples
+        source_address : str
+            The address of the PV the data was recorded from
+        plot_by_timestamps : bool
+            True to plot the x-axis with the timestamps; False to plot the x-axis as the relative time from the last
+            sample
+        """
+        self.decimation_enabled = True
+        self.ring_buffer = ArraySeries((timestamps, values))
+        self.lod_pyramid = lod_pyramid
+        self.source_address = source_address
+        self.plot_by_timestamps = plot_by_timestamps
+        self.channel = None
+        self.points_accumulated = len(self.ring_buffer)
+        super(FrozenCurveItem, self).__init__(**kws)
+
+    @property
+    def address(self):
+        return self.source_address
+
+    def channels(self):
+        return []
+
+    def getBufferSize(self):
+        return len(self.ring_buffer)
+
+    # The chart applies its buffer and sampling settings to all its curves, which do not concern the recorded data
+    def setBufferSize(self, value):
+        pass
+
+    def resetBufferSize(self):
+        pass
+
+    def setUpdatesAsynchronously(self, value):
+        pass
+
+    def initialize_buffer(self):
+        pass
+
+    def getTimeOffset(self):
+        """
+        Get the offset between the timestamps and the x values displayed. In relative time, the last recorded sample
+        is shown at 0, so that the recording lines up with the live curves.
+        """
+        return 0.0 if self.plot_by_timestamps else self.max_x()
+
+
+class ArchiveCurveItem(FrozenCurveItem):
+    def __init__(self, address, data_source, plot_by_timestamps=True, **kws):
+        """
+        A curve displaying the archived data of a PV. The data within the current x range is read from the archive
+        data source on each redraw, which fetches the missing parts in the background.
+
+        Parameters
+        ----------
+        address : str
+            The address of the PV, including the archive:// protocol
+        data_source : ArchiveDataSource
+            The data source fetching and caching the archived data
+        plot_by_timestamps : bool
+            True to plot the x-axis with the timestamps; False to plot the x-axis as the relative time from now
+        """
+        super(ArchiveCurveItem, self).__init__(np.zeros(0), np.zeros(0), LodPyramid(2), source_address=address,
+                                               plot_by_timestamps=plot_by_timestamps, **kws)
+        self.data_source = data_source
+        self.pv_name = address[len(ARCHIVE_PROTOCOL):] if address.startswith(ARCHIVE_PROTOCOL) else address
+
+    def getTimeOffset(self):
+        return 0.0 if self.plot_by_timestamps else time.time()
+
+    def getPlotData(self):
+        """
+        Get the archived data within the current x range, at the resolution matching the width of the view. The
+        data is kept as the curve's buffer, so that the bounds, the latest value, and the exports work as for the
+        other curves.
+
+        Returns
+        -------
+        The x and y values of the curve : tuple
+        """
+        view_box = self.getViewBox()
+        if view_box is None:
+            return np.zeros(0), np.zeros(0)
+
+        view_x_min, view_x_max = view_box.viewRange()[0]
+        offset = self.getTimeOffset()
+        timestamps, values = self._getArchivedData(view_x_min + offset, view_x_max + offset, view_box.width())
+
+        self.ring_buffer = ArraySeries((timestamps, values))
+        self.points_accumulated = len(timestamps)
+        return timestamps - offset, values
+
+    def getDataInRange(self, x_min, x_max, bin_count):
+        """
+        Get the archived data within an x range, at the resolution matching the number of bins, as far as it has
+        been fetched. The curve's buffer is left as is.
+        """
+        offset = self.getTimeOffset()
+        timestamps, values = self._getArchivedData(x_min + offset, x_max + offset, bin_count)
+        return timestamps - offset, values
+
+    def _getArchivedData(self, t_min, t_max, bin_count):
+        return self.data_source.get_data(self.pv_name, t_min, t_max, max(int(bin_count), 1))
+
+
+class LinkedCurveItem(DecimatedCurveMixin, BasePlotCurveItem):
+    def __init__(self, source_curve, **kws):
+        """
+        Another view of a curve, shown on another chart. The view has no channel and no buffer of its own: it draws
+        from the ring buffer and the multi-resolution history of its source curve, which keeps receiving the data, so
+        that showing a PV on several charts takes no more connections or memory than showing it once.
+
+        Parameters
+        ----------
+        source_curve : BasePlotCurveItem
+            The live, frozen or archive curve holding the data
+        """
+        self.decimation_enabled = True
+        self.source_curve = source_curve
+        self.channel = None
+        super(LinkedCurveItem, self).__init__(**kws)
+
+    @property
+    def ring_buffer(self):
+        return self.source_curve.ring_buffer
+
+    @property
+    def lod_pyramid(self):
+        return self.source_curve.lod_pyramid
+
+    @property
+    def address(self):
+        return self.source_curve.address
+
+    def channels(self):
+        return []
+
+    def syncLodPyramid(self):
+        self.source_curve.syncLodPyramid()
+
+    # The buffers belong to the source curve
+    def getBufferMemory(self):
+        return 0
+
+    def getMaxBufferMemory(self):
+        return 0
+
+    def getBufferSize(self):
+        return self.source_curve.getBufferSize()
+
+    def getTimeOffset(self):
+        return self.source_curve.getTimeOffset()
+
+    def getDataInRange(self, x_min, x_max, bin_count):
+        # The archive curves read the data from their data source rather than from their buffer
+        return self.source_curve.getDataInRange(x_min, x_max, bin_count)
+
+    # The chart applies its buffer and sampling settings to all its curves, which only the source curve follows
+    def setBufferSize(self, value):
+        pass
+
+    def resetBufferSize(self):
+        pass
+
+    def setUpdatesAsynchronously(self, value):
+        pass
+
+    def initialize_buffer(self):
+        pass
+
+
+class ChartingTimePlot(PyDMTimePlot):
+    def __init__(self, parent=None, init_y_channels=[], plot_by_timestamps=True, plot_display=None):
+        """
+        A PyDMTimePlot creating ChartingCurveItem curves, and holding the rendering options shared by these curves.
+
+        Parameters
+        ----------
+        parent : QWidget
+            The parent widget of the chart
+        init_y_channels : list
+            The PVs to plot initially
+        plot_by_timestamps : bool
+            True to plot the x-axis with the timestamps; False to plot the x-axis as the relative time from now
+        plot_display : PyDMChartingDisplay
+            The display receiving the curve data updates
+        """
+        super(ChartingTimePlot, self).__init__(parent=parent, init_y_channels=init_y_channels,
+                                               plot_by_timestamps=plot_by_timestamps, plot_display=plot_display)
+        self._decimation_enabled = True
+        self._decimation_factor = 1
+        self._archive_data_source = None
+        self._redraw_suspended = False
+
+        # The clock is drawn over the plot, so that the bottom axis label only holds the label set by the user
+        self.clock_item = ClockItem(self.plotItem)
+        self.clock_item.setColor(self.getAxisColor())
+
+        # The objects timing the frames, e.g. the performance monitor. The frames are only timed while there is any
+        self.frame_listeners = list()
+        self.performance_overlay = PerformanceOverlayItem(self.plotItem)
+        self.performance_overlay.setColor(self.getAxisColor())
+
+        # A new zoom level changes the pixel columns the decimated curves are binned into, and a new y range may bring
+        # back the curves that were out of the view
+        self.getViewBox().sigXRangeChanged.connect(self.set_needs_redraw)
+        self.getViewBox().sigYRangeChanged.connect(self.set_needs_redraw)
+
+        # The sampler replaces the update timer, which would call every curve on every sampling tick
+        self.async_sampler = AsyncSampler(self, sampling_period=super(ChartingTimePlot, self).getUpdateInterval())
+        self.async_sampler.set_enabled(self.getUpdatesAsynchronously())
+        self.update_timer.stop()
+
+    def addYChannel(self, y_channel=None, name=None, color=None, lineStyle=None, lineWidth=None, symbol=None,
+                    symbolSize=None):
+        """
+        Add a new curve to the chart. This mirrors PyDMTimePlot.addYChannel, except that the new curve is a
+        ChartingCurveItem.
+
+        Returns
+        -------
+        The new curve : ChartingCurveItem
+        """
+        curve = self._addLiveCurve(ChartingCurveItem, y_channel, name=name, color=color, lineStyle=lineStyle,
+                                   lineWidth=lineWidth, symbol=symbol, symbolSize=symbolSize)
+        self.async_sampler.add_curve(curve)
+        return curve
+
+    def addFedCurve(self, address, name=None, color=None, lineStyle=None, lineWidth=None, symbol=None,
+                    symbolSize=None):
+        """
+        Add a live curve fed by the ingestion engine rather than by a channel.
+
+        Returns
+        -------
+        The new curve : FedCurveItem
+        """
+        return self._addLiveCurve(FedCurveItem, address, name=name, color=color, lineStyle=lineStyle,
+                                  lineWidth=lineWidth, symbol=symbol, symbolSize=symbolSize)
+
+    def _addLiveCurve(self, curve_class, address, name=None, color=None, lineStyle=None, lineWidth=None, symbol=None,
+                      symbolSize=None):
+        plot_opts = self._getPlotOpts(lineStyle=lineStyle, lineWidth=lineWidth, symbol=symbol, symbolSize=symbolSize)
+        curve = curve_class(address, plot_by_timestamps=self._plot_by_timestamps, name=name, color=color,
+                            **plot_opts)
+        curve.decimation_enabled = self._decimation_enabled
+        curve.decimation_factor = self._decimation_factor
+        curve.paused = self.isPaused()
+        curve.setUpdatesAsynchronously(self.getUpdatesAsynchronously())
+        curve.setBufferSize(self.getBufferSize())
+
+        self.update_timer.timeout.connect(curve.asyncUpdate)
+        self.addCurve(curve, curve_color=color)
+
+        curve.data_changed.connect(self.set_needs_redraw)
+        self.redraw_timer.start()
+        return curve
+
+    @staticmethod
+    def _getPlotOpts(lineStyle=None, lineWidth=None, symbol=None, symbolSize=None):
+        """
+        Get the appearance options to create a curve with, leaving out those not given, so that the curve keeps its
+        defaults for them.
+
+        Returns
+        -------
+        The keyword arguments of the curve : dict
+        """
+        plot_opts = dict()
+        plot_opts["symbol"] = symbol
+        if symbolSize is not None:
+            plot_opts["symbolSize"] = symbolSize
+        if lineStyle is not None:
+            plot_opts["lineStyle"] = lineStyle
+        if lineWidth is not None:
+            plot_opts["lineWidth"] = lineWidth
+        return plot_opts
+
+    def addFrozenCurve(self, timestamps, values, lod_pyramid, source_address=None, name=None, color=None,
+                       lineStyle=None, lineWidth=None, symbol=None, symbolSize=None):
+        """
+        Add a curve displaying recorded data to the chart. The curve has no channel, and is only redrawn when the
+        view changes.
+
+        Returns
+        -------
+        The new curve : FrozenCurveItem
+        """
+        plot_opts = self._getPlotOpts(lineStyle=lineStyle, lineWidth=lineWidth, symbol=symbol, symbolSize=symbolSize)
+        curve = FrozenCurveItem(timestamps, values, lod_pyramid, source_address=source_address,
+                                plot_by_timestamps=self._plot_by_timestamps, name=name, color=color, **plot_opts)
+        curve.decimation_enabled = self._decimation_enabled
+        curve.decimation_factor = self._decimation_factor
+        self.addCurve(curve, curve_color=color)
+
+        self.redraw_timer.start()
+        self.set_needs_redraw()
+        return curve
+
+    def addArchiveCurve(self, address, name=None, color=None, lineStyle=None, lineWidth=None, symbol=None,
+                        symbolSize=None):
+        """
+        Add a curve displaying the archived data of a PV. The archived data is fetched again whenever the view
+        moves onto a time range that has not been fetched yet.
+
+        Returns
+        -------
+        The new curve : ArchiveCurveItem
+        """
+        plot_opts = self._getPlotOpts(lineStyle=lineStyle, lineWidth=lineWidth, symbol=symbol, symbolSize=symbolSize)
+        curve = ArchiveCurveItem(address, self.getArchiveDataSource(), plot_by_timestamps=self._plot_by_timestamps,
+                                 name=name, color=color, **plot_opts)
+        curve.decimation_enabled = self._decimation_enabled
+        curve.decimation_factor = self._decimation_factor
+        self.addCurve(curve, curve_color=color)
+
+        self.redraw_timer.start()
+        self.set_needs_redraw()
+        return curve
+
+    def addLinkedCurve(self, source_curve, name=None):
+        """
+        Add another view of a curve shown on another chart. The view takes the appearance of the source curve, and
+        is redrawn whenever the source curve receives new data.
+
+        Parameters
+        ----------
+        source_curve : BasePlotCurveItem
+            The curve holding the data
+        name : str
+            The name of the view, by default the name of the source curve
+
+        Returns
+        -------
+        The new curve : LinkedCurveItem
+        """
+        curve = LinkedCurveItem(source_curve, name=source_curve.name() if name is None else name,
+                                color=source_curve.color, lineStyle=source_curve.lineStyle,
+                                lineWidth=source_curve.lineWidth, symbol=source_curve.symbol,
+                                symbolSize=source_curve.symbolSize)
+        curve.decimation_enabled = self._decimation_enabled
+        curve.decimation_factor = self._decimation_factor
+        self.addCurve(curve, curve_color=source_curve.color)
+
+        source_curve.data_changed.connect(self.set_needs_redraw)
+        data_source = getattr(source_curve, "data_source", None)
+        if data_source is not None:
+            # The archived data fetched for the source curve is drawn by the view too
+            data_source.data_ready.connect(self.handleArchiveDataReady, Qt.UniqueConnection)
+
+        self.redraw_timer.start()
+        self.set_needs_redraw()
+        return curve
+
+    def removeLinkedCurve(self, curve):
+        """
+        Remove a view added by addLinkedCurve. The source curve and its data are left as they are.
+        """
+        curve.source_curve.data_changed.disconnect(self.set_needs_redraw)
+        self.removeCurve(curve)
+
+    def getArchiveDataSource(self):
+        """
+        Get the data source shared by the archive curves of this chart, creating it on first use.
+        """
+        if self._archive_data_source is None:
+            self._archive_data_source = ArchiveDataSource()
+            self._archive_data_source.data_ready.connect(self.handleArchiveDataReady)
+        return self._archive_data_source
+
+    @Slot(str)
+    def handleArchiveDataReady(self, pv_name):
+        self.set_needs_redraw()
+
+    def removeYChannel(self, curve):
+        if isinstance(curve, LinkedCurveItem):
+            self.removeLinkedCurve(curve)
+            return
+        self.async_sampler.remove_curve(curve)
+        if isinstance(curve, FrozenCurveItem):
+            # Frozen curves are not driven by the update timer
+            self.removeCurve(curve)
+            return
+        super(ChartingTimePlot, self).removeYChannel(curve)
+
+    def refreshCurve(self, curve):
+        if isinstance(curve, (FrozenCurveItem, LinkedCurveItem)):
+            # The appearance setters of the curve already apply the new style, and there is no channel to reconnect
+            curve.redrawCurve()
+            return
+        super(ChartingTimePlot, self).refreshCurve(curve)
+
+    def findCurve(self, pv_name):
+        """
+        Find a curve by its name, so that a frozen curve and a live curve of the same PV are told apart.
+        """
+        for curve in self._curves:
+            if curve.name() == pv_name:
+                return curve
+        return super(ChartingTimePlot, self).findCurve(pv_name)
+
+    def channels(self):
+        # Frozen curves have no channel to connect
+        return [curve.channel for curve in self._curves if getattr(curve, "channel", None) is not None]
+
+    def setUpdatesAsynchronously(self, value):
+        super(ChartingTimePlot, self).setUpdatesAsynchronously(value)
+        self.update_timer.stop()
+        self.async_sampler.set_enabled(value)
+
+    def getUpdateInterval(self):
+        # The update timer only holds whole milliseconds, which cannot represent the periods above 1 kHz
+        return self.async_sampler.sampling_period
+
+    def setUpdateInterval(self, value):
+        """
+        Change the sampling period of the asynchronous mode. PyDMTimePlot rounds the period down to whole
+        milliseconds, which turns the periods above 1 kHz into 0, so the period is kept by the sampler instead, and
+        the base class only gets the rounded period for its timer, which stays stopped.
+
+        Parameters
+        ----------
+        value : float
+            The time between two samples, in seconds
+        """
+        value = abs(float(value))
+        if value == self.async_sampler.sampling_period:
+            return
+
+        self._update_interval = max(int(value * 1000.0), 1)
+        self.update_timer.setInterval(self._update_interval)
+        self.update_timer.stop()
+        self.async_sampler.set_sampling_period(value)
+        if self.getUpdatesAsynchronously():
+            self.setBufferSize(self._getAsyncBufferSize())
+
+    def resetUpdateInterval(self):
+        self.setUpdateInterval(DEFAULT_UPDATE_INTERVAL / 1000.0)
+
+    def setTimeSpan(self, value):
+        """
+        Set the extent of the x-axis of the chart. In asynchronous mode, the buffer is resized to hold the samples of
+        the new time span.
+
+        Parameters
+        ----------
+        value : float
+            The time span, in seconds
+        """
+        value = float(value)
+        if self._time_span != value:
+            self._time_span = value
+            if self.getUpdatesAsynchronously():
+                self.setBufferSize(self._getAsyncBufferSize())
+            self.updateXAxis(update_immediately=True)
+
+    def resetTimeSpan(self):
+        self.setTimeSpan(DEFAULT_TIME_SPAN)
+
+    def _getAsyncBufferSize(self):
+        # The sampling period may be shorter than a millisecond, so the base class' integer period cannot be used
+        return int(self._time_span / self.async_sampler.sampling_period)
+
+    def pausePlotting(self):
+        """
+        Pause the plotting if it is running, or resume it. While paused, the asynchronous sampling is stopped, and the
+        live curves drop the samples they receive instead of buffering them, in both sampling modes.
+
+        Returns
+        -------
+        True if the plotting is running after the call; False if it is paused : bool
+        """
+        is_running = self.async_sampler.toggle_paused()
+        for curve in self._curves:
+            if isinstance(curve, ChartingCurveItem):
+                curve.paused = not is_running
+        return is_running
+
+    def isPaused(self):
+        return self.async_sampler.paused
+
+    def setRedrawSuspended(self, suspended):
+        """
+        Stop redrawing the chart, e.g. while its window is minimized, or start again. The curves keep buffering their
+        data, and the chart is redrawn once as soon as the redraws resume.
+
+        Parameters
+        ----------
+        suspended : bool
+            True to skip all the redraws; False to redraw as usual
+        """
+        self._redraw_suspended = suspended
+        if not suspended:
+            self.set_needs_redraw()
+
+    def isRedrawSuspended(self):
+        return self._redraw_suspended
+
+    def setAxisColor(self, color):
+        super(ChartingTimePlot, self).setAxisColor(color)
+        self.clock_item.setColor(color)
+        self.performance_overlay.setColor(color)
+
+    def addFrameListener(self, listener):
+        """
+        Time the frames of the chart for a listener from now on.
+
+        Parameters
+        ----------
+        listener : object
+            An object providing the record_redraw and record_paint methods, called with the time spent preparing the
+            curve data of each redraw, and painting each frame, in seconds
+        """
+        if listener not in self.frame_listeners:
+            self.frame_listeners.append(listener)
+
+    def removeFrameListener(self, listener):
+        if listener in self.frame_listeners:
+            self.frame_listeners.remove(listener)
+
+    @Slot()
+    def redrawPlot(self):
+        """
+        Redraw the chart, timing the redraw if any frame listener is set. The ticks of the redraw timer that find
+        nothing to redraw are not counted.
+        """
+        if self._redraw_suspended:
+            # The pending redraw is kept for when the redraws resume
+            return
+        if not self.frame_listeners or not self._needs_redraw:
+            super(ChartingTimePlot, self).redrawPlot()
+            return
+
+        start = default_timer()
+        super(ChartingTimePlot, self).redrawPlot()
+        duration = default_timer() - start
+        for listener in self.frame_listeners:
+            listener.record_redraw(duration)
+
+    def paintEvent(self, event):
+        if not self.frame_listeners:
+            super(ChartingTimePlot, self).paintEvent(event)
+            return
+
+        start = default_timer()
+        super(ChartingTimePlot, self).paintEvent(event)
+        duration = default_timer() - start
+        for listener in self.frame_listeners:
+            listener.record_paint(duration)
+
+    def getDecimationEnabled(self):
+        return self._decimation_enabled
+
+    def setDecimationEnabled(self, enabled):
+        """
+        Turn the min/max decimation of all the curves on or off.
+
+        Parameters
+        ----------
+        enabled : bool
+            True to draw only the minimum and maximum points of each pixel column; False to draw every point
+        """
+        self._decimation_enabled = enabled
+        for curve in self._curves:
+            curve.decimation_enabled = enabled
+        self.set_needs_redraw()
+
+    def getDecimationFactor(self):
+        return self._decimation_factor
+
+    def setDecimationFactor(self, factor):
+        """
+        Change how coarse the min/max decimation of all the curves is.
+
+        Parameters
+        ----------
+        factor : int
+            The number of pixel columns each min/max bin spans, 1 being the full resolution
+        """
+        self._decimation_factor = max(int(factor), 1)
+        for curve in self._curves:
+            curve.decimation_factor = self._decimation_factor
+        self.set_needs_redraw()
@@ -0,0 +1,49 @@
+# The Clock Overlay Shown on the Chart
+import time
+
+from qtpy.QtGui import QBrush
+from qtpy.QtWidgets import QGraphicsItem, QGraphicsSimpleTextItem
+
+CLOCK_TEXT_FORMAT = "Current Time: %H:%M:%S (%b %d, %Y)"
+
+# The distance between the clock and the corner of the plot, in pixels
+CLOCK_MARGIN = 5
+
+
+class ClockItem(QGraphicsSimpleTextItem):
+    def __init__(self, plot_item, text_format=CLOCK_TEXT_FORMAT):
+        """
+        A text item showing the current time in the top-left corner of a plot. Changing the text only repaints the
+        region of this item, instead of laying out an axis again and repainting the whole plot.
+
+        Parameters
+        ----------
+        plot_item : PlotItem
+            The plot to show the clock on
+        text_format : str
+            The time.strftime format of the clock text
+        """
+        super(ClockItem, self).__init__(plot_item)
+        self.plot_item = plot_item
+        self.text_format = text_format
+
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+        self.plot_item.geometryChanged.connect(self.updatePosition)
+
+        self.refresh()
+        self.updatePosition()
+
+    def refresh(self):
+        """
+        Show the current time. The item is only repainted if the text has changed.
+        """
+        text = time.strftime(self.text_format)
+        if text != self.text():
+            self.setText(text)
+
+    def setColor(self, color):
+        self.setBrush(QBrush(color))
+
+    def updatePosition(self):
+        plot_rect = self.plot_item.boundingRect()
+        self.setPos(plot_rect.left() + CLOCK_MARGIN, plot_rect.top() + CLOCK_MARGIN)
@@ -0,0 +1,137 @@
+# The Delegate Painting the Action Buttons of the Curve List
+from qtpy.QtCore import Qt, QEvent, QRect, QSize, Signal
+from qtpy.QtWidgets import QApplication, QStyle, QStyledItemDelegate, QStyleOptionButton
+
+from displays.curve_list_model import PV_NAME_ROLE, ENABLED_ROLE
+
+MODIFY_ACTION = "modify"
+FOCUS_ACTION = "focus"
+ANNOTATE_ACTION = "annotate"
+REMOVE_ACTION = "remove"
+
+# The action names and button texts, in the order of the buttons
+ACTIONS = (
+    (MODIFY_ACTION, "Modify..."),
+    (FOCUS_ACTION, "Focus"),
+    (ANNOTATE_ACTION, "Annotate..."),
+    (REMOVE_ACTION, "Remove"),
+)
+
+# The actions available for the inactive curves
+ALWAYS_ENABLED_ACTIONS = (REMOVE_ACTION,)
+
+BUTTON_SPACING = 2
+BUTTON_TEXT_PADDING = 12
+
+
+class CurveActionsDelegate(QStyledItemDelegate):
+    # Emitted with the action name and the PV name when a button is clicked
+    action_triggered = Signal(str, str)
+
+    def __init__(self, parent=None):
+        """
+        Paint a row of push buttons in a cell of the curve list, and report the clicks on them. The buttons are only
+        painted, not created as widgets, so that a row costs no widget at all, whether it is on the screen or not.
+
+        Parameters
+        ----------
+        parent : QAbstractItemView
+            The view the delegate paints for
+        """
+        super(CurveActionsDelegate, self).__init__(parent)
+        # The PV name and the action of the button being pressed
+        self.pressed_button = None
+
+    def getButtonRects(self, rect):
+        """
+        Split a cell into the rectangles of the buttons, all of the same width.
+
+        Parameters
+        ----------
+        rect : QRect
+            The rectangle of the cell
+
+        Returns
+        -------
+        The rectangle of each button, in the order of ACTIONS : list
+        """
+        button_width = max((rect.width() - BUTTON_SPACING * (len(ACTIONS) + 1)) // len(ACTIONS), 1)
+        return [QRect(rect.left() + BUTTON_SPACING + i * (button_width + BUTTON_SPACING), rect.top() + 1,
+                      button_width, rect.height() - 2) for i in range(len(ACTIONS))]
+
+    def getActionAt(self, rect, position):
+        for (action, _), button_rect in zip(ACTIONS, self.getButtonRects(rect)):
+            if button_rect.contains(position):
+                return action
+        return None
+
+    def paint(self, painter, option, index):
+        widget = option.widget
+        style = widget.style() if widget else QApplication.style()
+        pv_name = index.data(PV_NAME_ROLE)
+        is_enabled = index.data(ENABLED_ROLE)
+
+        for (action, text), button_rect in zip(ACTIONS, self.getButtonRects(option.rect)):
+            button = QStyleOptionButton()
+            button.rect = button_rect
+            button.text = text
+            button.palette = option.palette
+            if is_enabled or action in ALWAYS_ENABLED_ACTIONS:
+                button.state = QStyle.State_Enabled
+            else:
+                button.state = QStyle.State_None
+            if self.pressed_button == (pv_name, action):
+                button.state |= QStyle.State_Sunken
+            style.drawControl(QStyle.CE_PushButton, button, painter, widget)
+
+    def sizeHint(self, option, index):
+        return self.getButtonsSize(option.fontMetrics)
+
+    @staticmethod
+    def getButtonsSize(font_metrics):
+        """
+        Get the size of the row of buttons, wide enough for the longest button text.
+
+        Parameters
+        ----------
+        font_metrics : QFontMetrics
+            The metrics of the font of the view
+
+        Returns
+        -------
+        The size of the cell holding the buttons : QSize
+        """
+        button_width = max(font_metrics.width(text) for _, text in ACTIONS) + BUTTON_TEXT_PADDING
+        return QSize(len(ACTIONS) * (button_width + BUTTON_SPACING) + BUTTON_SPACING,
+                     font_metrics.height() + BUTTON_TEXT_PADDING)
+
+    def editorEvent(self, event, model, option, index):
+        """
+        Press a button on a mouse press, and trigger its action when the mouse is released over the same button.
+        """
+        if event.type() not in (QEvent.MouseButtonPress, QEvent.MouseButtonRelease) or \
+                event.button() != Qt.LeftButton:
+            return False
+
+        pv_name = index.data(PV_NAME_ROLE)
+        action = self.getActionAt(option.rect, event.pos())
+        if action is not None and not index.data(ENABLED_ROLE) and action not in ALWAYS_ENABLED_ACTIONS:
+            action = None
+
+        if event.type() == QEvent.MouseButtonPress:
+            self.pressed_button = (pv_name, action) if action else None
+            self.updateCell(option)
+            return action is not None
+
+        pressed_button = self.pressed_button
+        self.pressed_button = None
+        self.updateCell(option)
+        if action is None or pressed_button != (pv_name, action):
+            return False
+
+        self.action_triggered.emit(action, pv_name)
+        return True
+
+    def updateCell(self, option):
+        if option.widget:
+            option.widget.viewport().update(option.rect)
@@ -0,0 +1,89 @@
+# The Cache of the Pens and Brushes Shared by the Curves
+from qtpy.QtCore import Qt
+from qtpy.QtGui import QBrush, QColor, QPen
+
+# The width of the pen outlining the symbols, as PyDM draws them
+SYMBOL_PEN_WIDTH = 1
+
+
+class StyleCache:
+    def __init__(self):
+        """
+        Intern the pens and brushes of the curves by their color, width and style, so that restyling a curve reuses
+        the objects already built for any other curve of the same style instead of building new ones.
+        """
+        self.pens = dict()
+        self.brushes = dict()
+
+    def get_pen(self, color, width, style):
+        """
+        Get the pen of a style, building it on first use. The pen is shared, and must not be modified.
+
+        Parameters
+        ----------
+        color : QColor
+            The color of the pen
+        width : int
+            The width of the pen, in pixels
+        style : Qt.PenStyle
+            The line style of the pen
+
+        Returns
+        -------
+        The pen : QPen
+        """
+        key = (color.rgba(), int(width), int(style))
+        pen = self.pens.get(key)
+        if pen is None:
+            pen = QPen(QColor(color))
+            pen.setWidth(int(width))
+            pen.setStyle(style)
+            self.pens[key] = pen
+        return pen
+
+    def get_brush(self, color):
+        """
+        Get the solid brush of a color, building it on first use. The brush is shared, and must not be modified.
+        """
+        key = color.rgba()
+        brush = self.brushes.get(key)
+        if brush is None:
+            brush = QBrush(QColor(color))
+            self.brushes[key] = brush
+        return brush
+
+    def restyle(self, curve, **changes):
+        """
+        Change the appearance of a curve in place, with the cached pens and brushes. Only the settings that differ
+        are set, and the channel of the curve is left connected.
+
+        Parameters
+        ----------
+        curve : BasePlotCurveItem
+            The curve to restyle
+        changes : dict
+            The new values of any of color, line_width, line_style, symbol and symbol_size. The other settings keep
+            their current values
+        """
+        color = QColor(changes.get("color", curve.color))
+        line_width = changes.get("line_width", curve.lineWidth)
+        line_style = changes.get("line_style", curve.lineStyle)
+        symbol = changes.get("symbol", curve.symbol)
+        symbol_size = changes.get("symbol_size", curve.symbolSize)
+
+        # The property setters keep the pen the curve reads its style back from in step with the changes
+        if color != curve.color:
+            curve.color = color
+        if line_width != curve.lineWidth:
+            curve.lineWidth = line_width
+        if line_style != curve.lineStyle:
+            curve.lineStyle = line_style
+        if symbol != curve.symbol:
+            curve.symbol = symbol
+        if symbol_size != curve.symbolSize:
+            curve.symbolSize = symbol_size
+
+        # The curve is then drawn with the cached pens and brushes, whose data its copies share
+        curve.setPen(self.get_pen(color, line_width, line_style))
+        curve.setSymbolPen(self.get_pen(color, SYMBOL_PEN_WIDTH, Qt.SolidLine))
+        curve.setSymbolBrush(self.get_brush(color))
@@ -0,0 +1,38 @@
+# The Performance Overlay Shown on the Chart
+from qtpy.QtGui import QBrush
+from qtpy.QtWidgets import QGraphicsItem, QGraphicsSimpleTextItem
+
+# The distance between the overlay and the corner of the plot, in pixels
+OVERLAY_MARGIN = 5
+
+
+class PerformanceOverlayItem(QGraphicsSimpleTextItem):
+    def __init__(self, plot_item):
+        """
+        A text item showing the performance metrics in the top-right corner of a plot. Like the clock, only the region
+        of this item is repainted when its text changes.
+
+        Parameters
+        ----------
+        plot_item : PlotItem
+            The plot to show the metrics on
+        """
+        super(PerformanceOverlayItem, self).__init__(plot_item)
+        self.plot_item = plot_item
+
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+        self.setZValue(1)
+        self.plot_item.geometryChanged.connect(self.updatePosition)
+        self.hide()
+
+    def setMetricsText(self, text):
+        if text != self.text():
+            self.setText(text)
+            self.updatePosition()
+
+    def setColor(self, color):
+        self.setBrush(QBrush(color))
+
+    def updatePosition(self):
+        plot_rect = self.plot_item.boundingRect()
+        self.setPos(plot_rect.right() - self.boundingRect().width() - OVERLAY_MARGIN, plot_rect.top() + OVERLAY_MARGIN)
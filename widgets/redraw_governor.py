@@ -0,0 +1,144 @@
+from qtpy.QtCore import QObject, QTimer, Signal
+
+# The fraction of the GUI thread time the frames may take, leaving the rest for the data and the user input
+DEFAULT_FRAME_BUDGET = 0.5
+
+DEFAULT_EVALUATION_INTERVAL_MS = 500
+
+MIN_ADAPTIVE_REDRAW_RATE_HZ = 1
+MAX_DECIMATION_FACTOR = 8
+
+# The weight of the latest measurement in the smoothed frame cost
+FRAME_COST_SMOOTHING = 0.3
+
+# The rate is only raised when the budget allows a rate this much higher, and then by at most this step, so that the
+# rate does not oscillate around the limit
+RECOVERY_MARGIN = 1.2
+RECOVERY_STEP = 1.25
+
+
+class RedrawGovernor(QObject):
+    # Emitted with the effective redraw rate and decimation factor whenever either changes
+    effective_settings_changed = Signal(int, int)
+
+    def __init__(self, chart, requested_rate_hz, frame_budget=DEFAULT_FRAME_BUDGET,
+                 evaluation_interval_ms=DEFAULT_EVALUATION_INTERVAL_MS):
+        """
+        Adapt the redraw rate of a chart to the measured cost of its frames. In adaptive mode, the governor lowers the
+        redraw rate when the frames would take more than the budget of the GUI thread time, coarsens the decimation
+        once the rate is at its minimum, and recovers step by step when the load drops. Otherwise, the chart redraws
+        at the requested rate.
+
+        Parameters
+        ----------
+        chart : ChartingTimePlot
+            The chart to govern
+        requested_rate_hz : int
+            The redraw rate set by the user, which the effective rate never exceeds
+        frame_budget : float
+            The fraction of the GUI thread time the frames may take
+        evaluation_interval_ms : int
+            How often the rate is adapted, in milliseconds
+        """
+        super(RedrawGovernor, self).__init__(parent=chart)
+        self.chart = chart
+        self.requested_rate_hz = requested_rate_hz
+        self.effective_rate_hz = float(requested_rate_hz)
+        self.decimation_factor = 1
+        self.frame_budget = frame_budget
+        self.enabled = False
+
+        self.frame_cost_s = None
+        self._frame_time_s = 0.0
+        self._frame_count = 0
+
+        self.evaluation_timer = QTimer(self)
+        self.evaluation_timer.setInterval(evaluation_interval_ms)
+        self.evaluation_timer.timeout.connect(self.evaluate)
+
+    def set_enabled(self, enabled):
+        """
+        Turn the adaptive mode on or off. Turning it off restores the requested rate and the full decimation
+        resolution.
+        """
+        self.enabled = enabled
+        self.frame_cost_s = None
+        self._reset_window()
+
+        if enabled:
+            self.chart.addFrameListener(self)
+            self.evaluation_timer.start()
+        else:
+            self.chart.removeFrameListener(self)
+            self.evaluation_timer.stop()
+            self._apply(self.requested_rate_hz, 1)
+
+    def set_requested_rate(self, requested_rate_hz):
+        self.requested_rate_hz = requested_rate_hz
+        if self.enabled:
+            self._apply(min(self.effective_rate_hz, requested_rate_hz), self.decimation_factor)
+        else:
+            self._apply(requested_rate_hz, 1)
+
+    def set_frame_budget(self, frame_budget):
+        self.frame_budget = frame_budget
+
+    def record_redraw(self, duration):
+        self._frame_time_s += duration
+        self._frame_count += 1
+
+    def record_paint(self, duration):
+        # The paint follows the redraw that scheduled it, so its time is counted in the same frame
+        self._frame_time_s += duration
+
+    def evaluate(self):
+        """
+        Compare the rate the budget allows at the measured frame cost with the effective rate, and lower or raise the
+        effective rate, or the decimation factor, accordingly.
+        """
+        if not self._frame_count:
+            # Nothing was redrawn, so there is nothing to measure
+            self._reset_window()
+            return
+
+        frame_cost_s = self._frame_time_s / self._frame_count
+        if self.frame_cost_s is None:
+            self.frame_cost_s = frame_cost_s
+        else:
+            self.frame_cost_s += FRAME_COST_SMOOTHING * (frame_cost_s - self.frame_cost_s)
+        self._reset_window()
+
+        allowed_rate_hz = self.frame_budget / max(self.frame_cost_s, 1e-6)
+        rate_hz = self.effective_rate_hz
+        decimation_factor = self.decimation_factor
+
+        if allowed_rate_hz < rate_hz:
+            if rate_hz > MIN_ADAPTIVE_REDRAW_RATE_HZ:
+                rate_hz = max(allowed_rate_hz, MIN_ADAPTIVE_REDRAW_RATE_HZ)
+            else:
+                decimation_factor = min(decimation_factor * 2, MAX_DECIMATION_FACTOR)
+        elif allowed_rate_hz > rate_hz * RECOVERY_MARGIN:
+            # Recover the full resolution first, then the rate
+            if decimation_factor > 1:
+                decimation_factor //= 2
+            else:
+                rate_hz = min(rate_hz * RECOVERY_STEP, allowed_rate_hz, self.requested_rate_hz)
+
+        self._apply(rate_hz, decimation_factor)
+
+    def _apply(self, rate_hz, decimation_factor):
+        previous_settings = (int(round(self.effective_rate_hz)), self.decimation_factor)
+        self.effective_rate_hz = float(rate_hz)
+        self.decimation_factor = decimation_factor
+
+        settings = (int(round(self.effective_rate_hz)), self.decimation_factor)
+        if settings[0] != int(self.chart.maxRedrawRate):
+            self.chart.maxRedrawRate = settings[0]
+        if decimation_factor != self.chart.getDecimationFactor():
+            self.chart.setDecimationFactor(decimation_factor)
+        if settings != previous_settings:
+            self.effective_settings_changed.emit(*settings)
+
+    def _reset_window(self):
+        self._frame_time_s = 0.0
+        self._frame_count = 0